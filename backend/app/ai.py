@@ -6,6 +6,7 @@ from typing import Any, Dict, Optional
 
 import httpx
 
+from .metrics import span
 from .schemas import EventOut
 
 DEFAULT_ENDPOINT = "https://models.github.ai/inference/v1/chat/completions"
@@ -120,12 +121,13 @@ class GitHubModelsClient:
         }
 
         try:
-            response = httpx.post(
-                self.endpoint,
-                json=payload,
-                headers=headers,
-                timeout=self.timeout,
-            )
+            with span("ai.chat_completion"):
+                response = httpx.post(
+                    self.endpoint,
+                    json=payload,
+                    headers=headers,
+                    timeout=self.timeout,
+                )
         except httpx.HTTPError as exc:
             raise AIUnavailable(f"Failed to contact GitHub Models endpoint: {exc}") from exc
 
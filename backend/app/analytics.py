@@ -0,0 +1,185 @@
+"""Historical rollups of the event history for dashboards.
+
+Rollups are vectorised pandas groupbys over the backend's typed
+:meth:`~app.backends.EventBackend.events_frame`. Results are memoised per store
+version and parameters, so repeat dashboard loads between writes come from
+memory. Breach rates of still-open events depend on the clock, so cached results
+also expire after :data:`ROLLUP_MAX_AGE_S`. SLAs come from each site's active
+triage policy, and a policy reload invalidates the cache too.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .metrics import span
+from .scoring import compile_policies, site_operators
+from .triage import INVESTIGATE_SLA, REPORT_SLA, _ensure_aware, registry as triage_policies
+
+if TYPE_CHECKING:
+    from .store import DataStore
+
+GROUP_COLUMNS: Dict[str, str] = {
+    "site": "site_id",
+    "operator": "operator",
+    "detection_type": "detection_type",
+}
+FRAME_COLUMNS = [
+    "id",
+    "site_id",
+    "detected_at_utc",
+    "detection_type",
+    "est_ch4_kgph",
+    "investigation_started_utc",
+    "report_submitted_utc",
+]
+ROLLUP_MAX_AGE_S = 60.0
+MAX_CACHED_ROLLUPS = 32
+
+
+@dataclass
+class Rollup:
+    rows: List[Dict[str, Any]]
+    generated_at_utc: datetime
+    data_version: int
+
+
+def bucket_start(detected: pd.Series, bucket: str) -> pd.Series:
+    """Start of the UTC week (Monday) or month containing each timestamp."""
+    day = detected.dt.floor("D")
+    if bucket == "week":
+        return day - pd.to_timedelta(detected.dt.weekday, unit="D")
+    if bucket == "month":
+        return day - pd.to_timedelta(detected.dt.day - 1, unit="D")
+    raise ValueError(f"Unknown bucket {bucket!r}")
+
+
+def compute_rollup(
+    frame: pd.DataFrame,
+    operators: Mapping[str, str],
+    group_by: Sequence[str] = (),
+    bucket: Optional[str] = None,
+    now: Optional[datetime] = None,
+    investigate_sla: Union[timedelta, pd.Series] = INVESTIGATE_SLA,
+    report_sla: Union[timedelta, pd.Series] = REPORT_SLA,
+) -> List[Dict[str, Any]]:
+    """Aggregate ``frame`` (columns :data:`FRAME_COLUMNS`) into one row per group.
+
+    An SLA counts as breached when the investigation (or report) happened after its
+    deadline, or has not happened and the deadline has passed at ``now``. The SLAs
+    may be per-row Series aligned with ``frame``.
+    """
+    unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown group_by field {unknown[0]!r}")
+    now_ts = pd.Timestamp(now or datetime.now(timezone.utc))
+    detected = frame["detected_at_utc"]
+    investigated = frame["investigation_started_utc"]
+    reported = frame["report_submitted_utc"]
+
+    work = pd.DataFrame(
+        {
+            "site_id": frame["site_id"].astype(str),
+            "detection_type": frame["detection_type"],
+            "est_ch4_kgph": pd.to_numeric(frame["est_ch4_kgph"], errors="coerce"),
+            "tti_h": (investigated - detected).dt.total_seconds() / 3600,
+            "ttr_h": (reported - detected).dt.total_seconds() / 3600,
+        },
+        index=frame.index,
+    )
+    work["operator"] = work["site_id"].map(operators)
+    # A report implies the investigation happened no later than the report.
+    investigate_breached = investigated.fillna(reported).fillna(now_ts) > detected + investigate_sla
+    report_breached = reported.fillna(now_ts) > detected + report_sla
+    work["breached"] = (investigate_breached | report_breached).astype(float)
+
+    keys = [GROUP_COLUMNS[name] for name in dict.fromkeys(group_by)]
+    if bucket is not None:
+        work["period_start_utc"] = bucket_start(detected, bucket)
+        keys.append("period_start_utc")
+    if not keys:
+        work["_all"] = 0
+    aggregated = (
+        work.groupby(keys or ["_all"], sort=True, dropna=False)
+        .agg(
+            detections=("site_id", "size"),
+            total_est_ch4_kgph=("est_ch4_kgph", "sum"),
+            mean_est_ch4_kgph=("est_ch4_kgph", "mean"),
+            max_est_ch4_kgph=("est_ch4_kgph", "max"),
+            mean_time_to_investigate_h=("tti_h", "mean"),
+            mean_time_to_report_h=("ttr_h", "mean"),
+            sla_breach_rate=("breached", "mean"),
+        )
+        .reset_index()
+    )
+    if not keys:
+        aggregated = aggregated.drop(columns="_all")
+    aggregated = aggregated.astype(object).where(aggregated.notna(), None)
+    rows = aggregated.to_dict(orient="records")
+    for row in rows:
+        row["detections"] = int(row["detections"])
+        period = row.get("period_start_utc")
+        if period is not None:
+            row["period_start_utc"] = period.to_pydatetime()
+    return rows
+
+
+_cache_lock = threading.Lock()
+_cache: "weakref.WeakKeyDictionary[DataStore, OrderedDict[Tuple[Any, ...], Tuple[float, Rollup]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def rollup(
+    store: DataStore,
+    group_by: Sequence[str] = (),
+    bucket: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Rollup:
+    """Memoised :func:`compute_rollup` over the store's events detected in ``[start, end]``."""
+    start = _ensure_aware(start) if start is not None else None
+    end = _ensure_aware(end) if end is not None else None
+    version = store.version
+    key = (version, triage_policies.version, tuple(group_by), bucket, start, end)
+    with _cache_lock:
+        entries = _cache.setdefault(store, OrderedDict())
+        cached = entries.get(key)
+        if cached is not None and time.monotonic() - cached[0] < ROLLUP_MAX_AGE_S:
+            entries.move_to_end(key)
+            return cached[1]
+
+    with span("analytics.rollup"):
+        now = datetime.now(timezone.utc)
+        operators = site_operators(store)
+        policies = compile_policies(triage_policies.current(), operators)
+        frame = store.backend.events_frame(columns=FRAME_COLUMNS, detected_from=start, detected_to=end)
+        investigate_sla, report_sla = policies.slas(frame["site_id"])
+        result = Rollup(
+            rows=compute_rollup(
+                frame,
+                operators,
+                group_by,
+                bucket,
+                now,
+                investigate_sla=investigate_sla,
+                report_sla=report_sla,
+            ),
+            generated_at_utc=now,
+            data_version=version,
+        )
+
+    with _cache_lock:
+        entries = _cache.setdefault(store, OrderedDict())
+        entries[key] = (time.monotonic(), result)
+        entries.move_to_end(key)
+        while len(entries) > MAX_CACHED_ROLLUPS:
+            entries.popitem(last=False)
+    return result
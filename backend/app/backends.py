@@ -0,0 +1,842 @@
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import span
+from .notes import EventNotes
+
+try:  # POSIX only; shared CSV mode is unavailable without it.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+EVENT_COLUMNS: List[str] = [
+    "id",
+    "site_id",
+    "detected_at_utc",
+    "detection_type",
+    "est_ch4_kgph",
+    "confidence",
+    "lat",
+    "lon",
+    "status",
+    "investigation_started_utc",
+    "report_submitted_utc",
+    "notes",
+]
+DATETIME_COLUMNS: List[str] = ["detected_at_utc", "investigation_started_utc", "report_submitted_utc"]
+
+EventRow = Dict[str, Any]
+
+DEFAULT_CHUNK_ROWS = 10_000
+
+
+def _format_iso(value: object) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, str):
+        return value
+    dt = pd.Timestamp(value)
+    if dt.tzinfo is None:
+        dt = dt.tz_localize(timezone.utc)
+    return dt.tz_convert(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def format_iso_column(values: pd.Series) -> pd.Series:
+    """Vectorised :func:`_format_iso` for a datetime column; ``None`` where missing."""
+    values = pd.to_datetime(values, utc=True, errors="coerce")
+    naive = values.dt.tz_localize(None).to_numpy("datetime64[us]")
+    text = np.datetime_as_string(naive, unit="s", timezone="UTC").astype(object)
+    fractional = (naive.view(np.int64) % 1_000_000 != 0) & ~np.isnat(naive)
+    if fractional.any():
+        text[fractional] = np.datetime_as_string(naive[fractional], unit="us", timezone="UTC")
+    text[np.isnat(naive)] = None
+    return pd.Series(text, index=values.index, dtype=object)
+
+
+def frame_chunks(
+    frame: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    mask: Optional[np.ndarray] = None,
+) -> Iterator[pd.DataFrame]:
+    """Rows of ``frame`` selected by ``mask``, copied out one chunk at a time."""
+    positions = np.arange(len(frame)) if mask is None else np.flatnonzero(mask)
+    selected = frame.columns.get_indexer(list(columns)) if columns is not None else slice(None)
+    for start in range(0, len(positions), chunk_rows):
+        yield frame.iloc[positions[start : start + chunk_rows], selected]
+
+
+def read_events_csv(path: Path) -> pd.DataFrame:
+    """Load an events CSV (optionally gzip-compressed) with typed datetimes and notes."""
+    df = pd.read_csv(path)
+    for column in DATETIME_COLUMNS:
+        df[column] = pd.to_datetime(df[column], utc=True, errors="coerce")
+    df["notes"] = df["notes"].apply(EventNotes.coerce)
+    return df
+
+
+def write_events_csv(df: pd.DataFrame, path: Path) -> None:
+    """Write ``df`` atomically (temp file + rename); ``.gz`` paths are gzip-compressed."""
+    df = df.copy()
+    for column in DATETIME_COLUMNS:
+        df[column] = format_iso_column(df[column])
+    df["notes"] = df["notes"].apply(lambda notes: EventNotes.coerce(notes).to_json())
+    # Write then rename so concurrent readers never observe a half-written file.
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    df.to_csv(tmp_path, index=False, compression="gzip" if path.suffix == ".gz" else None)
+    os.replace(tmp_path, path)
+
+
+class EventBackend(ABC):
+    """Storage interface used by :class:`~app.store.DataStore` for methane events.
+
+    Rows are exchanged as dicts keyed by :data:`EVENT_COLUMNS`. Datetime values may be
+    returned as ``datetime``/``pd.Timestamp`` objects or ISO strings and notes as
+    :class:`~app.notes.EventNotes` or JSON text; the store normalises both when building :class:`~app.schemas.Event` models.
+    Mutations issued inside :meth:`transaction` are persisted together.
+    """
+
+    @abstractmethod
+    def query_events(
+        self,
+        status: Optional[str] = None,
+        detected_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[EventRow]:
+        """Return event rows in insertion order, filtered and paginated by the backend."""
+
+    def query_event_ids(
+        self,
+        status: Optional[str] = None,
+        detected_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        """Ids of the rows :meth:`query_events` would return, in the same order."""
+        return [str(row["id"]) for row in self.query_events(status, detected_before, limit, offset)]
+
+    @abstractmethod
+    def get_event_row(self, event_id: str) -> Optional[EventRow]:
+        """Return a single event row or ``None`` when the id is unknown."""
+
+    def get_event_rows(self, event_ids: Iterable[str]) -> Dict[str, EventRow]:
+        """Return stored rows keyed by id; unknown ids are left out."""
+        rows: Dict[str, EventRow] = {}
+        for event_id in event_ids:
+            row = self.get_event_row(event_id)
+            if row is not None:
+                rows[event_id] = row
+        return rows
+
+    @abstractmethod
+    def existing_ids(self, event_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of ``event_ids`` that are already stored."""
+
+    @abstractmethod
+    def events_frame(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Return matching events as a typed DataFrame for vectorised work."""
+
+    def iter_events_frames(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        """Matching events in backend order as frames of at most ``chunk_rows`` rows.
+
+        Meant for exports; backends override it so that the full result is never
+        materialised at once.
+        """
+        frame = self.events_frame(None, site_ids, detected_from, detected_to)
+        mask = (frame["status"] == status).to_numpy() if status else None
+        yield from frame_chunks(frame, columns, chunk_rows, mask)
+
+    @abstractmethod
+    def update_event(self, event_id: str, changes: EventRow) -> None:
+        """Apply column changes to one event; raise ``KeyError`` if it does not exist."""
+
+    def update_events(self, changes: Dict[str, EventRow]) -> None:
+        """Apply ``{event_id: column changes}`` in one transaction; ``KeyError`` on unknown ids."""
+        with self.transaction():
+            for event_id, row_changes in changes.items():
+                self.update_event(event_id, row_changes)
+
+    @abstractmethod
+    def insert_events(self, rows: List[EventRow]) -> None:
+        """Append new event rows."""
+
+    @abstractmethod
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group mutations so they are persisted once."""
+
+    @abstractmethod
+    def data_version(self) -> int:
+        """Counter that changes whenever stored events change, including writes by other processes."""
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class EventSnapshot:
+    """One published version of the events table.
+
+    The frame is never modified once the snapshot exists: writers derive the next
+    snapshot (copying only the columns they change) and swap it in, so a reader that
+    grabbed this one sees a consistent table for as long as it holds the reference.
+    """
+
+    __slots__ = ("frame", "version", "_positions")
+
+    def __init__(self, frame: pd.DataFrame, version: int, positions: Optional[Dict[str, int]] = None) -> None:
+        self.frame = frame
+        self.version = version
+        self._positions = positions
+
+    def positions(self) -> Dict[str, int]:
+        """Map of event id to row position (first occurrence wins), built on first use."""
+        positions = self._positions
+        if positions is None:
+            ids = self.frame["id"].astype(str).tolist()
+            positions = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+            self._positions = positions
+        return positions
+
+    def with_changes(self, changes: Dict[str, EventRow], version: int) -> "EventSnapshot":
+        """Next snapshot with ``{event_id: column changes}`` applied; ``KeyError`` on unknown ids."""
+        positions = self.positions()
+        missing = [event_id for event_id in changes if event_id not in positions]
+        if missing:
+            raise KeyError(f"Event {missing[0]} not found")
+        by_column: Dict[str, List[Tuple[int, Any]]] = {}
+        for event_id, row_changes in changes.items():
+            for column, value in row_changes.items():
+                by_column.setdefault(column, []).append((positions[event_id], value))
+        frame = self.frame.copy(deep=False)
+        for column, updates in by_column.items():
+            values = self.frame[column].copy()
+            for position, value in updates:
+                values.iat[position] = value
+            frame[column] = values
+        # Ids are unchanged, so the position map carries over.
+        return EventSnapshot(frame, version, positions)
+
+    def with_rows(self, new_rows: pd.DataFrame, version: int) -> "EventSnapshot":
+        """Next snapshot with ``new_rows`` appended."""
+        if self.frame.empty:
+            return EventSnapshot(new_rows, version)
+        new_rows = new_rows.astype(self.frame.dtypes.to_dict(), errors="ignore")
+        frame = pd.concat([self.frame, new_rows], ignore_index=True)
+        positions = None
+        if self._positions is not None:
+            positions = dict(self._positions)
+            for offset, event_id in enumerate(new_rows["id"].astype(str).tolist(), start=len(self.frame)):
+                positions.setdefault(event_id, offset)
+        return EventSnapshot(frame, version, positions)
+
+
+class CSVEventBackend(EventBackend):
+    """Keeps all events in a pandas DataFrame and rewrites ``events.csv`` on change.
+
+    Reads never lock: they use the current :class:`EventSnapshot`. A transaction
+    stages its changes on a private next snapshot that only the writing thread sees,
+    and publishes it with a single reference swap once it has been persisted, so
+    readers observe either none or all of a transaction (and none of one that raised).
+
+    With ``shared=True`` several processes (e.g. ``uvicorn --workers N``) can use the
+    same file: writers hold an exclusive ``flock`` on ``events.csv.lock`` for the whole
+    transaction and bump a counter in ``events.csv.seq`` after each persist; every
+    read compares that counter with the one it loaded and reloads when another
+    process has written in the meantime.
+    """
+
+    def __init__(self, events_path: Path, shared: bool = False) -> None:
+        if not events_path.exists():
+            raise FileNotFoundError(
+                "Expected data CSVs not found. Ensure assets.csv and events.csv are present in the data directory."
+            )
+        if shared and fcntl is None:
+            raise RuntimeError("Shared CSV mode requires POSIX file locking (fcntl).")
+        self._events_path = events_path
+        self._shared = shared
+        self._seq_path = events_path.with_name(events_path.name + ".seq")
+        self._lock_path = events_path.with_name(events_path.name + ".lock")
+        self._lock_fd: Optional[int] = None
+        self._tx_lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._seq = self._read_seq() if shared else 0
+        self._snapshot = EventSnapshot(self._load_events(), 0)
+        self._pending: Optional[EventSnapshot] = None
+        self._writer: Optional[int] = None
+        self._depth = 0
+
+    def _load_events(self) -> pd.DataFrame:
+        return read_events_csv(self._events_path)
+
+    def _read_seq(self) -> int:
+        try:
+            return int(self._seq_path.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _sync(self) -> None:
+        """Reload the frame if another process persisted since we last loaded it."""
+        if not self._shared:
+            return
+        seq = self._read_seq()
+        if seq == self._seq:
+            return
+        with self._reload_lock:
+            if seq != self._seq:
+                self._snapshot = EventSnapshot(self._load_events(), self._snapshot.version + 1)
+                self._seq = seq
+
+    def snapshot(self) -> EventSnapshot:
+        """The latest published snapshot; safe to read from any thread without locking."""
+        self._sync()
+        return self._snapshot
+
+    def _view(self) -> EventSnapshot:
+        """What the calling thread should read: its own staged changes inside a transaction."""
+        pending = self._pending
+        if pending is not None and self._writer == threading.get_ident():
+            return pending
+        return self.snapshot()
+
+    def _stage(self, build: Callable[[EventSnapshot, int], EventSnapshot]) -> None:
+        """Derive the transaction's next snapshot; call with the transaction held."""
+        base = self._pending or self._snapshot
+        self._pending = build(base, self._snapshot.version + 1)
+
+    @staticmethod
+    def _filter_mask(
+        df: pd.DataFrame,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+    ) -> Optional[np.ndarray]:
+        """Boolean row mask for the filters, or ``None`` when there are none."""
+        mask: Optional[np.ndarray] = None
+
+        def narrow(condition: pd.Series) -> None:
+            nonlocal mask
+            values = condition.to_numpy(dtype=bool)
+            mask = values if mask is None else mask & values
+
+        if site_ids is not None:
+            narrow(df["site_id"].astype(str).isin(set(site_ids)))
+        if detected_from is not None:
+            narrow(df["detected_at_utc"] >= pd.Timestamp(detected_from))
+        if detected_to is not None:
+            narrow(df["detected_at_utc"] <= pd.Timestamp(detected_to))
+        if status:
+            narrow(df["status"] == status)
+        return mask
+
+    @classmethod
+    def _filter_frame(
+        cls,
+        df: pd.DataFrame,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        mask = cls._filter_mask(df, site_ids, detected_from, detected_to)
+        if mask is not None:
+            df = df[mask]
+        return df.loc[:, list(columns)] if columns is not None else df
+
+    def query_events(
+        self,
+        status: Optional[str] = None,
+        detected_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[EventRow]:
+        return self._query_frame(status, detected_before, limit, offset).to_dict(orient="records")
+
+    def query_event_ids(
+        self,
+        status: Optional[str] = None,
+        detected_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        return self._query_frame(status, detected_before, limit, offset)["id"].astype(str).tolist()
+
+    def _query_frame(
+        self,
+        status: Optional[str],
+        detected_before: Optional[datetime],
+        limit: Optional[int],
+        offset: int,
+    ) -> pd.DataFrame:
+        df = self._view().frame
+        if status:
+            df = df[df["status"] == status]
+        if detected_before is not None:
+            df = df[df["detected_at_utc"] < pd.Timestamp(detected_before)]
+        stop = None if limit is None else offset + limit
+        return df.iloc[offset:stop]
+
+    def get_event_row(self, event_id: str) -> Optional[EventRow]:
+        view = self._view()
+        position = view.positions().get(event_id)
+        if position is None:
+            return None
+        return view.frame.iloc[position].to_dict()
+
+    def get_event_rows(self, event_ids: Iterable[str]) -> Dict[str, EventRow]:
+        view = self._view()
+        positions = view.positions()
+        found = sorted({positions[event_id] for event_id in event_ids if event_id in positions})
+        return {str(row["id"]): row for row in view.frame.iloc[found].to_dict(orient="records")}
+
+    def existing_ids(self, event_ids: Iterable[str]) -> Set[str]:
+        positions = self._view().positions()
+        return {event_id for event_id in event_ids if event_id in positions}
+
+    def events_frame(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        return self._filter_frame(self._view().frame, columns, site_ids, detected_from, detected_to)
+
+    def iter_events_frames(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        # One snapshot for the whole iteration, so the export is consistent.
+        frame = self._view().frame
+        mask = self._filter_mask(frame, site_ids, detected_from, detected_to, status)
+        yield from frame_chunks(frame, columns, chunk_rows, mask)
+
+    def update_event(self, event_id: str, changes: EventRow) -> None:
+        self.update_events({event_id: changes})
+
+    def update_events(self, changes: Dict[str, EventRow]) -> None:
+        if not changes:
+            return
+        with self.transaction():
+            self._stage(lambda base, version: base.with_changes(changes, version))
+
+    def insert_events(self, rows: List[EventRow]) -> None:
+        if not rows:
+            return
+        new_rows = pd.DataFrame(
+            [{column: row.get(column, pd.NA) for column in EVENT_COLUMNS} for row in rows],
+            columns=EVENT_COLUMNS,
+        )
+        for column in DATETIME_COLUMNS:
+            new_rows[column] = pd.to_datetime(new_rows[column], utc=True, errors="coerce")
+        with self.transaction():
+            self._stage(lambda base, version: base.with_rows(new_rows, version))
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._tx_lock:
+            outermost = self._depth == 0
+            if outermost and self._shared:
+                self._acquire_file_lock()
+            try:
+                if outermost:
+                    self._sync()
+                    self._writer = threading.get_ident()
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                if outermost and self._pending is not None:
+                    self._persist_events()
+                    self._snapshot = self._pending
+            finally:
+                if outermost:
+                    # Staged changes of a failed transaction are simply dropped.
+                    self._pending = None
+                    self._writer = None
+                    if self._shared:
+                        self._release_file_lock()
+
+    def _acquire_file_lock(self) -> None:
+        self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+
+    def _release_file_lock(self) -> None:
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _persist_events(self) -> None:
+        with span("store.persist"):
+            self._write_events(self._pending.frame)
+
+    def _write_events(self, frame: pd.DataFrame) -> None:
+        write_events_csv(frame, self._events_path)
+        if self._shared:
+            self._seq += 1
+            seq_tmp = self._seq_path.with_name(f".{self._seq_path.name}.{os.getpid()}.tmp")
+            seq_tmp.write_text(str(self._seq))
+            os.replace(seq_tmp, self._seq_path)
+
+    def data_version(self) -> int:
+        return self.snapshot().version
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    site_id TEXT NOT NULL,
+    detected_at_utc TEXT,
+    detection_type TEXT,
+    est_ch4_kgph REAL,
+    confidence REAL,
+    lat REAL,
+    lon REAL,
+    status TEXT NOT NULL,
+    investigation_started_utc TEXT,
+    report_submitted_utc TEXT,
+    notes TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_events_site_detected ON events (site_id, detected_at_utc);
+CREATE INDEX IF NOT EXISTS idx_events_status ON events (status);
+CREATE INDEX IF NOT EXISTS idx_events_detected ON events (detected_at_utc);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0);
+"""
+
+
+def _sqlite_datetime(value: object) -> Optional[str]:
+    """Fixed-width ISO text so timestamps compare correctly as strings in SQL."""
+    if value is None or isinstance(value, str) and not value:
+        return None
+    if not isinstance(value, str) and pd.isna(value):
+        return None
+    dt = pd.Timestamp(value)
+    if dt.tzinfo is None:
+        dt = dt.tz_localize(timezone.utc)
+    return dt.tz_convert(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _sqlite_value(column: str, value: object) -> object:
+    if column in DATETIME_COLUMNS:
+        return _sqlite_datetime(value)
+    if column == "notes":
+        return EventNotes.coerce(value).to_json()
+    if value is None or value is pd.NA:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):
+        return value.item()  # numpy scalar
+    return value
+
+
+class SQLiteEventBackend(EventBackend):
+    """Stores events in an embedded SQLite database (WAL mode, indexed lookups).
+
+    Filters and pagination run as SQL so only the requested rows are materialised.
+    Each thread gets its own connection; WAL lets readers proceed while a writer commits.
+    Write transactions bump ``meta.data_version`` so every process sees the change.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._conn().executescript(SQLITE_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            self._local.depth = 0
+            self._local.dirty = False
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def query_events(
+        self,
+        status: Optional[str] = None,
+        detected_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[EventRow]:
+        sql, params = self._query_sql(", ".join(EVENT_COLUMNS), status, detected_before, limit, offset)
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def query_event_ids(
+        self,
+        status: Optional[str] = None,
+        detected_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        sql, params = self._query_sql("id", status, detected_before, limit, offset)
+        return [row[0] for row in self._conn().execute(sql, params)]
+
+    @staticmethod
+    def _query_sql(
+        columns: str,
+        status: Optional[str],
+        detected_before: Optional[datetime],
+        limit: Optional[int],
+        offset: int,
+    ) -> Tuple[str, List[object]]:
+        clauses: List[str] = []
+        params: List[object] = []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if detected_before is not None:
+            clauses.append("detected_at_utc < ?")
+            params.append(_sqlite_datetime(detected_before))
+        sql = f"SELECT {columns} FROM events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seq LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        return sql, params
+
+    def get_event_row(self, event_id: str) -> Optional[EventRow]:
+        row = self._conn().execute(
+            f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE id = ?", (event_id,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_event_rows(self, event_ids: Iterable[str]) -> Dict[str, EventRow]:
+        ids = list(dict.fromkeys(event_ids))
+        rows: Dict[str, EventRow] = {}
+        conn = self._conn()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(
+                f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE id IN ({placeholders})", chunk
+            ):
+                rows[row["id"]] = dict(row)
+        return rows
+
+    def existing_ids(self, event_ids: Iterable[str]) -> Set[str]:
+        ids = list(dict.fromkeys(event_ids))
+        found: Set[str] = set()
+        conn = self._conn()
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            found.update(
+                row[0] for row in conn.execute(f"SELECT id FROM events WHERE id IN ({placeholders})", chunk)
+            )
+        return found
+
+    @staticmethod
+    def _where(
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+    ) -> Optional[Tuple[str, List[object]]]:
+        """SQL ``WHERE`` clause and parameters; ``None`` when nothing can match."""
+        clauses: List[str] = []
+        params: List[object] = []
+        if site_ids is not None:
+            sites = sorted(set(site_ids))
+            if not sites:
+                return None
+            clauses.append(f"site_id IN ({', '.join('?' for _ in sites)})")
+            params.extend(sites)
+        if detected_from is not None:
+            clauses.append("detected_at_utc >= ?")
+            params.append(_sqlite_datetime(detected_from))
+        if detected_to is not None:
+            clauses.append("detected_at_utc <= ?")
+            params.append(_sqlite_datetime(detected_to))
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @staticmethod
+    def _typed(df: pd.DataFrame) -> pd.DataFrame:
+        for column in DATETIME_COLUMNS:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], utc=True, errors="coerce", format="ISO8601")
+        if "notes" in df.columns:
+            df["notes"] = df["notes"].apply(EventNotes.coerce)
+        return df
+
+    def events_frame(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        selected = list(columns) if columns is not None else EVENT_COLUMNS
+        where = self._where(site_ids, detected_from, detected_to)
+        if where is None:
+            return pd.DataFrame(columns=selected)
+        sql = f"SELECT {', '.join(selected)} FROM events{where[0]} ORDER BY seq"
+        return self._typed(pd.read_sql_query(sql, self._conn(), params=where[1]))
+
+    def iter_events_frames(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        selected = list(columns) if columns is not None else EVENT_COLUMNS
+        where = self._where(site_ids, detected_from, detected_to, status)
+        if where is None:
+            return
+        # A private connection: the consumer may resume this generator on any thread,
+        # and one SELECT reads a single consistent WAL snapshot.
+        conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        try:
+            sql = f"SELECT {', '.join(selected)} FROM events{where[0]} ORDER BY seq"
+            for chunk in pd.read_sql_query(sql, conn, params=where[1], chunksize=chunk_rows):
+                yield self._typed(chunk)
+        finally:
+            conn.close()
+
+    def update_event(self, event_id: str, changes: EventRow) -> None:
+        if not changes:
+            return
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        params = [_sqlite_value(column, value) for column, value in changes.items()]
+        with self.transaction():
+            cursor = self._conn().execute(f"UPDATE events SET {assignments} WHERE id = ?", [*params, event_id])
+            if cursor.rowcount == 0:
+                raise KeyError(f"Event {event_id} not found")
+            self._local.dirty = True
+
+    def insert_events(self, rows: List[EventRow]) -> None:
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in EVENT_COLUMNS)
+        with self.transaction():
+            self._conn().executemany(
+                f"INSERT INTO events ({', '.join(EVENT_COLUMNS)}) VALUES ({placeholders})",
+                (
+                    [_sqlite_value(column, row.get(column)) for column in EVENT_COLUMNS]
+                    for row in rows
+                ),
+            )
+            self._local.dirty = True
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        conn = self._conn()
+        if self._local.depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self._local.dirty = False
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                with span("store.persist"):
+                    if self._local.dirty:
+                        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+                        self._local.dirty = False
+                    conn.execute("COMMIT")
+
+    def data_version(self) -> int:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+BACKEND_ENV = "EVENTS_BACKEND"
+SHARED_ENV = "EVENTS_SHARED"
+SQLITE_PATH_ENV = "EVENTS_DB_PATH"
+DEFAULT_SQLITE_FILENAME = "events.sqlite3"
+HOT_MONTHS_ENV = "EVENTS_HOT_MONTHS"
+PARTITIONS_DIRNAME = "partitions"
+
+
+def create_backend(
+    kind: str,
+    data_dir: Path,
+    db_path: Optional[Path] = None,
+    shared: bool = False,
+    hot_months: Optional[int] = None,
+) -> EventBackend:
+    """Build the backend named by ``kind`` (``csv``, ``sqlite`` or ``partitioned``).
+
+    SQLite is always safe to share between processes; ``shared`` opts the CSV-based
+    backends into file locking and change-sequence reloads. The partitioned backend
+    seeds itself from ``events.csv`` on first use.
+    """
+    normalized = kind.strip().lower()
+    if normalized == "csv":
+        return CSVEventBackend(data_dir / "events.csv", shared=shared)
+    if normalized == "sqlite":
+        return SQLiteEventBackend(db_path or data_dir / DEFAULT_SQLITE_FILENAME)
+    if normalized == "partitioned":
+        from .partitions import DEFAULT_HOT_MONTHS, PartitionedEventBackend
+
+        return PartitionedEventBackend(
+            data_dir / PARTITIONS_DIRNAME,
+            seed_path=data_dir / "events.csv",
+            hot_months=hot_months or DEFAULT_HOT_MONTHS,
+            shared=shared,
+        )
+    raise ValueError(f"Unknown events backend: {kind}")
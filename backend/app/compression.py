@@ -0,0 +1,214 @@
+"""Response compression negotiated from ``Accept-Encoding``.
+
+Brotli (``br``) is used when the optional ``brotli`` package is installed and the
+client accepts it; otherwise gzip. Bodies below the size threshold
+(``COMPRESSION_MIN_BYTES``, default 1 KiB) are sent as-is. Streaming responses are
+compressed chunk by chunk, flushing after each chunk. Responses that already carry
+a ``Content-Encoding``, partial content and already-compressed media types are
+passed through untouched.
+"""
+from __future__ import annotations
+
+import os
+import zlib
+from functools import partial
+from typing import Callable, Dict, Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None  # type: ignore[assignment]
+
+MIN_SIZE_ENV = "COMPRESSION_MIN_BYTES"
+DEFAULT_MIN_SIZE = 1024
+# Faster settings than the libraries' defaults: these responses are generated per
+# request, so compression time is on the critical path.
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 4
+# Larger bodies are compressed off the event loop.
+THREAD_MIN_SIZE = 128 * 1024
+EXCLUDED_CONTENT_TYPES = frozenset(
+    {
+        "application/gzip",
+        "application/x-gzip",
+        "application/zip",
+        "application/grpc",
+        "audio/*",
+        "font/woff",
+        "font/woff2",
+        "image/avif",
+        "image/gif",
+        "image/jpeg",
+        "image/png",
+        "image/webp",
+        "text/event-stream",
+        "video/*",
+    }
+)
+
+# compress(chunk, more_body) -> encoded bytes; one instance per response.
+Compressor = Callable[[bytes, bool], bytes]
+
+
+def parse_quality_header(value: str) -> Dict[str, float]:
+    """Parse ``Accept``-style headers into ``{token: q}`` (lower-cased tokens)."""
+    qualities: Dict[str, float] = {}
+    for part in value.split(","):
+        token, *params = (piece.strip() for piece in part.split(";"))
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, raw = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        qualities[token.lower()] = quality
+    return qualities
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    qualities = parse_quality_header(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best: Optional[str] = None
+    best_quality = 0.0
+    for encoding in candidates:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class GzipCompressor:
+    def __init__(self, level: int = DEFAULT_GZIP_LEVEL) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def __call__(self, body: bytes, more_body: bool) -> bytes:
+        chunk = self._compressor.compress(body)
+        return chunk + self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int = DEFAULT_BROTLI_QUALITY) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def __call__(self, body: bytes, more_body: bool) -> bytes:
+        chunk = self._compressor.process(body)
+        return chunk + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionResponder:
+    """Compresses one response, working on the plain ASGI ``send`` messages.
+
+    The start message is held back until the first body chunk shows whether the
+    response is worth compressing. Without a ``compressor`` (no acceptable encoding)
+    bodies pass through with only ``Vary`` added.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        encoding: Optional[str] = None,
+        compressor: Optional[Callable[[], Compressor]] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self._new_compressor = compressor
+        self._compress: Optional[Compressor] = None
+        self._send: Optional[Send] = None
+        self._start: Optional[Message] = None
+        self._passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._send = send
+        await self.app(scope, receive, self.send)
+
+    async def send(self, message: Message) -> None:
+        assert self._send is not None
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self._passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or not EXCLUDED_CONTENT_TYPES.isdisjoint({media_type, media_type.partition("/")[0] + "/*"})
+            )
+            if self._passthrough:
+                await self._send(message)
+            else:
+                self._start = message
+            return
+        if kind != "http.response.body" or self._passthrough:
+            if self._start is not None and kind == "http.response.pathsend":
+                await self._send(self._start)  # files sent by the server are not compressed
+                self._start = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        start, self._start = self._start, None
+        if start is not None:
+            if not more_body and len(body) < self.minimum_size:
+                await self._send(start)
+                await self._send(message)
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if self._new_compressor is not None:
+                self._compress = self._new_compressor()
+                body = await self._apply(body, more_body)
+                headers["Content-Encoding"] = self.encoding or ""
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+            await self._send(start)
+        elif self._compress is not None:
+            body = await self._apply(body, more_body)
+        await self._send({**message, "body": body})
+
+    async def _apply(self, body: bytes, more_body: bool) -> bytes:
+        assert self._compress is not None
+        if len(body) >= THREAD_MIN_SIZE:
+            return await anyio.to_thread.run_sync(self._compress, body, more_body)
+        return self._compress(body, more_body)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: int = DEFAULT_GZIP_LEVEL,
+        brotli_quality: int = DEFAULT_BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.minimum_size = (
+            minimum_size if minimum_size is not None else int(os.getenv(MIN_SIZE_ENV, DEFAULT_MIN_SIZE))
+        )
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        compressor: Optional[Callable[[], Compressor]] = None
+        if encoding == "br":
+            compressor = partial(BrotliCompressor, self.brotli_quality)
+        elif encoding == "gzip":
+            compressor = partial(GzipCompressor, self.gzip_level)
+        await CompressionResponder(self.app, self.minimum_size, encoding, compressor)(scope, receive, send)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+METERS_PER_DEGREE = 111_320.0
+EARTH_RADIUS_M = 6_371_000.0
+
+DEFAULT_CLUSTER_DISTANCE_M = 300.0
+DEFAULT_CLUSTER_WINDOW_HOURS = 6.0
+
+BucketKey = Tuple[str, int, int, int]
+Primary = Tuple[int, float, float, str]
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _epoch_ns(values: pd.Series) -> np.ndarray:
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True, errors="coerce")).asi8
+
+
+def cluster_detections(
+    incoming: pd.DataFrame,
+    existing: pd.DataFrame,
+    distance_m: float = DEFAULT_CLUSTER_DISTANCE_M,
+    window_hours: float = DEFAULT_CLUSTER_WINDOW_HOURS,
+) -> Dict[int, str]:
+    """Map incoming row positions that repeat an earlier detection to the primary event id.
+
+    Detections of the same ``site_id`` within ``distance_m`` metres and ``window_hours``
+    hours of a primary event are treated as the same plume. Rows are hashed into
+    site/space/time buckets sized to the thresholds, so each row is only compared
+    with the handful of primaries in its neighbouring buckets.
+    """
+    if incoming.empty or distance_m <= 0 or window_hours <= 0:
+        return {}
+
+    window_ns = int(window_hours * 3600 * 1e9)
+    incoming_times = _epoch_ns(incoming["detected_at_utc"])
+    incoming_valid = (
+        (incoming_times != pd.NaT.value)
+        & incoming["lat"].notna().to_numpy()
+        & incoming["lon"].notna().to_numpy()
+    )
+    if not incoming_valid.any():
+        return {}
+
+    sites = set(incoming["site_id"].astype(str))
+    lower = incoming_times[incoming_valid].min() - window_ns
+    upper = incoming_times[incoming_valid].max() + window_ns
+    if existing.empty:
+        candidates = existing
+        existing_times = np.empty(0, dtype="int64")
+    else:
+        existing_times = _epoch_ns(existing["detected_at_utc"])
+        mask = (
+            existing["site_id"].astype(str).isin(sites).to_numpy()
+            & (existing_times >= lower)
+            & (existing_times <= upper)
+            & existing["lat"].notna().to_numpy()
+            & existing["lon"].notna().to_numpy()
+        )
+        candidates = existing[mask]
+        existing_times = existing_times[mask]
+
+    lats = np.concatenate(
+        [incoming["lat"].to_numpy(dtype=float)[incoming_valid], candidates["lat"].to_numpy(dtype=float)]
+    )
+    # Longitude cells are sized for the highest latitude in play so that a cell is never
+    # narrower than ``distance_m``; the exact haversine check below does the rest.
+    max_abs_lat = min(float(np.abs(lats).max()), 89.0)
+    lat_step = distance_m / METERS_PER_DEGREE
+    lon_step = distance_m / (METERS_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+
+    def bucket_of(site: str, ts: int, lat: float, lon: float) -> BucketKey:
+        return site, ts // window_ns, math.floor(lat / lat_step), math.floor(lon / lon_step)
+
+    buckets: Dict[BucketKey, List[Primary]] = defaultdict(list)
+    for site, ts, lat, lon, event_id in zip(
+        candidates["site_id"].astype(str),
+        existing_times.tolist(),
+        candidates["lat"].astype(float),
+        candidates["lon"].astype(float),
+        candidates["id"].astype(str),
+    ):
+        buckets[bucket_of(site, ts, lat, lon)].append((ts, lat, lon, event_id))
+
+    merged: Dict[int, str] = {}
+    site_values = incoming["site_id"].astype(str).to_numpy()
+    lat_values = incoming["lat"].to_numpy(dtype=float)
+    lon_values = incoming["lon"].to_numpy(dtype=float)
+    id_values = incoming["id"].astype(str).to_numpy()
+    order = np.argsort(incoming_times, kind="stable")
+    for position in order.tolist():
+        if not incoming_valid[position]:
+            continue
+        site = str(site_values[position])
+        ts = int(incoming_times[position])
+        lat = float(lat_values[position])
+        lon = float(lon_values[position])
+        key = bucket_of(site, ts, lat, lon)
+
+        best: Tuple[int, str] | None = None
+        for d_time in (-1, 0, 1):
+            for d_lat in (-1, 0, 1):
+                for d_lon in (-1, 0, 1):
+                    neighbour = (site, key[1] + d_time, key[2] + d_lat, key[3] + d_lon)
+                    for other_ts, other_lat, other_lon, other_id in buckets.get(neighbour, ()):
+                        gap = abs(other_ts - ts)
+                        if gap > window_ns or (best is not None and gap >= best[0]):
+                            continue
+                        if _haversine_m(lat, lon, other_lat, other_lon) <= distance_m:
+                            best = (gap, other_id)
+
+        if best is not None:
+            merged[position] = best[1]
+        else:
+            buckets[key].append((ts, lat, lon, str(id_values[position])))
+
+    return merged
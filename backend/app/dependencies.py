@@ -0,0 +1,82 @@
+"""Lazily constructed shared state for the API.
+
+Importing this module is cheap: the :class:`~app.store.DataStore` (and with it pandas
+and the data files) is only loaded by the first request that needs it, or by the
+optional background warm-up started from the application lifespan.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import Header, HTTPException
+
+from .profiling import admin_token, check_admin_token
+
+if TYPE_CHECKING:
+    from .store import DataStore
+
+WARMUP_ENV = "STORE_WARMUP"
+
+logger = logging.getLogger(__name__)
+
+_store: Optional["DataStore"] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> "DataStore":
+    """FastAPI dependency returning the process-wide store, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from .store import DataStore
+
+                _store = DataStore()
+    return _store
+
+
+def warmup_enabled() -> bool:
+    return os.getenv(WARMUP_ENV, "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def start_store_warmup() -> threading.Thread:
+    """Build the store and its search index on a daemon thread so startup does not wait."""
+
+    def _warm() -> None:
+        try:
+            store = get_store()
+            # The search index takes seconds to build over a large history; do it now
+            # rather than on the first search.
+            from .search import ensure_index
+
+            ensure_index(store)
+        except Exception:  # pragma: no cover - surfaced again on the first request
+            logger.exception("Background DataStore warm-up failed")
+
+    thread = threading.Thread(target=_warm, name="datastore-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def shutdown_store() -> None:
+    """Release the shared store so the next request builds a fresh one."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.backend.close()
+        _store = None
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Guard for diagnostics endpoints: ``X-Admin-Token`` must match ``ADMIN_TOKEN``.
+
+    With no ``ADMIN_TOKEN`` configured the admin endpoints do not exist as far as
+    clients can tell.
+    """
+    if admin_token() is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not check_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
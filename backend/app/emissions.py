@@ -0,0 +1,284 @@
+"""Cumulative methane mass estimated from point emission rates.
+
+A detection only records a rate (``est_ch4_kgph``). The estimate assumes the source
+kept emitting at that rate from detection until it was dealt with: the report by
+default, or the investigation with ``until="investigation"`` (a report implies an
+investigation no later). Events still open count up to ``now``. Every event is
+capped at ``EMISSIONS_MAX_DURATION_H`` hours (default 720), so one stale open event
+cannot dominate a total. ``mass_kg`` is rate x hours. ``weighted_mass_kg`` also
+multiplies by the detection confidence, so a 0.5-confidence detection counts as half
+a leak.
+
+Totals are grouped like :mod:`app.analytics` rollups, optionally per month, quarter
+or year. An emission that straddles a period boundary is split between the periods
+pro rata, and ``start``/``end`` clip emissions to that window rather than filtering
+on detection time. Everything is vectorised over the backend's columns and memoised
+per store version.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .analytics import GROUP_COLUMNS
+from .metrics import span
+from .scoring import site_operators
+from .triage import _ensure_aware
+
+if TYPE_CHECKING:
+    from .store import DataStore
+
+MAX_DURATION_ENV = "EMISSIONS_MAX_DURATION_H"
+DEFAULT_MAX_DURATION_H = 720.0
+MONTHS_PER_PERIOD = {"month": 1, "quarter": 3, "year": 12}
+UNTIL_CHOICES = ("report", "investigation")
+FRAME_COLUMNS = [
+    "id",
+    "site_id",
+    "detection_type",
+    "detected_at_utc",
+    "est_ch4_kgph",
+    "confidence",
+    "investigation_started_utc",
+    "report_submitted_utc",
+]
+EMISSIONS_MAX_AGE_S = 60.0
+MAX_CACHED_REPORTS = 32
+
+_NS_PER_HOUR = 3_600 * 10**9
+
+
+def max_duration() -> timedelta:
+    return timedelta(hours=float(os.getenv(MAX_DURATION_ENV) or DEFAULT_MAX_DURATION_H))
+
+
+class _Detection(Protocol):
+    detected_at_utc: datetime
+    est_ch4_kgph: float
+    confidence: float
+    investigation_started_utc: Optional[datetime]
+    report_submitted_utc: Optional[datetime]
+
+
+@dataclass
+class EventEmission:
+    ended_at_utc: datetime  # when the estimate stops counting
+    hours: float
+    mass_kg: float
+    weighted_mass_kg: float
+
+
+def estimate_event(
+    event: _Detection,
+    now: Optional[datetime] = None,
+    until: str = "report",
+    cap: Optional[timedelta] = None,
+) -> EventEmission:
+    """The module's estimate for one event (an ``Event`` or ``EventOut``)."""
+    if until not in UNTIL_CHOICES:
+        raise ValueError(f"Unknown emission end {until!r}")
+    detected = _ensure_aware(event.detected_at_utc)
+    ended = event.report_submitted_utc
+    if until == "investigation":
+        ended = event.investigation_started_utc or ended
+    ended = _ensure_aware(ended or now or datetime.now(timezone.utc))
+    ended = max(detected, min(ended, detected + (cap or max_duration())))
+    hours = (ended - detected).total_seconds() / 3600
+    mass_kg = event.est_ch4_kgph * hours
+    return EventEmission(ended, hours, mass_kg, mass_kg * event.confidence)
+
+
+def emission_intervals(
+    frame: pd.DataFrame, now: datetime, until: str = "report", cap: Optional[timedelta] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end of each row's emission as int64 nanoseconds (equal when nothing counts)."""
+    if until not in UNTIL_CHOICES:
+        raise ValueError(f"Unknown emission end {until!r}")
+    detected = frame["detected_at_utc"]
+    ended = frame["report_submitted_utc"]
+    if until == "investigation":
+        ended = frame["investigation_started_utc"].fillna(ended)
+    ended = ended.fillna(pd.Timestamp(_ensure_aware(now)))
+    start_ns = detected.to_numpy(dtype="datetime64[ns]").view("i8")
+    end_ns = ended.to_numpy(dtype="datetime64[ns]").view("i8")
+    cap_ns = (cap or max_duration()) // timedelta(microseconds=1) * 1_000
+    end_ns = np.clip(end_ns, start_ns, start_ns + cap_ns)
+    missing = detected.isna().to_numpy()
+    end_ns[missing] = start_ns[missing]
+    return start_ns, end_ns
+
+
+def _period_index(nanoseconds: np.ndarray, months: int) -> np.ndarray:
+    return nanoseconds.view("M8[ns]").astype("M8[M]").astype(np.int64) // months
+
+
+def _period_start_ns(index: np.ndarray, months: int) -> np.ndarray:
+    return (index * months).astype("M8[M]").astype("M8[ns]").view(np.int64)
+
+
+def split_by_period(
+    start_ns: np.ndarray, end_ns: np.ndarray, bucket: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Cut each non-empty ``[start, end)`` at period boundaries.
+
+    Returns ``(row, period_start_ns, hours)`` with one entry per piece, where ``row``
+    indexes the input arrays.
+    """
+    months = MONTHS_PER_PERIOD.get(bucket)
+    if months is None:
+        raise ValueError(f"Unknown bucket {bucket!r}")
+    rows = np.flatnonzero(end_ns > start_ns)
+    start_ns, end_ns = start_ns[rows], end_ns[rows]
+    first = _period_index(start_ns, months)
+    pieces = _period_index(end_ns - 1, months) - first + 1
+    row = np.repeat(rows, pieces)
+    offsets = np.arange(len(row)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    period = np.repeat(first, pieces) + offsets
+    period_start = _period_start_ns(period, months)
+    piece_start = np.maximum(np.repeat(start_ns, pieces), period_start)
+    piece_end = np.minimum(np.repeat(end_ns, pieces), _period_start_ns(period + 1, months))
+    return row, period_start, (piece_end - piece_start) / _NS_PER_HOUR
+
+
+def compute_emissions(
+    frame: pd.DataFrame,
+    operators: Mapping[str, str],
+    group_by: Sequence[str] = (),
+    bucket: Optional[str] = None,
+    now: Optional[datetime] = None,
+    until: str = "report",
+    cap: Optional[timedelta] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Aggregate the estimated mass of ``frame`` (columns :data:`FRAME_COLUMNS`) into one row per group.
+
+    Only emissions inside ``[start, end)`` count. ``events`` is the number of events
+    that emitted in the group (and period).
+    """
+    unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown group_by field {unknown[0]!r}")
+    start_ns, end_ns = emission_intervals(frame, now or datetime.now(timezone.utc), until, cap)
+    if start is not None:
+        start_ns = np.maximum(start_ns, pd.Timestamp(_ensure_aware(start)).value)
+    if end is not None:
+        end_ns = np.minimum(end_ns, pd.Timestamp(_ensure_aware(end)).value)
+
+    if bucket is None:
+        rows = np.flatnonzero(end_ns > start_ns)
+        hours = (end_ns[rows] - start_ns[rows]) / _NS_PER_HOUR
+        period_start = None
+    else:
+        rows, period_start, hours = split_by_period(start_ns, end_ns, bucket)
+    rate = pd.to_numeric(frame["est_ch4_kgph"], errors="coerce").to_numpy(dtype=float)[rows]
+    confidence = pd.to_numeric(frame["confidence"], errors="coerce").to_numpy(dtype=float)[rows]
+    site_ids = frame["site_id"].astype(str).to_numpy()[rows]
+    work = pd.DataFrame(
+        {
+            "site_id": site_ids,
+            "detection_type": frame["detection_type"].to_numpy()[rows],
+            "emission_hours": hours,
+            "mass_kg": rate * hours,
+            "weighted_mass_kg": rate * hours * confidence,
+        }
+    )
+    work["operator"] = work["site_id"].map(operators)
+
+    keys = [GROUP_COLUMNS[name] for name in dict.fromkeys(group_by)]
+    if period_start is not None:
+        work["period_start_utc"] = pd.to_datetime(period_start, utc=True)
+        keys.append("period_start_utc")
+    if not keys:
+        work["_all"] = 0
+    aggregated = (
+        work.groupby(keys or ["_all"], sort=True, dropna=False)
+        .agg(
+            events=("site_id", "size"),
+            emission_hours=("emission_hours", "sum"),
+            mass_kg=("mass_kg", "sum"),
+            weighted_mass_kg=("weighted_mass_kg", "sum"),
+        )
+        .reset_index()
+    )
+    if not keys:
+        aggregated = aggregated.drop(columns="_all")
+    aggregated = aggregated.astype(object).where(aggregated.notna(), None)
+    result = aggregated.to_dict(orient="records")
+    for row in result:
+        row["events"] = int(row["events"])
+        period = row.get("period_start_utc")
+        if period is not None:
+            row["period_start_utc"] = period.to_pydatetime()
+    return result
+
+
+@dataclass
+class EmissionsReport:
+    rows: List[Dict[str, Any]]
+    max_duration_h: float
+    generated_at_utc: datetime
+    data_version: int
+
+
+_cache_lock = threading.Lock()
+_cache: "weakref.WeakKeyDictionary[DataStore, OrderedDict[Tuple[Any, ...], Tuple[float, EmissionsReport]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def emissions(
+    store: DataStore,
+    group_by: Sequence[str] = (),
+    bucket: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    until: str = "report",
+) -> EmissionsReport:
+    """Memoised :func:`compute_emissions` over the store's events.
+
+    Only events detected before ``end`` and at most the duration cap before
+    ``start`` can emit inside the window, so only those are read.
+    """
+    start = _ensure_aware(start) if start is not None else None
+    end = _ensure_aware(end) if end is not None else None
+    cap = max_duration()
+    version = store.version
+    key = (version, tuple(group_by), bucket, start, end, until, cap)
+    with _cache_lock:
+        entries = _cache.setdefault(store, OrderedDict())
+        cached = entries.get(key)
+        if cached is not None and time.monotonic() - cached[0] < EMISSIONS_MAX_AGE_S:
+            entries.move_to_end(key)
+            return cached[1]
+
+    with span("analytics.emissions"):
+        now = datetime.now(timezone.utc)
+        frame = store.backend.events_frame(
+            columns=FRAME_COLUMNS,
+            detected_from=start - cap if start is not None else None,
+            detected_to=end,
+        )
+        result = EmissionsReport(
+            rows=compute_emissions(frame, site_operators(store), group_by, bucket, now, until, cap, start, end),
+            max_duration_h=cap.total_seconds() / 3600,
+            generated_at_utc=now,
+            data_version=version,
+        )
+
+    with _cache_lock:
+        entries = _cache.setdefault(store, OrderedDict())
+        entries[key] = (time.monotonic(), result)
+        entries.move_to_end(key)
+        while len(entries) > MAX_CACHED_REPORTS:
+            entries.popitem(last=False)
+    return result
@@ -0,0 +1,278 @@
+"""Materialised ``EventOut`` JSON, one pre-serialised fragment per event.
+
+Building an ``EventOut`` costs far more than sending one: asset lookup, triage,
+action log, runbook and encoding. The view keeps each event's JSON cut around its
+time-dependent parts and splices them back in per request:
+
+* the triage score, bucket and breakdown depend on the clock only through the
+  recency tier, so they are re-rendered when an event crosses a tier boundary;
+* ``computed_at_utc`` and the SLA ``*_remaining_h`` / ``*_breached`` fields are
+  written in at response time from the cached deadlines.
+
+Everything else is rendered once, and again only after that event changes. The
+store's change listener drops the entries a write touched. A version the listener
+cannot account for (another worker process wrote) or a triage policy reload drops
+them all. A fragment is byte-for-byte what :func:`~app.serialization.dumps` makes of
+:func:`event_out_fields`. At most ``EVENT_VIEW_MAX_EVENTS`` entries are kept
+(default 100000), and the least recently served go first.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+from .metrics import span, timed
+from .schemas import Event
+from .serialization import dumps
+from .triage import PolicySet, TriagePolicy, _ensure_aware, registry as triage_policies, triage_fields
+
+if TYPE_CHECKING:
+    from .store import DataStore, StoreChange
+
+MAX_EVENTS_ENV = "EVENT_VIEW_MAX_EVENTS"
+DEFAULT_MAX_EVENTS = 100_000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_US_PER_HOUR = 3_600 * 10**6
+_HEAD_FIELDS = (*Event.model_fields, "asset")
+_JSON_BOOL = {True: b"true", False: b"false"}
+
+
+@timed("api.build_event_out")
+def event_out_fields(
+    store: DataStore, event: Event, now: Optional[datetime] = None, policies: Optional[PolicySet] = None
+) -> Dict[str, Any]:
+    """``EventOut`` as plain data; the model, the JSON fast path and the view all start here."""
+    fields: Dict[str, Any] = dict(event)
+    fields["asset"] = store.asset_fields(event.site_id)
+    policy = (policies or triage_policies.current()).resolve(event.site_id, fields["asset"]["operator"])
+    fields.update(triage_fields(event, now, policy))
+    fields["action_log"] = store.action_log_fields(event)
+    fields["runbook"] = store.runbook_fields(event)
+    return fields
+
+
+def _microseconds(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+@lru_cache(maxsize=64)
+def _tier_ages(recency_tiers: Tuple[Tuple[float, float], ...]) -> Tuple[float, ...]:
+    return tuple(hours for hours, _ in recency_tiers)
+
+
+def _triage_fragment(fields: Dict[str, Any]) -> bytes:
+    """``,"triage_score":...,"triage_breakdown":{...`` up to (not including) ``computed_at_utc``."""
+    breakdown = dict(fields["triage_breakdown"])
+    del breakdown["computed_at_utc"]  # always the last breakdown key
+    triage = {"triage_score": fields["triage_score"], "triage_bucket": fields["triage_bucket"]}
+    triage["triage_breakdown"] = breakdown
+    return b"," + dumps(triage)[1:-2]
+
+
+@dataclass
+class _Entry:
+    event: Event
+    policy: TriagePolicy
+    head: bytes  # '{"id":...,"asset":{...}'
+    deadlines: bytes  # ',"sla_investigate_deadline_utc":...,"sla_report_deadline_utc":...'
+    tail: bytes  # ',"action_log":[...],"runbook":[...]}'
+    detected_us: int
+    investigate_us: int
+    report_us: int
+    triage: Tuple[int, bytes]  # (recency tier, fragment), replaced as a whole
+    cacheable: bool
+
+    def tier(self, now_us: int) -> int:
+        # Same arithmetic as triage_fields, so tiers flip at exactly the same instant.
+        age_hours = (now_us - self.detected_us) / 10**6 / 3600
+        return bisect_right(_tier_ages(self.policy.recency_tiers), age_hours)
+
+
+class EventOutView:
+    """Cached ``EventOut`` fragments for one store; see the module docstring."""
+
+    def __init__(self, max_events: Optional[int] = None) -> None:
+        self.max_events = max_events or int(os.getenv(MAX_EVENTS_ENV) or DEFAULT_MAX_EVENTS)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.version = -1
+        self.policy_version = -1
+        self.built = 0  # entries rendered from scratch, cached or not
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def apply(self, change: StoreChange) -> None:
+        """Change listener: forget the written events, or everything if a version was missed."""
+        with self._lock:
+            if change.from_version != self.version:
+                self._entries.clear()
+                self.version = -1
+                return
+            for event_id in change.rows:
+                self._entries.pop(event_id, None)
+            self.version = change.to_version
+
+    def sync(self, store: DataStore) -> int:
+        """Drop every entry if the store or the triage policies moved on unseen; returns the version."""
+        version = store.version
+        policy_version = triage_policies.version
+        with self._lock:
+            if version != self.version or policy_version != self.policy_version:
+                self._entries.clear()
+                self.version = version
+                self.policy_version = policy_version
+        return version
+
+    def fragments(
+        self,
+        store: DataStore,
+        event_ids: Sequence[str],
+        now: datetime,
+        breached_only: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[bytes]:
+        """``EventOut`` JSON for each known id in order; unknown ids are left out.
+
+        With ``breached_only`` only events past an SLA deadline at ``now`` are kept.
+        ``limit`` and ``offset`` page over what is left, so only that page is rendered.
+        """
+        version = self.sync(store)
+        now = _ensure_aware(now)
+        now_us = _microseconds(now)
+        with self._lock:
+            entries: List[Optional[_Entry]] = []
+            for event_id in event_ids:
+                entry = self._entries.get(event_id)
+                if entry is not None:
+                    self._entries.move_to_end(event_id)
+                entries.append(entry)
+        missing = [event_id for event_id, entry in zip(event_ids, entries) if entry is None]
+        if missing:
+            built = self._build(store, missing, now)
+            with self._lock:
+                if self.version == version:  # nothing was written while these were built
+                    for event_id, entry in built.items():
+                        if entry.cacheable:
+                            self._entries[event_id] = entry
+                    while len(self._entries) > self.max_events:
+                        self._entries.popitem(last=False)
+            entries = [entry or built.get(event_id) for event_id, entry in zip(event_ids, entries)]
+
+        kept = [
+            entry
+            for entry in entries
+            if entry is not None
+            and (not breached_only or entry.investigate_us < now_us or entry.report_us < now_us)
+        ]
+        with span("eventview.render"):
+            now_json = dumps(now)
+            stop = None if limit is None else offset + limit
+            return [self._render(entry, now, now_us, now_json) for entry in kept[offset:stop]]
+
+    def _build(self, store: DataStore, event_ids: Sequence[str], now: datetime) -> Dict[str, _Entry]:
+        policies = triage_policies.current()
+        now_us = _microseconds(now)
+        built: Dict[str, _Entry] = {}
+        with span("eventview.build"):
+            for event in store.get_events(event_ids):
+                fields = event_out_fields(store, event, now, policies)
+                policy = policies.resolve(event.site_id, fields["asset"]["operator"])
+                entry = _Entry(
+                    event=event,
+                    policy=policy,
+                    head=dumps({name: fields[name] for name in _HEAD_FIELDS})[:-1],
+                    deadlines=b","
+                    + dumps(
+                        {
+                            "sla_investigate_deadline_utc": fields["sla_investigate_deadline_utc"],
+                            "sla_report_deadline_utc": fields["sla_report_deadline_utc"],
+                        }
+                    )[1:-1],
+                    tail=b"," + dumps({"action_log": fields["action_log"], "runbook": fields["runbook"]})[1:],
+                    detected_us=_microseconds(_ensure_aware(event.detected_at_utc)),
+                    investigate_us=_microseconds(fields["sla_investigate_deadline_utc"]),
+                    report_us=_microseconds(fields["sla_report_deadline_utc"]),
+                    triage=(-1, _triage_fragment(fields)),  # tier set below
+                    # Log entries without a timestamp are shown at "now"; those cannot be kept.
+                    cacheable=all(raw.timestamp is not None for raw in event.notes.log_entries()),
+                )
+                entry.triage = (entry.tier(now_us), entry.triage[1])
+                built[event.id] = entry
+        self.built += len(built)
+        return built
+
+    def _render(self, entry: _Entry, now: datetime, now_us: int, now_json: bytes) -> bytes:
+        tier = entry.tier(now_us)
+        triage = entry.triage
+        if triage[0] != tier:  # crossed a recency tier boundary since it was rendered
+            triage = entry.triage = (tier, _triage_fragment(triage_fields(entry.event, now, entry.policy)))
+        investigate_h = (entry.investigate_us - now_us) / _US_PER_HOUR
+        report_h = (entry.report_us - now_us) / _US_PER_HOUR
+        return b"".join(
+            (
+                entry.head,
+                triage[1],
+                b',"computed_at_utc":',
+                now_json,
+                b"}",
+                entry.deadlines,
+                b',"sla_investigate_remaining_h":',
+                orjson.dumps(investigate_h),
+                b',"sla_report_remaining_h":',
+                orjson.dumps(report_h),
+                b',"sla_investigate_breached":',
+                _JSON_BOOL[investigate_h < 0],
+                b',"sla_report_breached":',
+                _JSON_BOOL[report_h < 0],
+                entry.tail,
+            )
+        )
+
+
+_views_lock = threading.Lock()
+_views: "weakref.WeakKeyDictionary[DataStore, EventOutView]" = weakref.WeakKeyDictionary()
+
+
+def view_for(store: DataStore) -> EventOutView:
+    """The store's view, created (and subscribed to its changes) on first use."""
+    with _views_lock:
+        view = _views.get(store)
+        if view is None:
+            view = EventOutView()
+            store.add_change_listener(view.apply)
+            _views[store] = view
+    return view
+
+
+def events_json(
+    store: DataStore,
+    event_ids: Sequence[str],
+    now: datetime,
+    breached_only: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> bytes:
+    """``{"events": [...]}`` for ``GET /api/events`` assembled from the view."""
+    fragments = view_for(store).fragments(store, event_ids, now, breached_only, limit, offset)
+    return b'{"events":[' + b",".join(fragments) + b"]}"
+
+
+def event_json(store: DataStore, event_id: str, now: Optional[datetime] = None) -> bytes:
+    """One ``EventOut`` document; ``KeyError`` if the event does not exist."""
+    fragments = view_for(store).fragments(store, [event_id], now or datetime.now(timezone.utc))
+    if not fragments:
+        raise KeyError(f"Event {event_id} not found")
+    return fragments[0]
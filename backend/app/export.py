@@ -0,0 +1,231 @@
+"""Streaming bulk export of events and their audit trail.
+
+``GET /api/events/export`` walks the store with
+:meth:`~app.backends.EventBackend.iter_events_frames` and encodes each chunk as soon
+as it has been read. The response starts right away, and memory stays bounded by
+``EXPORT_CHUNK_ROWS`` (default 10,000) however many events are exported.
+
+There are two streams:
+
+``events``
+    One flat row per event, with its site's operator. Notes are left out.
+``audit``
+    One row per action-log entry, ordered by time within each event.
+
+Both come as CSV, NDJSON or Parquet. Parquet needs the optional ``pyarrow``
+package and writes one row group per chunk.
+"""
+from __future__ import annotations
+
+import io
+import os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+import orjson
+import pandas as pd
+
+from .backends import DATETIME_COLUMNS, format_iso_column
+from .metrics import span
+from .notes import EventNotes
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .store import DataStore
+
+CHUNK_ROWS_ENV = "EXPORT_CHUNK_ROWS"
+DEFAULT_CHUNK_ROWS = 10_000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EVENT_EXPORT_COLUMNS: List[str] = [
+    "id",
+    "site_id",
+    "operator",
+    "detected_at_utc",
+    "detection_type",
+    "est_ch4_kgph",
+    "confidence",
+    "lat",
+    "lon",
+    "status",
+    "investigation_started_utc",
+    "report_submitted_utc",
+]
+AUDIT_COLUMNS: List[str] = ["event_id", "site_id", "operator", "timestamp_utc", "message"]
+_AUDIT_SOURCE_COLUMNS = ["id", "site_id", "investigation_started_utc", "report_submitted_utc", "notes"]
+# Seed and legacy rows may carry these timestamps without a matching log entry.
+_TIMESTAMP_MESSAGES = ("Investigation started", "Report submitted")
+_UNDATED = datetime.min.replace(tzinfo=timezone.utc)
+_TIMESTAMP_COLUMNS = frozenset(DATETIME_COLUMNS) | {"timestamp_utc"}
+
+
+def _event_rows(chunk: pd.DataFrame, operators: Dict[str, str]) -> pd.DataFrame:
+    chunk.insert(2, "operator", chunk["site_id"].astype(str).map(operators))
+    return chunk
+
+
+def _audit_rows(chunk: pd.DataFrame, operators: Dict[str, str]) -> pd.DataFrame:
+    rows: List[tuple] = []
+    started_at = pd.DatetimeIndex(chunk["investigation_started_utc"]).to_pydatetime()
+    reported_at = pd.DatetimeIndex(chunk["report_submitted_utc"]).to_pydatetime()
+    for event_id, site_id, started, reported, notes in zip(
+        chunk["id"], chunk["site_id"], started_at, reported_at, chunk["notes"]
+    ):
+        entries = [(entry.timestamp, entry.message) for entry in EventNotes.coerce(notes).log_entries()]
+        logged = {message for _, message in entries}
+        for value, message in zip((started, reported), _TIMESTAMP_MESSAGES):
+            if not pd.isna(value) and message not in logged:
+                entries.append((value, message))
+        entries.sort(key=lambda entry: entry[0] or _UNDATED)
+        operator = operators.get(str(site_id))
+        rows.extend((str(event_id), str(site_id), operator, timestamp, message) for timestamp, message in entries)
+    frame = pd.DataFrame.from_records(rows, columns=AUDIT_COLUMNS)
+    frame["timestamp_utc"] = pd.to_datetime(frame["timestamp_utc"], utc=True, cache=False)
+    return frame
+
+
+def _with_iso_datetimes(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.copy()
+    for column in frame.columns:
+        if column in _TIMESTAMP_COLUMNS:
+            frame[column] = format_iso_column(frame[column])
+    return frame
+
+
+def _encode_csv(frames: Iterator[pd.DataFrame], columns: List[str]) -> Iterator[bytes]:
+    header = True
+    for frame in frames:
+        if frame.empty:
+            continue
+        yield _with_iso_datetimes(frame).to_csv(index=False, header=header).encode("utf-8")
+        header = False
+    if header:
+        yield (",".join(columns) + "\n").encode("utf-8")
+
+
+def _encode_ndjson(frames: Iterator[pd.DataFrame], columns: List[str]) -> Iterator[bytes]:
+    for frame in frames:
+        if frame.empty:
+            continue
+        frame = _with_iso_datetimes(frame)
+        # ``tolist`` yields native scalars; orjson writes the remaining NaNs as null.
+        keys = list(frame.columns)
+        values = zip(*(frame[key].tolist() for key in keys))
+        yield b"".join(orjson.dumps(dict(zip(keys, row))) + b"\n" for row in values)
+
+
+class _Spool(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet_type(column: str) -> "pyarrow.DataType":
+    if column in _TIMESTAMP_COLUMNS:
+        return pyarrow.timestamp("us", tz="UTC")
+    if column in {"est_ch4_kgph", "confidence", "lat", "lon"}:
+        return pyarrow.float64()
+    return pyarrow.string()
+
+
+def _encode_parquet(frames: Iterator[pd.DataFrame], columns: List[str]) -> Iterator[bytes]:
+    schema = pyarrow.schema([(column, _parquet_type(column)) for column in columns])
+    spool = _Spool()
+    with pyarrow.parquet.ParquetWriter(spool, schema) as writer:
+        for frame in frames:
+            if frame.empty:
+                continue
+            writer.write_table(pyarrow.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            yield spool.drain()
+    yield spool.drain()
+
+
+_ENCODERS: Dict[str, Callable[[Iterator[pd.DataFrame], List[str]], Iterator[bytes]]] = {
+    "csv": _encode_csv,
+    "ndjson": _encode_ndjson,
+    "parquet": _encode_parquet,
+}
+
+
+def export_filename(stream: str, fmt: str, now: Optional[datetime] = None) -> str:
+    stamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    return f"{stream}-{stamp}.{fmt}"
+
+
+def export_stream(
+    store: DataStore,
+    stream: str = "events",
+    fmt: str = "csv",
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    operator: Optional[str] = None,
+    chunk_rows: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Encoded export body, produced chunk by chunk as it is consumed.
+
+    Raises ``ValueError`` up front for an unknown stream or format, or for Parquet
+    without ``pyarrow``.
+    """
+    if fmt not in _ENCODERS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    if fmt == "parquet" and pyarrow is None:
+        raise ValueError("Parquet export requires the optional pyarrow package")
+    if stream == "events":
+        source_columns = [column for column in EVENT_EXPORT_COLUMNS if column != "operator"]
+        to_rows, columns = _event_rows, EVENT_EXPORT_COLUMNS
+    elif stream == "audit":
+        source_columns, to_rows, columns = _AUDIT_SOURCE_COLUMNS, _audit_rows, AUDIT_COLUMNS
+    else:
+        raise ValueError(f"Unknown export stream {stream!r}")
+
+    operators = {asset.site_id: asset.operator for asset in store.list_assets()}
+    site_ids = [site_id for site_id, name in operators.items() if name == operator] if operator else None
+    chunk_rows = chunk_rows or int(os.getenv(CHUNK_ROWS_ENV) or DEFAULT_CHUNK_ROWS)
+    chunks = store.backend.iter_events_frames(
+        columns=source_columns,
+        site_ids=site_ids,
+        detected_from=start,
+        detected_to=end,
+        status=status,
+        chunk_rows=chunk_rows,
+    )
+
+    def frames() -> Iterator[pd.DataFrame]:
+        while True:
+            with span("export.chunk"):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                rows = to_rows(chunk, operators)
+            yield rows
+
+    return _ENCODERS[fmt](frames(), columns)
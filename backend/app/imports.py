@@ -0,0 +1,256 @@
+"""Background CSV imports.
+
+``POST /api/events/import`` spools the upload to disk and answers at once with a
+job; a single worker thread then feeds the file to
+:meth:`~app.store.DataStore.append_events` in batches of ``IMPORT_BATCH_ROWS`` rows,
+so the store lock is held per batch rather than for the whole upload. Job state is
+mirrored to ``<spool dir>/<job id>.json`` so every worker process on the host can
+answer ``GET /api/imports/{job_id}``.
+
+Rows that fail validation are left out of the import. The first ``MAX_ERRORS``
+failures are listed on the job, and every rejected row is quarantined with its
+reasons to ``<spool dir>/<job id>.rejected.csv``, which is served by
+``GET /api/imports/{job_id}/rejected``.
+
+Importing this module is cheap; pandas is only loaded by the worker.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Optional
+
+from .metrics import span
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .store import DataStore
+    from .validation import ValidationReport
+
+SPOOL_DIR_ENV = "IMPORT_SPOOL_DIR"
+BATCH_ROWS_ENV = "IMPORT_BATCH_ROWS"
+DEFAULT_BATCH_ROWS = 5_000
+MAX_ERRORS = 50
+MAX_JOBS = 200
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class ImportJob:
+    id: str
+    filename: str
+    status: str = "queued"  # queued, running, succeeded or failed
+    rows_processed: int = 0
+    imported: int = 0
+    skipped: int = 0
+    merged: int = 0
+    rejected: int = 0
+    failed_batches: int = 0
+    errors: List[str] = field(default_factory=list)
+    created_at_utc: datetime = field(default_factory=_now)
+    started_at_utc: Optional[datetime] = None
+    finished_at_utc: Optional[datetime] = None
+
+    @property
+    def message(self) -> str:
+        if self.status == "queued":
+            return "Import queued"
+        message = f"Imported {self.imported} event(s); skipped {self.skipped} duplicate(s)"
+        if self.merged:
+            message += f"; merged {self.merged} nearby detection(s)"
+        if self.rejected:
+            message += f"; rejected {self.rejected} invalid row(s)"
+        if self.status == "succeeded" and self.failed_batches:
+            message += f"; {self.failed_batches} batch(es) had errors"
+        if self.status == "running":
+            message = f"Processed {self.rows_processed} row(s) so far. {message}"
+        elif self.status == "failed":
+            message = f"Import failed after {self.rows_processed} row(s): {self.errors[-1]}. {message}"
+        return message
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        for key in ("created_at_utc", "started_at_utc", "finished_at_utc"):
+            data[key] = data[key].isoformat() if data[key] is not None else None
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, text: str) -> "ImportJob":
+        data = json.loads(text)
+        for key in ("created_at_utc", "started_at_utc", "finished_at_utc"):
+            data[key] = datetime.fromisoformat(data[key]) if data[key] is not None else None
+        return cls(**data)
+
+
+class ImportJobManager:
+    """Spools uploads and runs them one at a time on a background thread."""
+
+    def __init__(self, spool_dir: Optional[Path] = None, batch_rows: Optional[int] = None) -> None:
+        self._spool_dir = spool_dir
+        self._batch_rows = batch_rows
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ImportJob] = {}
+        self._futures: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def spool_dir(self) -> Path:
+        configured = os.getenv(SPOOL_DIR_ENV, "").strip()
+        path = self._spool_dir or (Path(configured) if configured else Path(tempfile.gettempdir()) / "og-imports")
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @property
+    def batch_rows(self) -> int:
+        return self._batch_rows or int(os.getenv(BATCH_ROWS_ENV) or DEFAULT_BATCH_ROWS)
+
+    def submit(self, store: DataStore, source: BinaryIO, filename: str) -> ImportJob:
+        """Copy ``source`` to the spool directory and queue it; returns the queued job."""
+        job = ImportJob(id=uuid.uuid4().hex, filename=filename)
+        spool_path = self.spool_dir / f"{job.id}.csv"
+        with spool_path.open("wb") as handle:
+            shutil.copyfileobj(source, handle)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._save(job)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-import")
+            self._futures[job.id] = self._executor.submit(self._run, store, job, spool_path)
+            self._prune()
+            return replace(job, errors=list(job.errors))
+
+    def get(self, job_id: str) -> ImportJob:
+        """Snapshot of a job started by any worker process; ``KeyError`` if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return replace(job, errors=list(job.errors))
+        if not _JOB_ID.match(job_id):
+            raise KeyError(f"Import job {job_id} not found")
+        try:
+            return ImportJob.from_json((self.spool_dir / f"{job_id}.json").read_text())
+        except (OSError, ValueError):
+            raise KeyError(f"Import job {job_id} not found") from None
+
+    def rejected_rows(self, job_id: str) -> Path:
+        """The quarantine CSV of a job; ``KeyError`` if the job is unknown or rejected nothing."""
+        path = self.spool_dir / f"{self.get(job_id).id}.rejected.csv"
+        if not path.exists():
+            raise KeyError(f"Import job {job_id} has no rejected rows")
+        return path
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> ImportJob:
+        """Block until a job submitted here has finished (tests, CLI use)."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout)
+        return self.get(job_id)
+
+    def shutdown(self) -> None:
+        """Finish queued jobs and stop the worker; the next submit starts a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    # ---------- Worker ----------
+    def _run(self, store: DataStore, job: ImportJob, spool_path: Path) -> None:
+        import pandas as pd
+
+        self._update(job, status="running", started_at_utc=_now())
+        try:
+            with span("imports.run"):
+                store.check_import_columns(list(pd.read_csv(spool_path, nrows=0).columns))
+                reader = pd.read_csv(spool_path, chunksize=self.batch_rows)
+                for batch in reader:
+                    first_row = job.rows_processed + 1
+                    try:
+                        result = store.append_events(batch)
+                    except (ValueError, TypeError, KeyError) as exc:
+                        self._record_error(job, f"rows {first_row}-{first_row + len(batch) - 1}: {exc}")
+                        self._update(
+                            job,
+                            rows_processed=job.rows_processed + len(batch),
+                            failed_batches=job.failed_batches + 1,
+                        )
+                        continue
+                    if result.report is not None and result.rejected:
+                        self._quarantine(job, batch, result.report, first_row)
+                    self._update(
+                        job,
+                        rows_processed=job.rows_processed + len(batch),
+                        imported=job.imported + result.imported,
+                        skipped=job.skipped + result.skipped,
+                        merged=job.merged + result.merged,
+                        rejected=job.rejected + result.rejected,
+                    )
+        except Exception as exc:  # unreadable upload, missing columns, store failure
+            logger.exception("CSV import %s failed", job.id)
+            self._record_error(job, str(exc) or type(exc).__name__)
+            self._update(job, status="failed", finished_at_utc=_now())
+        else:
+            self._update(job, status="succeeded", finished_at_utc=_now())
+        finally:
+            spool_path.unlink(missing_ok=True)
+
+    def _quarantine(self, job: ImportJob, batch: pd.DataFrame, report: ValidationReport, first_row: int) -> None:
+        import numpy as np
+
+        row_numbers = np.arange(first_row, first_row + len(batch))
+        with self._lock:
+            room = MAX_ERRORS - len(job.errors)
+        for message in report.messages(row_numbers, limit=max(room, 0)):
+            self._record_error(job, message)
+        positions = np.flatnonzero(~report.valid)
+        rejected = batch.iloc[positions].copy()
+        rejected.insert(0, "row", row_numbers[positions])
+        rejected["errors"] = report.reasons().to_numpy()
+        path = self.spool_dir / f"{job.id}.rejected.csv"
+        rejected.to_csv(path, mode="a", header=not path.exists(), index=False)
+
+    def _record_error(self, job: ImportJob, message: str) -> None:
+        with self._lock:
+            if len(job.errors) < MAX_ERRORS:
+                job.errors.append(message)
+
+    def _update(self, job: ImportJob, **changes: object) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            self._save(job)
+
+    def _save(self, job: ImportJob) -> None:
+        path = self.spool_dir / f"{job.id}.json"
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(job.to_json())
+        os.replace(tmp_path, path)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at_utc is not None]
+        for job_id in finished[: max(0, len(self._jobs) - MAX_JOBS)]:
+            del self._jobs[job_id]
+            self._futures.pop(job_id, None)
+            (self.spool_dir / f"{job_id}.json").unlink(missing_ok=True)
+            (self.spool_dir / f"{job_id}.rejected.csv").unlink(missing_ok=True)
+
+
+import_jobs = ImportJobManager()
@@ -0,0 +1,171 @@
+"""Streaming NDJSON ingest for continuous sensors.
+
+Each line of the request body is one detection with the ``events.csv`` columns as
+JSON fields. Lines are validated as they arrive and grouped into micro-batches that
+close after ``STREAM_BATCH_ROWS`` detections or ``STREAM_BATCH_INTERVAL_S`` seconds,
+whichever comes first. Each batch is a single
+:meth:`~app.store.DataStore.append_events` call, so one transaction and one persist.
+Rows the store rejects (an unknown site, say) count as rejected lines.
+
+A bounded queue sits between the socket reader and the batch writer. While a batch
+is being written the reader pauses once the queue is full, which stops reading the
+socket and pushes back on the sender through TCP flow control.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterable, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+import pandas as pd
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import span
+from .schemas import DetectionIn
+
+if TYPE_CHECKING:
+    from .store import DataStore
+
+BATCH_ROWS_ENV = "STREAM_BATCH_ROWS"
+BATCH_INTERVAL_ENV = "STREAM_BATCH_INTERVAL_S"
+DEFAULT_BATCH_ROWS = 1_000
+DEFAULT_BATCH_INTERVAL_S = 1.0
+MAX_LINE_BYTES = 64 * 1024
+MAX_QUEUED_CHUNKS = 16
+MAX_ERRORS = 50
+
+Line = Tuple[int, bytes]
+
+
+@dataclass
+class IngestSummary:
+    received: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    batches: int = 0
+    imported: int = 0
+    skipped: int = 0
+    merged: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, message: str) -> None:
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(message)
+
+
+def parse_detection(line: bytes) -> Dict[str, Any]:
+    """Validate one NDJSON line; raises ``ValueError`` with a readable reason."""
+    try:
+        payload = orjson.loads(line)
+    except orjson.JSONDecodeError as exc:
+        raise ValueError(f"invalid JSON ({exc})") from None
+    try:
+        return DetectionIn.model_validate(payload).model_dump()
+    except ValidationError as exc:
+        first = exc.errors()[0]
+        location = ".".join(str(part) for part in first["loc"]) or "line"
+        raise ValueError(f"{location}: {first['msg']}") from None
+
+
+async def _read_lines(
+    chunks: AsyncIterable[bytes], queue: "asyncio.Queue[Optional[List[Line]]]", summary: IngestSummary
+) -> None:
+    """Split the body into numbered lines, one queue item per received chunk."""
+    buffer = b""
+    line_number = 0
+    try:
+        async for chunk in chunks:
+            buffer += chunk
+            *complete, buffer = buffer.split(b"\n")
+            lines: List[Line] = []
+            for raw in complete:
+                line_number += 1
+                if raw.strip():
+                    lines.append((line_number, raw))
+            if lines:
+                await queue.put(lines)
+            if len(buffer) > MAX_LINE_BYTES:
+                summary.add_error(f"line {line_number + 1}: longer than {MAX_LINE_BYTES} bytes")
+                break
+        else:
+            if buffer.strip():
+                await queue.put([(line_number + 1, buffer)])
+    except Exception as exc:  # client went away mid-stream; keep what was received
+        summary.add_error(f"stream interrupted: {exc or type(exc).__name__}")
+    finally:
+        await queue.put(None)
+
+
+async def ingest_ndjson(
+    store: DataStore,
+    chunks: AsyncIterable[bytes],
+    batch_rows: Optional[int] = None,
+    batch_interval_s: Optional[float] = None,
+) -> IngestSummary:
+    """Consume an NDJSON body and append it to ``store`` in micro-batches."""
+    batch_rows = batch_rows or int(os.getenv(BATCH_ROWS_ENV) or DEFAULT_BATCH_ROWS)
+    if batch_interval_s is None:
+        batch_interval_s = float(os.getenv(BATCH_INTERVAL_ENV) or DEFAULT_BATCH_INTERVAL_S)
+    summary = IngestSummary()
+    queue: "asyncio.Queue[Optional[List[Line]]]" = asyncio.Queue(maxsize=MAX_QUEUED_CHUNKS)
+    reader = asyncio.create_task(_read_lines(chunks, queue, summary))
+    loop = asyncio.get_running_loop()
+    pending: List[Dict[str, Any]] = []
+    pending_lines: List[int] = []
+    deadline = 0.0
+
+    async def flush() -> None:
+        batch = pd.DataFrame.from_records(pending, columns=list(DetectionIn.model_fields))
+        line_numbers = np.array(pending_lines)
+        pending.clear()
+        pending_lines.clear()
+        try:
+            with span("ingest.batch"):
+                result = await run_in_threadpool(store.append_events, batch)
+        except (ValueError, TypeError, KeyError) as exc:
+            summary.rejected += len(batch)
+            summary.add_error(f"batch {summary.batches + 1}: {exc}")
+            return
+        summary.batches += 1
+        summary.accepted += len(batch) - result.rejected
+        summary.rejected += result.rejected
+        if result.report is not None and result.rejected:
+            for message in result.report.messages(line_numbers, MAX_ERRORS - len(summary.errors), label="line"):
+                summary.add_error(message)
+        summary.imported += result.imported
+        summary.skipped += result.skipped
+        summary.merged += result.merged
+
+    try:
+        while True:
+            timeout = max(0.0, deadline - loop.time()) if pending else None
+            try:
+                lines = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await flush()
+                continue
+            if lines is None:
+                break
+            for line_number, raw in lines:
+                summary.received += 1
+                try:
+                    record = parse_detection(raw)
+                except ValueError as exc:
+                    summary.rejected += 1
+                    summary.add_error(f"line {line_number}: {exc}")
+                    continue
+                if not pending:
+                    deadline = loop.time() + batch_interval_s
+                pending.append(record)
+                pending_lines.append(line_number)
+                if len(pending) >= batch_rows:
+                    await flush()
+        if pending:
+            await flush()
+    finally:
+        reader.cancel()
+    return summary
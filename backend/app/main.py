@@ -1,29 +1,79 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import List, Optional
+import asyncio
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 
-from fastapi import Body, FastAPI, File, HTTPException, UploadFile
+from fastapi import Body, Depends, FastAPI, File, Header, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
+from .dependencies import get_store, require_admin, shutdown_store, start_store_warmup, warmup_enabled
+from .imports import ImportJob, import_jobs
+from .metrics import MetricsMiddleware, registry as metrics_registry
+from .notifications import start_deadline_notifications
 from .pdf import generate_event_report_pdf
+from .profiling import PROFILE_ID_HEADER, ProfilingMiddleware, StackSampler, profiles
 from .schemas import (
+    AnalyticsRollup,
     Asset,
-    CSVImportResult,
+    BucketTransition,
+    BulkActionRequest,
+    BulkActionResult,
+    BulkItemResult,
+    DetectionIn,
+    EmissionsBucket,
+    EmissionsSummary,
+    EmissionsUntil,
     Event,
     EventOut,
     EventStatus,
     EventsResponse,
+    ExportFormat,
+    ExportStream,
+    ImportJobStatus,
+    LockStats,
+    ProfileFunction,
+    ProfileSummary,
+    RollupBucket,
+    RollupGroup,
     RunbookCompletionRequest,
+    SearchHit,
+    SearchResults,
+    SimulatedEventChange,
+    StreamIngestResult,
+    TriageSimulationRequest,
+    TriageSimulationResult,
     AIRequest,
     AIResponse,
 )
-from .store import DataStore, CSVAppendResult, store
 from . import ai
-from .triage import evaluate_event
+from .compression import CompressionMiddleware
+from .eventview import event_json, event_out_fields, events_json
+from .search import search_events
+from .serialization import ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, list_response, negotiate_media_type
+from .triage import _ensure_aware, evaluate_event, registry as triage_policies
 
-app = FastAPI(title="OG Emissions Control Tower Demo", version="0.1.0")
+if TYPE_CHECKING:
+    from .store import DataStore
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    if warmup_enabled():
+        start_store_warmup()
+    notifications = start_deadline_notifications(get_store)
+    yield
+    if notifications is not None:
+        notifications.stop()
+    import_jobs.shutdown()
+    shutdown_store()
+
+
+app = FastAPI(title="OG Emissions Control Tower Demo", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,76 +81,121 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=False,
+    expose_headers=["Server-Timing", "Location", PROFILE_ID_HEADER],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 
 
-def _build_event_out(store: DataStore, event: Event) -> EventOut:
-    asset = store.get_asset(event.site_id)
-    (
-        triage_score,
-        triage_bucket,
-        breakdown,
-        investigate_deadline,
-        report_deadline,
-        investigate_remaining_h,
-        report_remaining_h,
-    ) = evaluate_event(event)
-
-    action_log = store.build_action_log(event)
-    runbook = store.build_runbook(event)
-
-    return EventOut(
-        **event.model_dump(),
-        asset=asset,
-        triage_score=triage_score,
-        triage_bucket=triage_bucket,
-        triage_breakdown=breakdown,
-        sla_investigate_deadline_utc=investigate_deadline,
-        sla_report_deadline_utc=report_deadline,
-        sla_investigate_remaining_h=investigate_remaining_h,
-        sla_report_remaining_h=report_remaining_h,
-        sla_investigate_breached=investigate_remaining_h < 0,
-        sla_report_breached=report_remaining_h < 0,
-        action_log=action_log,
-        runbook=runbook,
-    )
+def _build_event_out(store: DataStore, event: Event, now: Optional[datetime] = None) -> EventOut:
+    return EventOut(**event_out_fields(store, event, now))
+
+
+def _time_window(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Query bounds in UTC (values without an offset are taken as UTC); 400 if inverted."""
+    start = _ensure_aware(start) if start is not None else None
+    end = _ensure_aware(end) if end is not None else None
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="'start' must not be after 'end'")
+    return start, end
 
 
 @app.get("/api/assets", response_model=List[Asset])
-def get_assets() -> List[Asset]:
+def get_assets(store: DataStore = Depends(get_store)) -> List[Asset]:
     return store.list_assets()
 
 
-@app.get("/api/events", response_model=EventsResponse)
+@app.get(
+    "/api/events",
+    response_model=EventsResponse,
+    responses={
+        200: {
+            "content": {
+                MSGPACK_MEDIA_TYPE: {},
+                ARROW_MEDIA_TYPE: {"description": "Arrow IPC stream, one row per event"},
+            }
+        }
+    },
+)
 def get_events(
     status: Optional[EventStatus] = None,
     sla_breached_only: bool = False,
-) -> EventsResponse:
-    events = store.list_events()
-    filtered: List[EventOut] = []
-    for event in events:
-        if status and event.status != status:
-            continue
-        event_out = _build_event_out(store, event)
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    accept: Optional[str] = Header(None),
+    store: DataStore = Depends(get_store),
+) -> Response:
+    now = datetime.now(timezone.utc)
+    query: Dict[str, Any] = {"status": status, "limit": limit, "offset": offset}
+    page: Dict[str, Any] = {}
+    if sla_breached_only:
+        # Every SLA breach implies the (earlier) investigate deadline has passed, so the
+        # backend can discard events younger than the shortest one before triage runs.
+        # Deadlines depend on each event's policy, so the exact test runs on every
+        # remaining candidate and the page is cut from what passes it.
+        query["detected_before"] = now - triage_policies.current().min_investigate_sla
+        page = {"limit": query.pop("limit"), "offset": query.pop("offset")}
+    if negotiate_media_type(accept) == JSON_MEDIA_TYPE:
+        # JSON is spliced together from the materialised per-event fragments.
+        body = events_json(store, store.list_event_ids(**query), now, breached_only=sla_breached_only, **page)
+        return Response(body, media_type=JSON_MEDIA_TYPE, headers={"Vary": "Accept"})
+    payload: List[Dict[str, Any]] = []
+    for event in store.list_events(**query):
+        fields = event_out_fields(store, event, now)
         if sla_breached_only and not (
-            event_out.sla_investigate_breached or event_out.sla_report_breached
+            fields["sla_investigate_breached"] or fields["sla_report_breached"]
         ):
             continue
-        filtered.append(event_out)
-    return EventsResponse(events=filtered)
+        payload.append(fields)
+    if page:
+        stop = None if page["limit"] is None else page["offset"] + page["limit"]
+        payload = payload[page["offset"] : stop]
+    # The fields come from validated events, so skip response-model validation.
+    return list_response("events", payload, accept)
+
+
+@app.get(
+    "/api/events/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}, "application/vnd.apache.parquet": {}}}},
+)
+def export_events(
+    format: ExportFormat = "csv",
+    stream: ExportStream = "events",
+    status: Optional[EventStatus] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    operator: Optional[str] = None,
+    store: DataStore = Depends(get_store),
+) -> StreamingResponse:
+    from .export import MEDIA_TYPES, export_filename, export_stream  # pandas-backed; keep it out of app startup.
+
+    start, end = _time_window(start, end)
+    try:
+        body = export_stream(store, stream, format, status=status, start=start, end=end, operator=operator)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(stream, format)}"'},
+    )
 
 
 @app.get("/api/events/{event_id}", response_model=EventOut)
-def get_event_detail(event_id: str) -> EventOut:
+def get_event_detail(event_id: str, store: DataStore = Depends(get_store)) -> Response:
     try:
-        event = store.get_event(event_id)
+        body = event_json(store, event_id)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return _build_event_out(store, event)
+    return Response(body, media_type=JSON_MEDIA_TYPE)
 
 
 @app.post("/api/events/{event_id}/investigate", response_model=EventOut)
-def start_investigation(event_id: str) -> EventOut:
+def start_investigation(event_id: str, store: DataStore = Depends(get_store)) -> EventOut:
     try:
         updated = store.set_investigation_started(event_id, datetime.now(timezone.utc))
     except KeyError as exc:
@@ -109,7 +204,7 @@ def start_investigation(event_id: str) -> EventOut:
 
 
 @app.post("/api/events/{event_id}/report", response_model=EventOut)
-def submit_report(event_id: str) -> EventOut:
+def submit_report(event_id: str, store: DataStore = Depends(get_store)) -> EventOut:
     try:
         updated = store.set_report_submitted(event_id, datetime.now(timezone.utc))
     except KeyError as exc:
@@ -118,7 +213,11 @@ def submit_report(event_id: str) -> EventOut:
 
 
 @app.post("/api/events/{event_id}/runbook", response_model=EventOut)
-def complete_runbook_item(event_id: str, payload: RunbookCompletionRequest) -> EventOut:
+def complete_runbook_item(
+    event_id: str,
+    payload: RunbookCompletionRequest,
+    store: DataStore = Depends(get_store),
+) -> EventOut:
     try:
         updated, _ = store.complete_runbook_item(event_id, payload.item_id, datetime.now(timezone.utc))
     except KeyError as exc:
@@ -126,26 +225,194 @@ def complete_runbook_item(event_id: str, payload: RunbookCompletionRequest) -> E
     return _build_event_out(store, updated)
 
 
-@app.post("/api/events/import", response_model=CSVImportResult)
-async def import_events(file: UploadFile = File(...)) -> CSVImportResult:
+MAX_BULK_EVENTS = 5000
+
+
+@app.post("/api/events/bulk", response_model=BulkActionResult)
+def bulk_event_action(payload: BulkActionRequest, store: DataStore = Depends(get_store)) -> BulkActionResult:
+    if payload.ids is not None:
+        event_ids = payload.ids
+    else:
+        event_ids = store.matching_event_ids(
+            status=payload.filter.status,
+            site_ids=payload.filter.site_ids,
+            detected_before=payload.filter.detected_before,
+        )
+    if len(event_ids) > MAX_BULK_EVENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{len(event_ids)} events selected; at most {MAX_BULK_EVENTS} per request",
+        )
+    outcomes = store.bulk_transition(payload.action, event_ids, datetime.now(timezone.utc), item_id=payload.item_id)
+    results = [BulkItemResult(id=item.event_id, outcome=item.outcome, status=item.status) for item in outcomes]
+    counts = {"updated": 0, "unchanged": 0, "not_found": 0}
+    for item in outcomes:
+        counts[item.outcome] += 1
+    return BulkActionResult(action=payload.action, results=results, **counts)
+
+
+def _import_job_out(job: ImportJob) -> ImportJobStatus:
+    return ImportJobStatus(**asdict(job), message=job.message)
+
+
+@app.post("/api/events/import", response_model=ImportJobStatus, status_code=202)
+async def import_events(
+    response: Response,
+    file: UploadFile = File(...),
+    store: DataStore = Depends(get_store),
+) -> ImportJobStatus:
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV uploads are supported")
-    content = await file.read()
+    # Spool to disk off the event loop; parsing and merging happen on the import worker.
+    job = await run_in_threadpool(import_jobs.submit, store, file.file, file.filename)
+    response.headers["Location"] = f"/api/imports/{job.id}"
+    return _import_job_out(job)
+
+
+@app.post(
+    "/api/events/stream",
+    response_model=StreamIngestResult,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/x-ndjson": {"schema": DetectionIn.model_json_schema()}},
+            "description": "One detection per line; the body may stay open for as long as the sensor streams.",
+        }
+    },
+)
+async def stream_events(request: Request, store: DataStore = Depends(get_store)) -> StreamIngestResult:
+    from .ingest import ingest_ndjson  # pandas-backed; keep it out of app startup.
+
+    summary = await ingest_ndjson(store, request.stream())
+    return StreamIngestResult(**asdict(summary))
+
+
+@app.get("/api/imports/{job_id}", response_model=ImportJobStatus)
+def get_import_job(job_id: str) -> ImportJobStatus:
     try:
-        result: CSVAppendResult = store.append_events_from_csv(content)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return CSVImportResult(
-        imported=result.imported,
-        skipped=result.skipped,
-        message=f"Imported {result.imported} event(s); skipped {result.skipped} duplicate(s)",
+        return _import_job_out(import_jobs.get(job_id))
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@app.get("/api/imports/{job_id}/rejected", response_class=FileResponse)
+def get_import_rejected_rows(job_id: str) -> FileResponse:
+    try:
+        path = import_jobs.rejected_rows(job_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return FileResponse(path, media_type="text/csv", filename=f"import-{job_id}-rejected.csv")
+
+
+@app.get("/api/analytics/rollup", response_model=AnalyticsRollup)
+def analytics_rollup(
+    group_by: List[RollupGroup] = Query([]),
+    bucket: Optional[RollupBucket] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    store: DataStore = Depends(get_store),
+) -> AnalyticsRollup:
+    from .analytics import rollup  # pandas-backed; keep it out of app startup.
+
+    start, end = _time_window(start, end)
+    result = rollup(store, group_by=group_by, bucket=bucket, start=start, end=end)
+    return AnalyticsRollup(
+        group_by=group_by,
+        bucket=bucket,
+        start=start,
+        end=end,
+        generated_at_utc=result.generated_at_utc,
+        data_version=result.data_version,
+        rows=result.rows,
     )
 
 
+@app.get("/api/analytics/emissions", response_model=EmissionsSummary)
+def analytics_emissions(
+    group_by: List[RollupGroup] = Query([]),
+    bucket: Optional[EmissionsBucket] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    until: EmissionsUntil = "report",
+    store: DataStore = Depends(get_store),
+) -> EmissionsSummary:
+    from .emissions import emissions  # pandas-backed; keep it out of app startup.
+
+    start, end = _time_window(start, end)
+    result = emissions(store, group_by=group_by, bucket=bucket, start=start, end=end, until=until)
+    return EmissionsSummary(
+        group_by=group_by,
+        bucket=bucket,
+        start=start,
+        end=end,
+        until=until,
+        max_duration_h=result.max_duration_h,
+        generated_at_utc=result.generated_at_utc,
+        data_version=result.data_version,
+        rows=result.rows,
+    )
+
+
+@app.get("/api/search", response_model=SearchResults)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    store: DataStore = Depends(get_store),
+) -> SearchResults:
+    result = search_events(store, q, limit)
+    return SearchResults(
+        query=result.query,
+        total=result.total,
+        data_version=result.data_version,
+        hits=[
+            SearchHit(id=hit.event_id, site_id=hit.site_id, status=hit.status, score=hit.score, matches=hit.matches)
+            for hit in result.hits
+        ],
+    )
+
+
+@app.post("/api/triage/simulate", response_model=TriageSimulationResult)
+def simulate_triage_policy(
+    payload: TriageSimulationRequest, store: DataStore = Depends(get_store)
+) -> TriageSimulationResult:
+    from .scoring import scorer  # numpy/pandas-backed; keep it out of app startup.
+
+    try:
+        candidate = triage_policies.current().with_overrides(payload.policy)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid triage policy: {exc}") from exc
+    result = scorer.simulate(store, candidate)
+    listed = result.changed.head(payload.limit)
+    # Breakdowns come from the scalar evaluator, so they match what GET /api/events would show.
+    events = {event.id: event for event in store.get_events(listed["id"].tolist())}
+    changes: List[SimulatedEventChange] = []
+    for row in listed.to_dict(orient="records"):
+        event = events.get(row["id"])
+        if event is None:
+            continue
+        policy = candidate.resolve(event.site_id, store.asset_fields(event.site_id)["operator"])
+        row["simulated_breakdown"] = evaluate_event(event, result.computed_at_utc, policy)[2]
+        changes.append(SimulatedEventChange(**row))
+    return TriageSimulationResult(
+        computed_at_utc=result.computed_at_utc,
+        evaluated=result.evaluated,
+        changed=len(result.changed),
+        bucket_changes=result.bucket_changes,
+        sla_changes=result.sla_changes,
+        transitions=[
+            BucketTransition(from_bucket=before, to_bucket=after, count=count)
+            for (before, after), count in result.transitions.items()
+        ],
+        events=changes,
+        truncated=len(result.changed) > len(listed),
+    )
 
 
 @app.post('/api/events/{event_id}/assistant', response_model=AIResponse)
-def get_event_assistant(event_id: str, payload: AIRequest | None = Body(default=None)) -> AIResponse:
+def get_event_assistant(
+    event_id: str,
+    payload: AIRequest | None = Body(default=None),
+    store: DataStore = Depends(get_store),
+) -> AIResponse:
     if not ai.ai_client.is_configured:
         raise HTTPException(status_code=503, detail='AI assistant is unavailable in this environment.')
     try:
@@ -161,7 +428,7 @@ def get_event_assistant(event_id: str, payload: AIRequest | None = Body(default=
     return AIResponse(model=result.model, content=result.content, usage=result.usage)
 
 @app.get("/api/events/{event_id}/report.pdf")
-def download_event_report(event_id: str) -> Response:
+def download_event_report(event_id: str, store: DataStore = Depends(get_store)) -> Response:
     try:
         event = store.get_event(event_id)
     except KeyError as exc:
@@ -178,6 +445,61 @@ def download_event_report(event_id: str) -> Response:
     )
 
 
+@app.post("/api/admin/profile", response_model=ProfileSummary, dependencies=[Depends(require_admin)])
+async def capture_profile(
+    seconds: float = Query(5.0, gt=0, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    store: DataStore = Depends(get_store),
+) -> ProfileSummary:
+    wait_before = store.lock_stats().total_wait_s
+    sampler = StackSampler(interval_s=interval_ms / 1000).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = await run_in_threadpool(sampler.stop)
+    profiles.add(profile)
+    return ProfileSummary(
+        id=profile.id,
+        duration_s=profile.duration_s,
+        interval_ms=interval_ms,
+        samples=profile.samples,
+        lock_wait_s=store.lock_stats().total_wait_s - wait_before,
+        top_functions=[ProfileFunction(**asdict(stat)) for stat in profile.top_functions()],
+    )
+
+
+@app.get("/api/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def download_profile(profile_id: str, format: Literal["folded", "pstats"] = "folded") -> Response:
+    try:
+        profile = profiles.get(profile_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found") from exc
+    if format == "pstats":
+        return Response(
+            content=profile.to_pstats(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f"attachment; filename={profile_id}.pstats"},
+        )
+    return Response(
+        content=profile.to_folded(),
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename={profile_id}.folded"},
+    )
+
+
+@app.get("/api/admin/lock-stats", response_model=LockStats, dependencies=[Depends(require_admin)])
+def lock_stats(store: DataStore = Depends(get_store)) -> LockStats:
+    return LockStats(**asdict(store.lock_stats()))
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        metrics_registry.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get("/healthz")
 def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
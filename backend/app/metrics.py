@@ -0,0 +1,220 @@
+"""Lightweight latency instrumentation: route histograms, named spans, Server-Timing.
+
+Enable with ``METRICS_ENABLED=1``. When disabled, :func:`span` hands back a shared
+no-op context manager and :class:`MetricsMiddleware` passes requests straight
+through, so the instrumented hot paths pay only an attribute check.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+METRICS_ENV = "METRICS_ENABLED"
+
+HTTP_METRIC = "og_http_request_duration_seconds"
+SPAN_METRIC = "og_span_duration_seconds"
+METRIC_HELP = {
+    HTTP_METRIC: "HTTP request latency by method, route template and status code.",
+    SPAN_METRIC: "Duration of named spans inside request handling.",
+}
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Render all histograms in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            items = sorted(self._histograms.items())
+        current: Optional[str] = None
+        for (name, labels), histogram in items:
+            if name != current:
+                current = name
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            with histogram._lock:
+                counts = list(histogram.counts)
+                total, count = histogram.total, histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip((*histogram.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels((*labels, ('le', le)))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels) + "}"
+
+
+registry = MetricsRegistry(
+    enabled=os.getenv(METRICS_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+)
+
+
+class RequestTimings:
+    """Per-request span totals used to build the ``Server-Timing`` header."""
+
+    __slots__ = ("durations",)
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.durations.get(name)
+        if entry is None:
+            self.durations[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self, total_seconds: float) -> str:
+        parts = [f"app;dur={total_seconds * 1000:.2f}"]
+        for name, (seconds, count) in self.durations.items():
+            parts.append(f'{name};dur={seconds * 1000:.2f};desc="x{int(count)}"')
+        return ", ".join(parts)
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+_NOOP: ContextManager[None] = nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.started = perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        record_duration(self.name, perf_counter() - self.started)
+
+
+def record_duration(name: str, seconds: float) -> None:
+    """Record an externally measured span (callers check ``registry.enabled`` first)."""
+    registry.observe(SPAN_METRIC, (("span", name),), seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def span(name: str) -> ContextManager[None]:
+    """Time a block under ``name`` when metrics are enabled."""
+    if not registry.enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of :func:`span`."""
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class MetricsMiddleware:
+    """Records per-route latency and adds a ``Server-Timing`` header to responses."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        started = perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.header(perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            route = scope.get("route")
+            registry.observe(
+                HTTP_METRIC,
+                (
+                    ("method", scope["method"]),
+                    ("route", getattr(route, "path", "unmatched")),
+                    ("status", str(status_code)),
+                ),
+                perf_counter() - started,
+            )
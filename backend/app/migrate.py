@@ -0,0 +1,66 @@
+"""Copy ``events.csv`` into the SQLite events backend.
+
+Usage::
+
+    python -m app.migrate --data-dir data --db data/events.sqlite3
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+from .backends import DATETIME_COLUMNS, DEFAULT_SQLITE_FILENAME, SQLiteEventBackend
+from .notes import EventNotes
+from .store import DEFAULT_DATA_DIR
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def migrate_csv_to_sqlite(csv_path: Path, db_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple[int, int]:
+    """Stream ``csv_path`` into ``db_path`` chunk by chunk; returns (migrated, skipped)."""
+    backend = SQLiteEventBackend(db_path)
+    migrated = 0
+    skipped = 0
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            for column in DATETIME_COLUMNS:
+                if column in chunk.columns:
+                    chunk[column] = pd.to_datetime(chunk[column], utc=True, errors="coerce")
+            chunk["id"] = chunk["id"].astype(str)
+            if "notes" in chunk.columns:
+                chunk["notes"] = chunk["notes"].apply(EventNotes.coerce)
+            existing = backend.existing_ids(chunk["id"])
+            fresh = chunk[~chunk["id"].isin(existing)].drop_duplicates(subset="id")
+            skipped += len(chunk) - len(fresh)
+            backend.insert_events(fresh.to_dict(orient="records"))
+            migrated += len(fresh)
+    finally:
+        backend.close()
+    return migrated, skipped
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Migrate events.csv into a SQLite events database.")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Directory containing events.csv")
+    parser.add_argument("--db", type=Path, default=None, help="Target SQLite file (default: <data-dir>/events.sqlite3)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    csv_path = args.data_dir / "events.csv"
+    db_path: Path = args.db or args.data_dir / DEFAULT_SQLITE_FILENAME
+    if not csv_path.exists():
+        parser.error(f"{csv_path} does not exist")
+
+    migrated, skipped = migrate_csv_to_sqlite(csv_path, db_path, chunk_size=args.chunk_size)
+    summary: List[str] = [f"Migrated {migrated} event(s) into {db_path}"]
+    if skipped:
+        summary.append(f"skipped {skipped} already present")
+    print("; ".join(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
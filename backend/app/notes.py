@@ -0,0 +1,273 @@
+"""Compact, append-only representation of an event's notes.
+
+Notes used to travel as ``Dict[str, List[Dict[str, str]]]`` and were deep-copied on
+every read and mutation and re-parsed whenever the action log was rendered. Here each
+entry is a small ``__slots__`` object whose timestamp is parsed once, and
+:class:`EventNotes` values are immutable views over shared, append-only lists: adding
+an entry returns a new view that shares every existing entry with the old one.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+NOTE_SECTIONS: Tuple[str, ...] = ("runbook_completed", "log", "duplicates")
+
+
+def parse_timestamp(text: str) -> Optional[datetime]:
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def format_timestamp(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class LogEntry:
+    __slots__ = ("message", "timestamp_utc", "timestamp")
+
+    def __init__(self, message: str, timestamp_utc: str, timestamp: Optional[datetime] = None) -> None:
+        self.message = message
+        self.timestamp_utc = timestamp_utc
+        self.timestamp = timestamp if timestamp is not None else parse_timestamp(timestamp_utc)
+
+    @classmethod
+    def at(cls, message: str, timestamp: datetime) -> "LogEntry":
+        return cls(message, format_timestamp(timestamp), timestamp)
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> "LogEntry":
+        return cls(str(raw.get("message", "")), str(raw.get("timestamp_utc", "")))
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"message": self.message, "timestamp_utc": self.timestamp_utc}
+
+
+class RunbookCompletion:
+    __slots__ = ("item_id", "timestamp_utc", "timestamp")
+
+    def __init__(self, item_id: str, timestamp_utc: str, timestamp: Optional[datetime] = None) -> None:
+        self.item_id = item_id
+        self.timestamp_utc = timestamp_utc
+        self.timestamp = timestamp if timestamp is not None else parse_timestamp(timestamp_utc)
+
+    @classmethod
+    def at(cls, item_id: str, timestamp: datetime) -> "RunbookCompletion":
+        return cls(item_id, format_timestamp(timestamp), timestamp)
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> "RunbookCompletion":
+        return cls(str(raw.get("id", "")), str(raw.get("timestamp_utc", "")))
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"id": self.item_id, "timestamp_utc": self.timestamp_utc}
+
+
+class DuplicateRecord:
+    __slots__ = ("event_id", "detection_type", "detected_at_utc", "est_ch4_kgph", "confidence")
+
+    def __init__(
+        self,
+        event_id: str,
+        detection_type: str,
+        detected_at_utc: str,
+        est_ch4_kgph: str,
+        confidence: str,
+    ) -> None:
+        self.event_id = event_id
+        self.detection_type = detection_type
+        self.detected_at_utc = detected_at_utc
+        self.est_ch4_kgph = est_ch4_kgph
+        self.confidence = confidence
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> "DuplicateRecord":
+        return cls(
+            str(raw.get("id", "")),
+            str(raw.get("detection_type", "")),
+            str(raw.get("detected_at_utc", "")),
+            str(raw.get("est_ch4_kgph", "")),
+            str(raw.get("confidence", "")),
+        )
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "id": self.event_id,
+            "detection_type": self.detection_type,
+            "detected_at_utc": self.detected_at_utc,
+            "est_ch4_kgph": self.est_ch4_kgph,
+            "confidence": self.confidence,
+        }
+
+
+_ENTRY_TYPES = {
+    "runbook_completed": RunbookCompletion,
+    "log": LogEntry,
+    "duplicates": DuplicateRecord,
+}
+
+
+class EventNotes(Mapping[str, List[Dict[str, str]]]):
+    """Immutable view over append-only note sections.
+
+    Each section is a list shared between versions plus the length visible to this
+    version, so readers keep a stable view while writers append. Appending to an
+    outdated version forks the section instead of clobbering the newer one.
+
+    As a ``Mapping`` it still reads like the legacy ``{"log": [{...}], ...}`` dict.
+    """
+
+    __slots__ = ("_entries", "_lengths", "_json", "_plain")
+
+    def __init__(
+        self,
+        entries: Optional[Tuple[List[Any], ...]] = None,
+        lengths: Optional[Tuple[int, ...]] = None,
+    ) -> None:
+        self._entries: Tuple[List[Any], ...] = entries if entries is not None else tuple([] for _ in NOTE_SECTIONS)
+        self._lengths: Tuple[int, ...] = (
+            lengths if lengths is not None else tuple(len(items) for items in self._entries)
+        )
+        self._json: Optional[str] = None
+        self._plain: Optional[Dict[str, List[Dict[str, str]]]] = None
+
+    # ---------- Construction ----------
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> "EventNotes":
+        entries: List[List[Any]] = []
+        for section in NOTE_SECTIONS:
+            items = raw.get(section, [])
+            entry_type = _ENTRY_TYPES[section]
+            entries.append(
+                [entry_type.from_dict(item) for item in items if isinstance(item, Mapping)]
+                if isinstance(items, list)
+                else []
+            )
+        return cls(tuple(entries))
+
+    @classmethod
+    def from_json(cls, text: str) -> "EventNotes":
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            return cls.from_dict({"log": [{"message": text, "timestamp_utc": ""}]})
+        return cls.from_dict(parsed) if isinstance(parsed, dict) else cls()
+
+    @classmethod
+    def coerce(cls, value: object) -> "EventNotes":
+        """Accept an ``EventNotes``, a legacy dict, a JSON string, or an empty/NaN cell."""
+        if isinstance(value, EventNotes):
+            return value
+        if isinstance(value, Mapping):
+            return cls.from_dict(value)
+        text = "" if value is None else str(value)
+        if not text or text == "nan":
+            return cls()
+        return cls.from_json(text)
+
+    # ---------- Typed readers ----------
+    def _section(self, index: int) -> Iterator[Any]:
+        items = self._entries[index]
+        for position in range(self._lengths[index]):
+            yield items[position]
+
+    def runbook_completions(self) -> Iterator[RunbookCompletion]:
+        return self._section(0)
+
+    def log_entries(self) -> Iterator[LogEntry]:
+        return self._section(1)
+
+    def duplicate_records(self) -> Iterator[DuplicateRecord]:
+        return self._section(2)
+
+    def has_runbook_item(self, item_id: str) -> bool:
+        return any(entry.item_id == item_id for entry in self.runbook_completions())
+
+    # ---------- Appends ----------
+    def _with(self, index: int, entry: Any) -> "EventNotes":
+        items = self._entries[index]
+        length = self._lengths[index]
+        if length == 0 or len(items) != length:
+            # Never append into a list another version has already extended (or an
+            # empty list that may be shared); copy the visible prefix instead.
+            items = items[:length]
+        items.append(entry)
+        entries = self._entries[:index] + (items,) + self._entries[index + 1 :]
+        lengths = self._lengths[:index] + (length + 1,) + self._lengths[index + 1 :]
+        return EventNotes(entries, lengths)
+
+    def with_runbook_completion(self, entry: RunbookCompletion) -> "EventNotes":
+        return self._with(0, entry)
+
+    def with_log(self, entry: LogEntry) -> "EventNotes":
+        return self._with(1, entry)
+
+    def with_duplicate(self, record: DuplicateRecord) -> "EventNotes":
+        return self._with(2, record)
+
+    # ---------- Serialisation ----------
+    def to_dict(self) -> Dict[str, List[Dict[str, str]]]:
+        return {section: self[section] for section in NOTE_SECTIONS}
+
+    def _serialized(self) -> Dict[str, List[Dict[str, str]]]:
+        # Read-only dict handed to pydantic's JSON serializer; cached because stored
+        # instances are shared by every response that includes the event.
+        if self._plain is None:
+            self._plain = self.to_dict()
+        return self._plain
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), ensure_ascii=False)
+        return self._json
+
+    # ---------- Mapping protocol ----------
+    def __getitem__(self, key: str) -> List[Dict[str, str]]:
+        try:
+            index = NOTE_SECTIONS.index(key)
+        except ValueError:
+            raise KeyError(key) from None
+        return [entry.to_dict() for entry in self._section(index)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(NOTE_SECTIONS)
+
+    def __len__(self) -> int:
+        return len(NOTE_SECTIONS)
+
+    def __repr__(self) -> str:
+        return f"EventNotes({self.to_dict()!r})"
+
+    # ---------- Pydantic integration ----------
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> Any:
+        from pydantic_core import core_schema
+
+        # Python-mode dumps keep the shared instance; only JSON output materialises dicts.
+        return core_schema.no_info_plain_validator_function(
+            cls.coerce,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda value: value._serialized(),
+                when_used="json",
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "additionalProperties": {
+                "type": "array",
+                "items": {"type": "object", "additionalProperties": {"type": "string"}},
+            },
+        }
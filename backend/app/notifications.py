@@ -0,0 +1,399 @@
+"""SLA deadline notifications delivered to webhooks.
+
+Every open event has two deadlines from its triage policy. The investigate deadline
+applies until an investigation starts, and the report deadline until a report is
+submitted. :class:`DeadlineScheduler` fires each deadline at most twice:
+``due_soon`` once ``SLA_DUE_SOON_H`` hours (default 24) remain, and ``breached`` when
+it passes. Each notification is POSTed as JSON to every URL in the comma-separated
+``SLA_WEBHOOK_URLS``. Without that variable the scheduler does not run.
+
+Upcoming firings sit in a min-heap keyed by time, so the scheduler thread sleeps
+until the earliest one instead of scanning events. The heap is built once from the
+store's columns. After that the store's change listener reschedules only the events
+each write touched, at O(log n) per event, and superseded heap entries are skipped
+when popped. A policy reload, or a write the listener could not account for (another
+worker process), triggers a rebuild. Deadlines that passed more than
+``SLA_NOTIFY_LOOKBACK_H`` hours (default 24) before they were scheduled are never
+notified, so restarts and back-filled imports do not replay history. What has fired
+is remembered per deadline, until the event closes that SLA, the deadline moves, or
+it drops out of the lookback window.
+
+Importing this module is cheap; pandas is only loaded when the heap is built.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import httpx
+
+from .metrics import span
+from .triage import PolicyRegistry, PolicySet, registry as default_registry
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .store import DataStore, StoreChange
+
+WEBHOOK_URLS_ENV = "SLA_WEBHOOK_URLS"
+DUE_SOON_ENV = "SLA_DUE_SOON_H"
+LOOKBACK_ENV = "SLA_NOTIFY_LOOKBACK_H"
+DEFAULT_DUE_SOON_H = 24.0
+DEFAULT_LOOKBACK_H = 24.0
+POLL_INTERVAL_S = 30.0
+WEBHOOK_TIMEOUT_S = 5.0
+# Leftover heap entries and fired markers are dropped once they outnumber live deadlines.
+COMPACT_SLACK = 1_024
+
+SLAS = ("investigate", "report")
+KINDS = ("due_soon", "breached")
+_CLOSED_BY = {"investigate": "investigation_started_utc", "report": "report_submitted_utc"}
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# (fire at, event id, SLA, kind, deadline), all instants in nanoseconds since the epoch.
+HeapEntry = Tuple[int, str, str, str, int]
+
+logger = logging.getLogger(__name__)
+
+
+def _span_ns(delta: timedelta) -> int:
+    return delta // timedelta(microseconds=1) * 1_000
+
+
+def _ns(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return _span_ns(moment - _EPOCH)
+
+
+def _from_ns(nanoseconds: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=nanoseconds // 1_000)
+
+
+def _instant_ns(value: object) -> Optional[int]:
+    """A stored timestamp (datetime, ISO string, ``None``, NaN or NaT) in nanoseconds."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime) or value != value:  # NaT is the datetime unequal to itself
+        return None
+    return _ns(value)
+
+
+@dataclass(frozen=True)
+class Notification:
+    event_id: str
+    site_id: str
+    sla: str  # "investigate" or "report"
+    kind: str  # "due_soon" or "breached"
+    deadline_utc: datetime
+    fired_at_utc: datetime
+
+    @property
+    def id(self) -> str:
+        """Stable per event, SLA and kind, so receivers can drop duplicates."""
+        return f"{self.event_id}:{self.sla}:{self.kind}"
+
+    def payload(self) -> Dict[str, str]:
+        return {
+            "id": self.id,
+            "type": f"sla.{self.sla}.{self.kind}",
+            "event_id": self.event_id,
+            "site_id": self.site_id,
+            "sla": self.sla,
+            "kind": self.kind,
+            "deadline_utc": self.deadline_utc.isoformat().replace("+00:00", "Z"),
+            "fired_at_utc": self.fired_at_utc.isoformat().replace("+00:00", "Z"),
+        }
+
+
+Sink = Callable[[Notification], None]
+
+
+class WebhookSink:
+    """POSTs each notification as JSON to ``url``; any non-2xx answer is a failure."""
+
+    def __init__(self, url: str, timeout: float = WEBHOOK_TIMEOUT_S) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, notification: Notification) -> None:
+        with span("notifications.webhook"):
+            response = httpx.post(self.url, json=notification.payload(), timeout=self.timeout)
+        response.raise_for_status()
+
+    def __repr__(self) -> str:
+        return f"WebhookSink({self.url!r})"
+
+
+def _env_hours(name: str, default: float) -> timedelta:
+    return timedelta(hours=float(os.getenv(name) or default))
+
+
+def webhook_urls() -> List[str]:
+    return [url.strip() for url in os.getenv(WEBHOOK_URLS_ENV, "").split(",") if url.strip()]
+
+
+def _frame_deadlines(
+    frame: pd.DataFrame, policies: PolicySet, operators: Mapping[str, str]
+) -> Dict[str, List[Tuple[str, str, int]]]:
+    """``(event id, site id, deadline)`` of every open SLA in ``frame``, one vectorised pass per SLA."""
+    import pandas as pd
+
+    from .scoring import compile_policies
+
+    compiled = compile_policies(policies, operators)
+    detected = pd.to_datetime(frame["detected_at_utc"], utc=True)
+    detected_ns = detected.to_numpy(dtype="datetime64[ns]").view("i8")
+    deadlines: Dict[str, List[Tuple[str, str, int]]] = {}
+    for sla, sla_spans in zip(SLAS, compiled.slas(frame["site_id"])):
+        deadline_ns = detected_ns + sla_spans.to_numpy(dtype="timedelta64[ns]").view("i8")
+        rows = detected.notna().to_numpy() & frame[_CLOSED_BY[sla]].isna().to_numpy()
+        deadlines[sla] = list(
+            zip(
+                frame["id"].to_numpy()[rows].astype(str).tolist(),
+                frame["site_id"].to_numpy()[rows].astype(str).tolist(),
+                deadline_ns[rows].tolist(),
+            )
+        )
+    return deadlines
+
+
+class DeadlineScheduler:
+    """Fires due-soon and breach notifications for a store's SLA deadlines; see the module docstring.
+
+    ``sent`` and ``failed`` count deliveries (one per sink) and ``rebuilds`` counts
+    full loads of the heap from the store.
+    """
+
+    def __init__(
+        self,
+        sinks: Sequence[Sink],
+        due_soon: Optional[timedelta] = None,
+        lookback: Optional[timedelta] = None,
+        policy_registry: PolicyRegistry = default_registry,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        self._sinks = list(sinks)
+        self._due_soon_ns = _span_ns(due_soon or _env_hours(DUE_SOON_ENV, DEFAULT_DUE_SOON_H))
+        lookback = lookback if lookback is not None else _env_hours(LOOKBACK_ENV, DEFAULT_LOOKBACK_H)
+        self._lookback_ns = _span_ns(lookback)
+        self._registry = policy_registry
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._store: Optional[DataStore] = None
+        self._policies = PolicySet()
+        self._operators: Dict[str, str] = {}
+        self._heap: List[HeapEntry] = []
+        self._deadlines: Dict[Tuple[str, str], Tuple[int, str]] = {}  # (event, SLA) -> (deadline, site)
+        self._fired: Dict[Tuple[str, str, str], int] = {}  # (event, SLA, kind) -> deadline it fired for
+        self.version = -1
+        self.policy_version = -1
+        self.rebuilds = 0
+        self.sent = 0
+        self.failed = 0
+
+    # ---------- Scheduling ----------
+    def attach(self, store: DataStore, now: Optional[datetime] = None) -> None:
+        """Follow ``store``'s writes and build the heap from its events."""
+        with self._lock:
+            if self._store is not None:
+                self._store.remove_change_listener(self.apply)
+            self._store = store
+            store.add_change_listener(self.apply)
+        self.rebuild(now)
+
+    def rebuild(self, now: Optional[datetime] = None) -> None:
+        """Reload every open deadline from the store and the active policies.
+
+        The heap is built without holding the lock, so writes are not held up; any
+        write that lands meanwhile shows up as a version mismatch and another rebuild.
+        """
+        from .scoring import site_operators  # pandas-backed
+
+        store = self._store
+        if store is None:
+            return
+        cutoff = _ns(now or self._clock()) - self._lookback_ns
+        with span("notifications.rebuild"):
+            with self._lock:
+                self.version = -1  # changes arriving during the build cannot be applied to it
+            version = store.version
+            policy_version = self._registry.version
+            policies = self._registry.current()
+            operators = site_operators(store)
+            frame = store.backend.events_frame(columns=["id", "site_id", "detected_at_utc", *_CLOSED_BY.values()])
+            deadlines: Dict[Tuple[str, str], Tuple[int, str]] = {}
+            for sla, rows in _frame_deadlines(frame, policies, operators).items():
+                for event_id, site_id, deadline_ns in rows:
+                    if deadline_ns >= cutoff:
+                        deadlines[(event_id, sla)] = (deadline_ns, site_id)
+            heap = [self._next_entry(key, deadline_ns) for key, (deadline_ns, _) in deadlines.items()]
+            heapq.heapify(heap)
+            with self._lock:
+                self._policies, self._operators = policies, operators
+                self._deadlines, self._heap = deadlines, heap
+                self._fired = {
+                    fired: deadline_ns
+                    for fired, deadline_ns in self._fired.items()
+                    if deadlines.get(fired[:2], (None,))[0] == deadline_ns
+                }
+                self.version, self.policy_version = version, policy_version
+                self.rebuilds += 1
+        self._wake.set()
+
+    def _next_entry(self, key: Tuple[str, str], deadline_ns: int) -> HeapEntry:
+        event_id, sla = key
+        if self._fired.get((event_id, sla, "due_soon")) == deadline_ns:
+            return (deadline_ns, event_id, sla, "breached", deadline_ns)
+        return (deadline_ns - self._due_soon_ns, event_id, sla, "due_soon", deadline_ns)
+
+    def apply(self, change: StoreChange) -> None:
+        """Change listener: reschedule the written events, or mark the heap stale."""
+        now_ns = _ns(self._clock())
+        with self._lock:
+            if change.from_version != self.version:
+                self.version = -1
+                self._wake.set()
+                return
+            earliest = self._heap[0][0] if self._heap else None
+            for event_id, row in change.rows.items():
+                self._reschedule(event_id, row, now_ns)
+            self.version = change.to_version
+            if len(self._heap) > 2 * len(self._deadlines) + COMPACT_SLACK:
+                self._heap = [self._next_entry(key, deadline) for key, (deadline, _) in self._deadlines.items()]
+                heapq.heapify(self._heap)
+            if self._heap and (earliest is None or self._heap[0][0] < earliest):
+                self._wake.set()
+
+    def _reschedule(self, event_id: str, row: Mapping[str, object], now_ns: int) -> None:
+        site_id = str(row.get("site_id"))
+        detected_ns = _instant_ns(row.get("detected_at_utc"))
+        policy = self._policies.resolve(site_id, self._operators.get(site_id))
+        for sla, sla_span in zip(SLAS, (policy.investigate_sla, policy.report_sla)):
+            key = (event_id, sla)
+            closed = _instant_ns(row.get(_CLOSED_BY[sla])) is not None
+            deadline_ns = None if closed or detected_ns is None else detected_ns + _span_ns(sla_span)
+            if deadline_ns is None or deadline_ns < now_ns - self._lookback_ns:
+                self._deadlines.pop(key, None)
+                self._forget_fired(key)
+            elif self._deadlines.get(key, (None,))[0] != deadline_ns:
+                self._forget_fired(key, deadline_ns)
+                self._deadlines[key] = (deadline_ns, site_id)
+                heapq.heappush(self._heap, self._next_entry(key, deadline_ns))
+
+    def _forget_fired(self, key: Tuple[str, str], keep_ns: Optional[int] = None) -> None:
+        """Forget what fired for ``key``, except for the deadline ``keep_ns``."""
+        for kind in KINDS:
+            fired = (*key, kind)
+            if fired in self._fired and self._fired[fired] != keep_ns:
+                del self._fired[fired]
+
+    def next_due(self) -> Optional[datetime]:
+        """When the earliest queued firing is due (it may belong to a superseded deadline)."""
+        with self._lock:
+            return _from_ns(self._heap[0][0]) if self._heap else None
+
+    def run_pending(self, now: Optional[datetime] = None) -> List[Notification]:
+        """Fire and deliver every notification due by ``now``; returns what fired."""
+        now = now or self._clock()
+        now_ns = _ns(now)
+        due: List[Notification] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now_ns:
+                _, event_id, sla, kind, deadline_ns = heapq.heappop(self._heap)
+                current = self._deadlines.get((event_id, sla))
+                if current is None or current[0] != deadline_ns:
+                    continue  # closed or moved since this entry was queued
+                if kind == "due_soon":
+                    heapq.heappush(self._heap, (deadline_ns, event_id, sla, "breached", deadline_ns))
+                    if deadline_ns <= now_ns:
+                        continue  # already breached; notify that instead
+                else:
+                    del self._deadlines[(event_id, sla)]
+                if self._fired.get((event_id, sla, kind)) == deadline_ns:
+                    continue
+                self._fired[(event_id, sla, kind)] = deadline_ns
+                due.append(Notification(event_id, current[1], sla, kind, _from_ns(deadline_ns), now))
+            if len(self._fired) > 2 * len(self._deadlines) + COMPACT_SLACK:
+                # Breaches of events left open outlive their deadlines; past the lookback
+                # a rebuild no longer loads them, so there is nothing left to de-duplicate.
+                cutoff = now_ns - self._lookback_ns
+                self._fired = {fired: ns for fired, ns in self._fired.items() if ns >= cutoff}
+        for notification in due:
+            self._deliver(notification)
+        return due
+
+    def _deliver(self, notification: Notification) -> None:
+        for sink in self._sinks:
+            try:
+                sink(notification)
+            except Exception as exc:  # one broken sink must not hold up the others
+                self.failed += 1
+                logger.warning("Could not deliver %s to %r: %s", notification.id, sink, exc)
+            else:
+                self.sent += 1
+
+    # ---------- Background thread ----------
+    def start(self, store_factory: Callable[[], DataStore]) -> threading.Thread:
+        """Run the scheduler on a daemon thread; the store is built there, not at startup."""
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(store_factory,), name="sla-notifications", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            if self._store is not None:
+                self._store.remove_change_listener(self.apply)
+                self._store = None
+
+    def _run(self, store_factory: Callable[[], DataStore]) -> None:
+        try:
+            self.attach(store_factory())
+        except Exception:  # pragma: no cover - surfaced again on the first request
+            logger.exception("SLA notification scheduler could not load the store")
+            return
+        while not self._stopped.is_set():
+            try:
+                store = self._store
+                if store is not None and (
+                    store.version != self.version or self._registry.version != self.policy_version
+                ):
+                    self.rebuild()
+                self.run_pending()
+            except Exception:  # pragma: no cover - keep the scheduler alive
+                logger.exception("SLA notification scheduler iteration failed")
+            next_due = self.next_due()
+            timeout = POLL_INTERVAL_S
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, (next_due - self._clock()).total_seconds()))
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+
+def start_deadline_notifications(store_factory: Callable[[], DataStore]) -> Optional[DeadlineScheduler]:
+    """Start a scheduler posting to ``SLA_WEBHOOK_URLS``, or return ``None`` when none are set."""
+    urls = webhook_urls()
+    if not urls:
+        return None
+    scheduler = DeadlineScheduler([WebhookSink(url) for url in urls])
+    scheduler.start(store_factory)
+    return scheduler
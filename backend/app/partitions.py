@@ -0,0 +1,374 @@
+"""Month-partitioned event storage with a hot working set and cold archives.
+
+Layout under ``<data_dir>/partitions``::
+
+    hot.csv                          open events + everything from recent months
+    manifest.json                    which cold file holds each month
+    events-2024-03.g2.csv.gz         REPORTED events detected in March 2024
+    events-2024-03.g2.ids            their ids, one per line (cheap membership checks)
+
+The hot set is an ordinary :class:`~app.backends.CSVEventBackend`, so reads of open
+events, every mutation, and every persist only touch active incidents. An event
+moves to its month's cold partition once it is REPORTED and older than the hot
+window (:meth:`PartitionedEventBackend.roll_partitions`, run on start-up). Cold
+files are never modified in place: rolling writes a new generation and swaps the
+manifest. Updating an archived event copies it back into the hot set, where it
+shadows the cold copy until the next roll.
+
+Lookups of archived ids read the small ``.ids`` sidecars (cached) rather than the
+partitions themselves; at most ``cold_cache_size`` partition frames stay in memory.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import pandas as pd
+
+from .backends import (
+    DEFAULT_CHUNK_ROWS,
+    EVENT_COLUMNS,
+    CSVEventBackend,
+    EventRow,
+    EventSnapshot,
+    frame_chunks,
+    read_events_csv,
+    write_events_csv,
+)
+from .metrics import span
+
+DEFAULT_HOT_MONTHS = 2
+DEFAULT_COLD_CACHE_SIZE = 4
+MANIFEST_VERSION = 1
+CLOSED_STATUS = "REPORTED"
+
+
+def month_key(value: Any) -> Optional[str]:
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).strftime("%Y-%m")
+
+
+def hot_cutoff(now: datetime, hot_months: int) -> pd.Timestamp:
+    """Start of the oldest month that is still kept hot."""
+    current = pd.Timestamp(now)
+    current = current.tz_localize(timezone.utc) if current.tzinfo is None else current.tz_convert(timezone.utc)
+    return current.normalize().replace(day=1) - pd.DateOffset(months=max(hot_months, 1) - 1)
+
+
+class PartitionedEventBackend(CSVEventBackend):
+    """Hot/cold event storage; see the module docstring for the layout."""
+
+    def __init__(
+        self,
+        root: Path,
+        seed_path: Optional[Path] = None,
+        hot_months: int = DEFAULT_HOT_MONTHS,
+        shared: bool = False,
+        cold_cache_size: int = DEFAULT_COLD_CACHE_SIZE,
+    ) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        hot_path = root / "hot.csv"
+        if not hot_path.exists():
+            if seed_path is not None and seed_path.exists():
+                shutil.copyfile(seed_path, hot_path)
+            else:
+                pd.DataFrame(columns=EVENT_COLUMNS).to_csv(hot_path, index=False)
+        super().__init__(hot_path, shared=shared)
+        self._root = root
+        self._hot_months = hot_months
+        self._manifest_path = root / "manifest.json"
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        self._manifest_mtime: Optional[int] = None
+        self._cold_cache_size = cold_cache_size
+        self._cold_frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._cold_ids: Dict[str, Set[str]] = {}
+        self._cold_lock = threading.Lock()
+        self._refresh_manifest()
+        self.roll_partitions()
+
+    # ---------- Manifest and cold files ----------
+    def _refresh_manifest(self) -> None:
+        try:
+            mtime = self._manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        with self._cold_lock:
+            payload = json.loads(self._manifest_path.read_text())
+            self._manifest = payload.get("partitions", {})
+            self._manifest_mtime = mtime
+
+    def _write_manifest(self) -> None:
+        tmp_path = self._manifest_path.with_name(f".{self._manifest_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"version": MANIFEST_VERSION, "partitions": self._manifest}, indent=2))
+        os.replace(tmp_path, self._manifest_path)
+        self._manifest_mtime = self._manifest_path.stat().st_mtime_ns
+
+    def cold_months(self) -> List[str]:
+        self._refresh_manifest()
+        return sorted(self._manifest)
+
+    def _partition_frame(self, month: str) -> pd.DataFrame:
+        entry = self._manifest[month]
+        name = entry["file"]
+        with self._cold_lock:
+            frame = self._cold_frames.get(name)
+            if frame is not None:
+                self._cold_frames.move_to_end(name)
+                return frame
+        with span("store.cold_load"):
+            frame = read_events_csv(self._root / name)
+        with self._cold_lock:
+            self._cold_frames[name] = frame
+            while len(self._cold_frames) > self._cold_cache_size:
+                self._cold_frames.popitem(last=False)
+        return frame
+
+    def _partition_ids(self, month: str) -> Set[str]:
+        name = self._manifest[month]["ids"]
+        with self._cold_lock:
+            ids = self._cold_ids.get(name)
+        if ids is None:
+            ids = set(filter(None, (self._root / name).read_text().splitlines()))
+            with self._cold_lock:
+                self._cold_ids[name] = ids
+        return ids
+
+    def _months_between(self, start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+        first = month_key(start) if start is not None else None
+        last = month_key(end) if end is not None else None
+        return [
+            month
+            for month in self.cold_months()
+            if (first is None or month >= first) and (last is None or month <= last)
+        ]
+
+    def _cold_frame(self, months: Sequence[str], hot: EventSnapshot) -> pd.DataFrame:
+        """Cold rows of ``months`` (oldest first) that are not shadowed by rows of ``hot``."""
+        frames = [self._partition_frame(month) for month in months]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return hot.frame.iloc[0:0]
+        cold = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        hot_ids = hot.positions()
+        if hot_ids:
+            cold = cold[~cold["id"].astype(str).isin(hot_ids.keys())]
+        return cold
+
+    def _locate_cold(self, event_ids: Iterable[str]) -> Dict[str, str]:
+        """Map archived ids to their month, newest partitions first."""
+        remaining = set(event_ids)
+        found: Dict[str, str] = {}
+        for month in reversed(self.cold_months()):
+            if not remaining:
+                break
+            hits = remaining & self._partition_ids(month)
+            for event_id in hits:
+                found[event_id] = month
+            remaining -= hits
+        return found
+
+    def _cold_rows(self, event_ids: Iterable[str]) -> Dict[str, EventRow]:
+        by_month: Dict[str, List[str]] = {}
+        for event_id, month in self._locate_cold(event_ids).items():
+            by_month.setdefault(month, []).append(event_id)
+        rows: Dict[str, EventRow] = {}
+        for month, ids in by_month.items():
+            frame = self._partition_frame(month)
+            match = frame[frame["id"].astype(str).isin(set(ids))].drop_duplicates(subset="id")
+            rows.update({str(row["id"]): row for row in match.to_dict(orient="records")})
+        return rows
+
+    # ---------- Reads ----------
+    def _query_frame(
+        self,
+        status: Optional[str],
+        detected_before: Optional[datetime],
+        limit: Optional[int],
+        offset: int,
+    ) -> pd.DataFrame:
+        """Open-status queries are answered from the hot set alone.
+
+        Otherwise rows come back partition by partition (oldest month first),
+        followed by the hot set in insertion order. Partitions are read only until
+        the page is full, and whole months before ``offset`` are skipped by their
+        manifest row counts (less the rows the hot set shadows).
+        """
+        if status and status != CLOSED_STATUS:
+            return super()._query_frame(status, detected_before, limit, offset)
+        hot = self._view()
+        hot_ids = hot.positions()
+        # Only the month holding the cutoff has rows on both sides of it.
+        partial = month_key(detected_before) if detected_before is not None else None
+        skip, remaining = offset, limit
+        pieces: List[pd.DataFrame] = []
+
+        def take(rows: pd.DataFrame) -> None:
+            nonlocal skip, remaining
+            if skip:
+                dropped = min(skip, len(rows))
+                rows, skip = rows.iloc[dropped:], skip - dropped
+            if remaining is not None:
+                rows = rows.iloc[:remaining]
+                remaining -= len(rows)
+            if not rows.empty:
+                pieces.append(rows)
+
+        for month in self._months_between(None, detected_before):
+            if remaining == 0:
+                break
+            if month != partial:
+                shadowed = len(self._partition_ids(month).intersection(hot_ids)) if hot_ids else 0
+                count = self._manifest[month]["rows"] - shadowed
+                if count <= skip:
+                    skip -= count
+                    continue
+            take(self._filter_query(self._cold_frame([month], hot), status, detected_before))
+        if remaining != 0:
+            take(self._filter_query(hot.frame, status, detected_before))
+        if not pieces:
+            return hot.frame.iloc[0:0]
+        return pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else pieces[0]
+
+    @staticmethod
+    def _filter_query(df: pd.DataFrame, status: Optional[str], detected_before: Optional[datetime]) -> pd.DataFrame:
+        if status:
+            df = df[df["status"] == status]
+        if detected_before is not None:
+            df = df[df["detected_at_utc"] < pd.Timestamp(detected_before)]
+        return df
+
+    def get_event_row(self, event_id: str) -> Optional[EventRow]:
+        row = super().get_event_row(event_id)
+        if row is not None:
+            return row
+        return self._cold_rows([event_id]).get(event_id)
+
+    def get_event_rows(self, event_ids: Iterable[str]) -> Dict[str, EventRow]:
+        ids = list(dict.fromkeys(event_ids))
+        rows = super().get_event_rows(ids)
+        missing = [event_id for event_id in ids if event_id not in rows]
+        if missing:
+            rows.update(self._cold_rows(missing))
+        return rows
+
+    def existing_ids(self, event_ids: Iterable[str]) -> Set[str]:
+        ids = list(dict.fromkeys(event_ids))
+        found = super().existing_ids(ids)
+        missing = [event_id for event_id in ids if event_id not in found]
+        if missing:
+            found.update(self._locate_cold(missing))
+        return found
+
+    def events_frame(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        sites = set(site_ids) if site_ids is not None else None
+        view = self._view()
+        hot = self._filter_frame(view.frame, columns, sites, detected_from, detected_to)
+        cold = self._cold_frame(self._months_between(detected_from, detected_to), view)
+        if cold.empty:
+            return hot
+        cold = self._filter_frame(cold, columns, sites, detected_from, detected_to)
+        return pd.concat([cold, hot], ignore_index=True)
+
+    def iter_events_frames(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        detected_from: Optional[datetime] = None,
+        detected_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        """Archived months one at a time (oldest first), then the hot set."""
+        sites = set(site_ids) if site_ids is not None else None
+        hot = self._view()
+        if not status or status == CLOSED_STATUS:
+            for month in self._months_between(detected_from, detected_to):
+                cold = self._cold_frame([month], hot)
+                mask = self._filter_mask(cold, sites, detected_from, detected_to, status)
+                yield from frame_chunks(cold, columns, chunk_rows, mask)
+        mask = self._filter_mask(hot.frame, sites, detected_from, detected_to, status)
+        yield from frame_chunks(hot.frame, columns, chunk_rows, mask)
+
+    # ---------- Writes ----------
+    def update_event(self, event_id: str, changes: EventRow) -> None:
+        self.update_events({event_id: changes})
+
+    def update_events(self, changes: Dict[str, EventRow]) -> None:
+        if not changes:
+            return
+        with self.transaction():
+            hot_ids = super().existing_ids(changes)
+            cold_ids = [event_id for event_id in changes if event_id not in hot_ids]
+            revived: List[EventRow] = []
+            if cold_ids:
+                cold_rows = self._cold_rows(cold_ids)
+                missing = [event_id for event_id in cold_ids if event_id not in cold_rows]
+                if missing:
+                    raise KeyError(f"Event {missing[0]} not found")
+                for event_id in cold_ids:
+                    # Archives are immutable: the updated copy lives hot and shadows it.
+                    revived.append({**cold_rows[event_id], **changes[event_id]})
+            super().update_events({event_id: changes[event_id] for event_id in changes if event_id in hot_ids})
+            self.insert_events(revived)
+
+    def roll_partitions(self, now: Optional[datetime] = None) -> int:
+        """Move REPORTED events older than the hot window into cold partitions.
+
+        Returns the number of events archived. New partition files and the manifest
+        are written before the hot set is persisted, so a crash in between leaves
+        rows duplicated (hot shadows cold) rather than lost.
+        """
+        cutoff = hot_cutoff(now or datetime.now(timezone.utc), self._hot_months)
+        with self.transaction():
+            self._refresh_manifest()
+            df = self._view().frame
+            eligible = (df["status"] == CLOSED_STATUS) & (df["detected_at_utc"] < cutoff)
+            if not eligible.any():
+                return 0
+            moving = df[eligible]
+            with span("store.roll"):
+                for month, group in moving.groupby(moving["detected_at_utc"].map(month_key)):
+                    self._write_partition(str(month), group)
+                self._write_manifest()
+            kept = df[~eligible].reset_index(drop=True)
+            self._stage(lambda base, version: EventSnapshot(kept, version))
+            return int(eligible.sum())
+
+    def _write_partition(self, month: str, rows: pd.DataFrame) -> None:
+        entry = self._manifest.get(month)
+        if entry is not None:
+            existing = self._partition_frame(month)
+            existing = existing[~existing["id"].astype(str).isin(set(rows["id"].astype(str)))]
+            rows = pd.concat([existing, rows], ignore_index=True)
+        generation = (entry or {}).get("generation", 0) + 1
+        stem = f"events-{month}.g{generation}"
+        write_events_csv(rows.loc[:, EVENT_COLUMNS], self._root / f"{stem}.csv.gz")
+        ids_path = self._root / f"{stem}.ids"
+        ids_path.write_text("\n".join(rows["id"].astype(str)) + "\n")
+        self._manifest[month] = {
+            "file": f"{stem}.csv.gz",
+            "ids": ids_path.name,
+            "rows": int(len(rows)),
+            "generation": generation,
+        }
+        if entry is not None:
+            with self._cold_lock:
+                self._cold_frames.pop(entry["file"], None)
+                self._cold_ids.pop(entry["ids"], None)
+            for name in (entry["file"], entry["ids"]):
+                (self._root / name).unlink(missing_ok=True)
@@ -3,8 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List
 
-from fpdf import FPDF, XPos, YPos
-
+from .metrics import timed
 from .schemas import ActionLogEntry, EventOut, RunbookItem
 
 
@@ -27,7 +26,15 @@ def _sla_status(remaining: float) -> str:
     return "Breached" if remaining < 0 else "On Track"
 
 
+@timed("pdf.render")
 def generate_event_report_pdf(event: EventOut) -> bytes:
+    # fpdf2 pulls in Pillow and fontTools; import it only when a report is rendered.
+    from fpdf import FPDF, XPos, YPos
+
+    from .emissions import estimate_event  # pandas-backed, like fpdf2
+
+    emission = estimate_event(event, now=event.triage_breakdown.computed_at_utc)
+
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -63,6 +70,11 @@ def generate_event_report_pdf(event: EventOut) -> bytes:
                 ("Detected", _format_dt(event.detected_at_utc)),
                 ("Estimated CH4", f"{event.est_ch4_kgph:.0f} kg/h"),
                 ("Confidence", f"{event.confidence:.2f}"),
+                (
+                    "Estimated Emitted CH4",
+                    f"{emission.mass_kg:,.0f} kg over {_format_hours(emission.hours)}"
+                    f" ({emission.weighted_mass_kg:,.0f} kg confidence-weighted)",
+                ),
             ]
         ),
     )
@@ -0,0 +1,360 @@
+"""On-demand CPU profiling and lock-contention accounting.
+
+:class:`StackSampler` polls ``sys._current_frames()`` from a daemon thread, so it
+sees every worker thread (FastAPI runs sync endpoints in a threadpool, which a
+per-thread ``cProfile`` would miss) and costs nothing while no capture is running.
+Captures are kept in a small in-memory ring and can be downloaded as collapsed
+stacks (``flamegraph.pl`` / speedscope) or as a ``pstats`` file.
+
+:class:`InstrumentedLock` is a drop-in for ``threading.Lock`` that records how long
+callers waited for it and how long it was held.
+"""
+from __future__ import annotations
+
+import hmac
+import itertools
+import marshal
+import os
+import sys
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics
+
+ADMIN_TOKEN_ENV = "ADMIN_TOKEN"
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+DEFAULT_INTERVAL_S = 0.005
+MAX_STORED_PROFILES = 16
+
+# (filename, first line, function name) -- the same key shape pstats uses.
+FrameKey = Tuple[str, int, str]
+Stack = Tuple[FrameKey, ...]
+
+# Leaf frames that mean "this thread is parked", not "this thread is burning CPU".
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+}
+
+
+def admin_token() -> Optional[str]:
+    token = os.getenv(ADMIN_TOKEN_ENV, "").strip()
+    return token or None
+
+
+def check_admin_token(candidate: Optional[str]) -> bool:
+    expected = admin_token()
+    if expected is None or not candidate:
+        return False
+    return hmac.compare_digest(candidate.encode(), expected.encode())
+
+
+def _is_idle(leaf: FrameKey) -> bool:
+    return (os.path.basename(leaf[0]), leaf[2]) in _IDLE_LEAVES
+
+
+def _label(frame: FrameKey) -> str:
+    filename, line, name = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+@dataclass
+class FunctionStat:
+    function: str
+    file: str
+    line: int
+    self_s: float
+    total_s: float
+
+
+class Profile:
+    """Aggregated stack samples from one capture."""
+
+    def __init__(self, profile_id: str, stacks: Counter, interval_s: float, duration_s: float, ticks: int) -> None:
+        self.id = profile_id
+        self.stacks: Counter = stacks
+        self.interval_s = interval_s
+        self.duration_s = duration_s
+        self.ticks = ticks
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def to_folded(self) -> str:
+        """Collapsed-stack text: ``root;caller;leaf <count>`` per line."""
+        lines = [
+            ";".join(_label(frame) for frame in stack) + f" {count}"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def _function_totals(self) -> Tuple[Dict[FrameKey, int], Dict[FrameKey, int], Dict[FrameKey, Counter], Dict[FrameKey, Counter]]:
+        own: Dict[FrameKey, int] = Counter()
+        total: Dict[FrameKey, int] = Counter()
+        caller_total: Dict[FrameKey, Counter] = {}
+        caller_own: Dict[FrameKey, Counter] = {}
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                total[frame] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                caller_total.setdefault(callee, Counter())[caller] += count
+            if len(stack) > 1:
+                caller_own.setdefault(stack[-1], Counter())[stack[-2]] += count
+        return own, total, caller_total, caller_own
+
+    def to_pstats(self) -> bytes:
+        """Marshalled stats dict loadable with ``pstats.Stats(path)`` or snakeviz.
+
+        Sample counts stand in for call counts; times are samples x interval.
+        """
+        own, total, caller_total, caller_own = self._function_totals()
+        interval = self.interval_s
+        stats = {}
+        for frame, count in total.items():
+            callers = {
+                caller: (
+                    samples,
+                    samples,
+                    caller_own.get(frame, Counter())[caller] * interval,
+                    samples * interval,
+                )
+                for caller, samples in caller_total.get(frame, Counter()).items()
+            }
+            stats[frame] = (count, count, own[frame] * interval, count * interval, callers)
+        return marshal.dumps(stats)
+
+    def top_functions(self, limit: int = 20) -> List[FunctionStat]:
+        own, total, _, _ = self._function_totals()
+        ranked = sorted(total, key=lambda frame: (-own[frame], -total[frame]))[:limit]
+        return [
+            FunctionStat(
+                function=frame[2],
+                file=frame[0],
+                line=frame[1],
+                self_s=own[frame] * self.interval_s,
+                total_s=total[frame] * self.interval_s,
+            )
+            for frame in ranked
+        ]
+
+
+class StackSampler:
+    """Samples the Python stack of every other thread at a fixed interval."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, interval_s: float = DEFAULT_INTERVAL_S, include_idle: bool = False) -> None:
+        self.interval_s = interval_s
+        self.include_idle = include_idle
+        self.id = f"p{next(self._ids)}-{os.getpid()}"
+        self._stacks: Counter = Counter()
+        self._ticks = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> "StackSampler":
+        self._started = perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return Profile(self.id, self._stacks, self.interval_s, perf_counter() - self._started, self._ticks)
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            self._sample(own_ident)
+
+    def _sample(self, own_ident: int) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack: List[FrameKey] = []
+            current = frame
+            while current is not None:
+                code = current.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                current = current.f_back
+            if not stack or (not self.include_idle and _is_idle(stack[0])):
+                continue
+            stack.reverse()
+            self._stacks[tuple(stack)] += 1
+        self._ticks += 1
+
+
+class ProfileStore:
+    """Keeps the most recent captures so they can be downloaded after the fact."""
+
+    def __init__(self, capacity: int = MAX_STORED_PROFILES) -> None:
+        self.capacity = capacity
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.capacity:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Profile:
+        with self._lock:
+            return self._profiles[profile_id]
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._profiles)
+
+
+profiles = ProfileStore()
+
+
+# ---------- Lock contention ----------
+
+
+@dataclass
+class LockSnapshot:
+    name: str
+    acquisitions: int
+    contended: int
+    total_wait_s: float
+    max_wait_s: float
+    total_hold_s: float
+    max_hold_s: float
+
+
+class InstrumentedLock:
+    """``threading.Lock`` that accounts for wait and hold time.
+
+    Counters are only updated by the current holder, so they need no extra lock;
+    :meth:`snapshot` may read a slightly torn view under heavy load, which is fine
+    for diagnostics. Waits are also reported as the ``<name>.wait`` span when
+    metrics are enabled.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.total_hold_s = 0.0
+        self.max_hold_s = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(blocking=False):
+            waited = 0.0
+        else:
+            if not blocking:
+                return False
+            started = perf_counter()
+            if not self._lock.acquire(timeout=timeout):
+                return False
+            waited = perf_counter() - started
+            self.contended += 1
+        self._acquired_at = perf_counter()
+        self.acquisitions += 1
+        self.total_wait_s += waited
+        if waited > self.max_wait_s:
+            self.max_wait_s = waited
+        if waited and metrics.registry.enabled:
+            metrics.record_duration(f"{self.name}.wait", waited)
+        return True
+
+    def release(self) -> None:
+        held = perf_counter() - self._acquired_at
+        self.total_hold_s += held
+        if held > self.max_hold_s:
+            self.max_hold_s = held
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+    def snapshot(self) -> LockSnapshot:
+        return LockSnapshot(
+            name=self.name,
+            acquisitions=self.acquisitions,
+            contended=self.contended,
+            total_wait_s=self.total_wait_s,
+            max_wait_s=self.max_wait_s,
+            total_hold_s=self.total_hold_s,
+            max_hold_s=self.max_hold_s,
+        )
+
+
+# ---------- Per-request capture ----------
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _flag_set(value: Optional[str]) -> bool:
+    return value is not None and value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+class ProfilingMiddleware:
+    """Profiles a single request when it carries ``X-Profile: 1`` and a valid admin token.
+
+    The response gets an ``X-Profile-Id`` header; the capture is downloadable from
+    ``/api/admin/profiles/{id}`` once the response body has been sent. Requests
+    without the flag (or with a bad token) pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp, interval_s: float = DEFAULT_INTERVAL_S) -> None:
+        self.app = app
+        self.interval_s = interval_s
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not _flag_set(_header(scope, PROFILE_HEADER.encode()))
+            or not check_admin_token(_header(scope, ADMIN_TOKEN_HEADER.encode()))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(self.interval_s).start()
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, sampler.id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            # stop() joins the sampler thread, which can take a whole tick; not on the loop.
+            profiles.add(await run_in_threadpool(sampler.stop))
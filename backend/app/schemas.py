@@ -3,11 +3,14 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from .notes import EventNotes
 
 
 DetectionType = Literal["satellite", "OGI", "continuous"]
 EventStatus = Literal["NEW", "INVESTIGATING", "REPORTED"]
+TriageBucket = Literal["LOW", "MED", "HIGH"]
 
 
 class Asset(BaseModel):
@@ -52,13 +55,13 @@ class Event(BaseModel):
     status: EventStatus
     investigation_started_utc: Optional[datetime] = None
     report_submitted_utc: Optional[datetime] = None
-    notes: Dict[str, List[Dict[str, str]]] = Field(default_factory=dict)
+    notes: EventNotes = Field(default_factory=EventNotes)
 
 
 class EventOut(Event):
     asset: Asset
     triage_score: float
-    triage_bucket: Literal["LOW", "MED", "HIGH"]
+    triage_bucket: TriageBucket
     triage_breakdown: TriageBreakdown
     sla_investigate_deadline_utc: datetime
     sla_report_deadline_utc: datetime
@@ -80,10 +83,201 @@ class RunbookCompletionRequest(BaseModel):
     item_id: str = Field(..., min_length=1)
 
 
-class CSVImportResult(BaseModel):
+BulkAction = Literal["investigate", "report", "runbook"]
+
+
+class BulkEventFilter(BaseModel):
+    status: Optional[EventStatus] = None
+    site_ids: Optional[List[str]] = Field(None, min_length=1)
+    detected_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def _check_criteria(self) -> "BulkEventFilter":
+        if self.status is None and self.site_ids is None and self.detected_before is None:
+            raise ValueError("A filter needs at least one of 'status', 'site_ids' or 'detected_before'")
+        return self
+
+
+class BulkActionRequest(BaseModel):
+    action: BulkAction
+    ids: Optional[List[str]] = Field(None, min_length=1)
+    filter: Optional[BulkEventFilter] = None
+    item_id: Optional[str] = Field(None, min_length=1, description="Runbook item, required for action=runbook.")
+
+    @model_validator(mode="after")
+    def _check_target(self) -> "BulkActionRequest":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of 'ids' or 'filter'")
+        if self.action == "runbook" and not self.item_id:
+            raise ValueError("'item_id' is required for the runbook action")
+        return self
+
+
+class BulkItemResult(BaseModel):
+    id: str
+    outcome: Literal["updated", "unchanged", "not_found"]
+    status: Optional[EventStatus] = None
+
+
+class BulkActionResult(BaseModel):
+    action: BulkAction
+    updated: int
+    unchanged: int
+    not_found: int
+    results: List[BulkItemResult]
+
+
+RollupGroup = Literal["site", "operator", "detection_type"]
+RollupBucket = Literal["week", "month"]
+EmissionsBucket = Literal["month", "quarter", "year"]
+EmissionsUntil = Literal["report", "investigation"]
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+ExportStream = Literal["events", "audit"]
+
+
+class RollupRow(BaseModel):
+    site_id: Optional[str] = None
+    operator: Optional[str] = None
+    detection_type: Optional[str] = None
+    period_start_utc: Optional[datetime] = None
+    detections: int
+    total_est_ch4_kgph: Optional[float] = None
+    mean_est_ch4_kgph: Optional[float] = None
+    max_est_ch4_kgph: Optional[float] = None
+    mean_time_to_investigate_h: Optional[float] = None
+    mean_time_to_report_h: Optional[float] = None
+    sla_breach_rate: Optional[float] = None
+
+
+class AnalyticsRollup(BaseModel):
+    group_by: List[RollupGroup]
+    bucket: Optional[RollupBucket] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    generated_at_utc: datetime
+    data_version: int
+    rows: List[RollupRow]
+
+
+class EmissionsRow(BaseModel):
+    site_id: Optional[str] = None
+    operator: Optional[str] = None
+    detection_type: Optional[str] = None
+    period_start_utc: Optional[datetime] = None
+    events: int
+    emission_hours: float
+    mass_kg: Optional[float] = None
+    weighted_mass_kg: Optional[float] = None
+
+
+class EmissionsSummary(BaseModel):
+    group_by: List[RollupGroup]
+    bucket: Optional[EmissionsBucket] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    until: EmissionsUntil
+    max_duration_h: float
+    generated_at_utc: datetime
+    data_version: int
+    rows: List[EmissionsRow]
+
+
+class SearchHit(BaseModel):
+    id: str
+    site_id: str
+    status: EventStatus
+    score: float
+    matches: List[str] = Field(..., description="Log lines, runbook items or site text that matched, at most three.")
+
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    data_version: int
+    hits: List[SearchHit]
+
+
+class TriageSimulationRequest(BaseModel):
+    policy: Dict[str, Any] = Field(
+        ...,
+        description="Candidate policy in policy-file syntax (default/operators/sites), layered over the active policy.",
+    )
+    limit: int = Field(100, ge=0, le=1000, description="Maximum number of changed events to list.")
+
+
+class BucketTransition(BaseModel):
+    from_bucket: TriageBucket
+    to_bucket: TriageBucket
+    count: int
+
+
+class SimulatedEventChange(BaseModel):
+    id: str
+    site_id: str
+    current_score: float
+    simulated_score: float
+    current_bucket: TriageBucket
+    simulated_bucket: TriageBucket
+    current_investigate_deadline_utc: datetime
+    simulated_investigate_deadline_utc: datetime
+    current_report_deadline_utc: datetime
+    simulated_report_deadline_utc: datetime
+    current_breached: bool
+    simulated_breached: bool
+    simulated_breakdown: TriageBreakdown
+
+
+class TriageSimulationResult(BaseModel):
+    computed_at_utc: datetime
+    evaluated: int
+    changed: int
+    bucket_changes: int
+    sla_changes: int
+    transitions: List[BucketTransition]
+    events: List[SimulatedEventChange]
+    truncated: bool
+
+
+class DetectionIn(BaseModel):
+    """One streamed detection; the ``events.csv`` columns a sensor can report."""
+
+    id: str = Field(..., min_length=1)
+    site_id: str = Field(..., min_length=1)
+    detected_at_utc: datetime
+    detection_type: DetectionType
+    est_ch4_kgph: float = Field(..., ge=0)
+    confidence: float = Field(..., ge=0.0, le=1.0)
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+    status: EventStatus = "NEW"
+
+
+class StreamIngestResult(BaseModel):
+    received: int
+    accepted: int
+    rejected: int
+    batches: int
+    imported: int
+    skipped: int
+    merged: int
+    errors: List[str]
+
+
+class ImportJobStatus(BaseModel):
+    id: str
+    filename: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    rows_processed: int
     imported: int
     skipped: int
+    merged: int
+    rejected: int
+    failed_batches: int
+    errors: List[str]
     message: str
+    created_at_utc: datetime
+    started_at_utc: Optional[datetime] = None
+    finished_at_utc: Optional[datetime] = None
 
 
 class AIRequest(BaseModel):
@@ -95,3 +289,30 @@ class AIResponse(BaseModel):
     content: str
     usage: Optional[Dict[str, Any]] = None
 
+
+
+class ProfileFunction(BaseModel):
+    function: str
+    file: str
+    line: int
+    self_s: float
+    total_s: float
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    duration_s: float
+    interval_ms: float
+    samples: int
+    lock_wait_s: float
+    top_functions: List[ProfileFunction]
+
+
+class LockStats(BaseModel):
+    name: str
+    acquisitions: int
+    contended: int
+    total_wait_s: float
+    max_wait_s: float
+    total_hold_s: float
+    max_hold_s: float
@@ -0,0 +1,403 @@
+"""Vectorised triage scoring of whole event frames.
+
+:func:`compile_policies` turns a :class:`~app.triage.PolicySet` into per-policy
+parameter arrays plus a site -> policy index, so a frame is scored with a few numpy
+gathers however many overrides the policy file defines. Scores, buckets and SLA
+deadlines match :func:`~app.triage.triage_fields` event by event.
+
+:class:`TriageScorer` keeps each event's time-independent score component
+(severity plus confidence) between calls. A store write reloads the frame; a policy
+reload only re-scores events whose resolved policy changed those weights, while
+recency, buckets and SLAs are cheap enough to recompute on every call.
+:meth:`TriageScorer.simulate` scores the same frame with a candidate policy set and
+reports which events would change bucket or SLA deadlines.
+"""
+from __future__ import annotations
+
+import threading
+import weakref
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import span
+from .triage import PolicyRegistry, PolicySet, TriagePolicy, registry as default_registry
+
+if TYPE_CHECKING:
+    from .store import DataStore
+
+BUCKETS = ["LOW", "MED", "HIGH"]
+SCORE_COLUMNS = ["id", "site_id", "detected_at_utc", "detection_type", "est_ch4_kgph", "confidence"]
+
+
+def _static_params(policy: TriagePolicy) -> Tuple[Any, ...]:
+    """The policy fields the time-independent score component depends on."""
+    return (
+        dict(policy.detection_weights),
+        policy.fallback_detection_weight,
+        policy.severity_scale_kgph,
+        policy.severity_weight,
+        policy.confidence_weight,
+    )
+
+
+_NAT = np.iinfo(np.int64).min
+_NS_PER_S = 1e9
+
+
+@dataclass
+class ScoreFrame:
+    """The event columns scoring reads, as arrays with site and detection type factorised once."""
+
+    index: pd.Index
+    ids: pd.Series
+    site_ids: pd.Series
+    site_codes: np.ndarray
+    sites: List[str]
+    detection_codes: np.ndarray
+    detection_types: List[str]
+    est_ch4_kgph: np.ndarray
+    confidence: np.ndarray
+    detected_ns: np.ndarray  # int64 nanoseconds since the epoch (UTC); NaT is the int64 minimum
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "ScoreFrame":
+        """Prepare ``frame`` (columns :data:`SCORE_COLUMNS`)."""
+        site_codes, sites = pd.factorize(frame["site_id"])
+        detection_codes, detection_types = pd.factorize(frame["detection_type"])
+        detected = pd.to_datetime(frame["detected_at_utc"], utc=True)
+        return cls(
+            index=frame.index,
+            ids=frame["id"],
+            site_ids=frame["site_id"],
+            site_codes=site_codes,
+            sites=[str(site) for site in sites],
+            detection_codes=detection_codes,
+            detection_types=[str(name) for name in detection_types],
+            est_ch4_kgph=frame["est_ch4_kgph"].to_numpy(dtype=float),
+            confidence=frame["confidence"].to_numpy(dtype=float),
+            detected_ns=detected.to_numpy(dtype="datetime64[ns]").view("i8"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+def _lookup(codes: np.ndarray, values: List[str], table: Mapping[str, int], default: int) -> np.ndarray:
+    """Map factorised ``codes`` through ``table`` with one lookup per distinct value."""
+    mapped = np.array([table.get(value, default) for value in values] + [default], dtype=np.intp)
+    return mapped[codes]  # the NA code -1 picks the trailing default
+
+
+def _utc_series(nanoseconds: np.ndarray, index: pd.Index) -> pd.Series:
+    return pd.Series(nanoseconds.view("M8[ns]"), index=index, dtype="datetime64[ns, UTC]")
+
+
+@dataclass
+class CompiledPolicies:
+    """A policy set as lookup arrays indexed by policy number (0 is the default)."""
+
+    policies: List[TriagePolicy]
+    site_policy: Dict[str, int]
+    detection_columns: Dict[str, int]
+    detection_weight: np.ndarray  # (policies, detection types + fallback)
+    severity_scale: np.ndarray
+    severity_weight: np.ndarray
+    confidence_weight: np.ndarray
+    tier_hours: np.ndarray  # (policies, tiers), padded with -inf
+    tier_boost: np.ndarray
+    high_threshold: np.ndarray
+    med_threshold: np.ndarray
+    investigate_sla_ns: np.ndarray
+    report_sla_ns: np.ndarray
+
+    def policy_index(self, events: ScoreFrame) -> np.ndarray:
+        return _lookup(events.site_codes, events.sites, self.site_policy, 0)
+
+    def slas(self, site_ids: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """Investigate and report SLAs of each site's policy, aligned with ``site_ids``."""
+        codes, sites = pd.factorize(site_ids)
+        policy_idx = _lookup(codes, [str(site) for site in sites], self.site_policy, 0)
+        return tuple(  # type: ignore[return-value]
+            pd.Series(pd.to_timedelta(sla_ns[policy_idx]), index=site_ids.index)
+            for sla_ns in (self.investigate_sla_ns, self.report_sla_ns)
+        )
+
+    def static_scores(self, events: ScoreFrame, policy_idx: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Severity plus confidence components of each row's score (only ``rows`` when given)."""
+        detection = _lookup(
+            events.detection_codes, events.detection_types, self.detection_columns, len(self.detection_columns)
+        )
+        est_ch4_kgph, confidence = events.est_ch4_kgph, events.confidence
+        if rows is not None:
+            detection, est_ch4_kgph, confidence = detection[rows], est_ch4_kgph[rows], confidence[rows]
+            policy_idx = policy_idx[rows]
+        base_severity = np.minimum(est_ch4_kgph / self.severity_scale[policy_idx], 1.0)
+        severity_component = (
+            base_severity * self.detection_weight[policy_idx, detection] * self.severity_weight[policy_idx]
+        )
+        return severity_component + confidence * self.confidence_weight[policy_idx]
+
+    def evaluate(
+        self, events: ScoreFrame, policy_idx: np.ndarray, static: np.ndarray, now: datetime
+    ) -> Dict[str, np.ndarray]:
+        """Add recency, thresholds and SLAs at ``now`` to precomputed :meth:`static_scores`.
+
+        Returns raw arrays: ``bucket`` indexes :data:`BUCKETS` and deadlines are int64
+        nanoseconds. Ages are converted to hours the way ``timedelta.total_seconds()``
+        does, so tier boundaries fall exactly where :func:`~app.triage.triage_fields` puts them.
+        """
+        now_ns = pd.Timestamp(now).value
+        missing = events.detected_ns == _NAT
+        age_hours = np.where(missing, np.nan, (now_ns - events.detected_ns) / _NS_PER_S / 3600)
+        recency_boost = np.zeros(len(events))
+        for tier in reversed(range(self.tier_hours.shape[1])):
+            younger = age_hours < self.tier_hours[policy_idx, tier]
+            recency_boost = np.where(younger, self.tier_boost[policy_idx, tier], recency_boost)
+
+        score = np.clip(static + recency_boost, 0.0, 1.0)
+        # med <= high, so the two comparisons add up to an index into BUCKETS.
+        bucket = (score >= self.med_threshold[policy_idx]).astype(np.int8) + (
+            score >= self.high_threshold[policy_idx]
+        )
+        result = {"policy": policy_idx, "recency_boost": recency_boost, "triage_score": score, "bucket": bucket}
+        for name, sla_ns in (("investigate", self.investigate_sla_ns), ("report", self.report_sla_ns)):
+            result[f"{name}_deadline_ns"] = np.where(missing, _NAT, events.detected_ns + sla_ns[policy_idx])
+            result[f"{name}_remaining_h"] = np.where(
+                missing, np.nan, (result[f"{name}_deadline_ns"] - now_ns) / _NS_PER_S / 3600
+            )
+        return result
+
+    def finish(self, events: ScoreFrame, policy_idx: np.ndarray, static: np.ndarray, now: datetime) -> pd.DataFrame:
+        """:meth:`evaluate` as a frame with the ``EventOut`` triage/SLA column names."""
+        result = self.evaluate(events, policy_idx, static, now)
+        columns: Dict[str, Any] = {
+            "id": events.ids,
+            "site_id": events.site_ids,
+            "policy": result["policy"],
+            "recency_boost": result["recency_boost"],
+            "triage_score": result["triage_score"],
+            "triage_bucket": pd.Categorical.from_codes(result["bucket"], categories=BUCKETS),
+        }
+        for name in ("investigate", "report"):
+            columns[f"sla_{name}_deadline_utc"] = _utc_series(result[f"{name}_deadline_ns"], events.index)
+            columns[f"sla_{name}_remaining_h"] = result[f"{name}_remaining_h"]
+            columns[f"sla_{name}_breached"] = result[f"{name}_remaining_h"] < 0
+        return pd.DataFrame(columns, index=events.index)
+
+    def score(self, frame: pd.DataFrame | ScoreFrame, now: Optional[datetime] = None) -> pd.DataFrame:
+        """Score every row of ``frame`` (columns :data:`SCORE_COLUMNS`) at ``now``."""
+        events = frame if isinstance(frame, ScoreFrame) else ScoreFrame.from_frame(frame)
+        policy_idx = self.policy_index(events)
+        return self.finish(events, policy_idx, self.static_scores(events, policy_idx), now or datetime.now(timezone.utc))
+
+
+def compile_policies(policies: PolicySet, operators: Mapping[str, str]) -> CompiledPolicies:
+    """Compile ``policies`` for sites whose operators are given by ``operators`` (site -> operator)."""
+    compiled: List[TriagePolicy] = [policies.default]
+    site_policy: Dict[str, int] = {}
+    for site_id in set(operators) | set(policies.site_overrides):
+        policy = policies.resolve(site_id, operators.get(site_id))
+        for index, known in enumerate(compiled):
+            if known == policy:
+                break
+        else:
+            compiled.append(policy)
+            index = len(compiled) - 1
+        if index:
+            site_policy[site_id] = index
+
+    detection_columns: Dict[str, int] = {}
+    for policy in compiled:
+        for detection_type in policy.detection_weights:
+            detection_columns.setdefault(detection_type, len(detection_columns))
+    detection_weight = np.array(
+        [
+            [policy.detection_weight(name) for name in detection_columns] + [policy.fallback_detection_weight]
+            for policy in compiled
+        ],
+        dtype=float,
+    )
+    tiers = max(1, max(len(policy.recency_tiers) for policy in compiled))
+    tier_hours = np.full((len(compiled), tiers), -np.inf)
+    tier_boost = np.zeros((len(compiled), tiers))
+    for row, policy in enumerate(compiled):
+        for column, (hours, boost) in enumerate(policy.recency_tiers):
+            tier_hours[row, column] = hours
+            tier_boost[row, column] = boost
+
+    def column(attribute: str) -> np.ndarray:
+        return np.array([getattr(policy, attribute) for policy in compiled], dtype=float)
+
+    return CompiledPolicies(
+        policies=compiled,
+        site_policy=site_policy,
+        detection_columns=detection_columns,
+        detection_weight=detection_weight,
+        severity_scale=column("severity_scale_kgph"),
+        severity_weight=column("severity_weight"),
+        confidence_weight=column("confidence_weight"),
+        tier_hours=tier_hours,
+        tier_boost=tier_boost,
+        high_threshold=column("high_threshold"),
+        med_threshold=column("med_threshold"),
+        investigate_sla_ns=np.array(
+            [policy.investigate_sla for policy in compiled], dtype="timedelta64[ns]"
+        ).view("i8"),
+        report_sla_ns=np.array([policy.report_sla for policy in compiled], dtype="timedelta64[ns]").view("i8"),
+    )
+
+
+def site_operators(store: DataStore) -> Dict[str, str]:
+    operators: Dict[str, str] = {}
+    for asset in store.list_assets():
+        operators.setdefault(str(asset.site_id), asset.operator)
+    return operators
+
+
+@dataclass
+class Simulation:
+    """How a candidate policy set would re-triage every event, relative to the active one."""
+
+    evaluated: int
+    transitions: Dict[Tuple[str, str], int]  # (current bucket, simulated bucket) -> events
+    bucket_changes: int
+    sla_changes: int
+    changed: pd.DataFrame  # one row per changed event, largest score change first
+    computed_at_utc: datetime
+
+
+def compare_scores(
+    events: ScoreFrame, current: Dict[str, np.ndarray], simulated: Dict[str, np.ndarray], now: datetime
+) -> Simulation:
+    """Diff two :meth:`CompiledPolicies.evaluate` results for the same events."""
+    counts = np.bincount(
+        current["bucket"].astype(np.intp) * len(BUCKETS) + simulated["bucket"], minlength=len(BUCKETS) ** 2
+    )
+    transitions = {
+        (BUCKETS[index // len(BUCKETS)], BUCKETS[index % len(BUCKETS)]): int(count)
+        for index, count in enumerate(counts)
+        if count
+    }
+    bucket_changed = current["bucket"] != simulated["bucket"]
+    sla_changed = (current["investigate_deadline_ns"] != simulated["investigate_deadline_ns"]) | (
+        current["report_deadline_ns"] != simulated["report_deadline_ns"]
+    )
+    rows = np.flatnonzero(bucket_changed | sla_changed)
+
+    def breached(result: Dict[str, np.ndarray]) -> np.ndarray:
+        return (result["investigate_remaining_h"][rows] < 0) | (result["report_remaining_h"][rows] < 0)
+
+    index = events.index[rows]
+    changed = pd.DataFrame(
+        {
+            "id": events.ids.to_numpy()[rows].astype(str),
+            "site_id": events.site_ids.to_numpy()[rows].astype(str),
+            "current_score": current["triage_score"][rows],
+            "simulated_score": simulated["triage_score"][rows],
+            "current_bucket": np.array(BUCKETS)[current["bucket"][rows]],
+            "simulated_bucket": np.array(BUCKETS)[simulated["bucket"][rows]],
+            "current_investigate_deadline_utc": _utc_series(current["investigate_deadline_ns"][rows], index),
+            "simulated_investigate_deadline_utc": _utc_series(simulated["investigate_deadline_ns"][rows], index),
+            "current_report_deadline_utc": _utc_series(current["report_deadline_ns"][rows], index),
+            "simulated_report_deadline_utc": _utc_series(simulated["report_deadline_ns"][rows], index),
+            "current_breached": breached(current),
+            "simulated_breached": breached(simulated),
+        },
+        index=index,
+    )
+    delta = (changed["simulated_score"] - changed["current_score"]).abs()
+    order = np.lexsort((changed["id"].to_numpy(), -delta.to_numpy()))
+    return Simulation(
+        evaluated=len(events),
+        transitions=transitions,
+        bucket_changes=int(bucket_changed.sum()),
+        sla_changes=int(sla_changed.sum()),
+        changed=changed.iloc[order].reset_index(drop=True),
+        computed_at_utc=now,
+    )
+
+
+@dataclass
+class _ScoreState:
+    data_version: int
+    policy_version: int
+    events: ScoreFrame
+    compiled: CompiledPolicies
+    policy_idx: np.ndarray
+    static: np.ndarray
+
+
+class TriageScorer:
+    """Scores all of a store's events with the active policies, reusing work between calls.
+
+    ``rescored`` is the number of events whose static component the last call had to
+    compute, which is zero when neither events nor the relevant policy weights changed.
+    """
+
+    def __init__(self, policy_registry: PolicyRegistry = default_registry) -> None:
+        self._registry = policy_registry
+        self._lock = threading.Lock()
+        self._states: "weakref.WeakKeyDictionary[DataStore, _ScoreState]" = weakref.WeakKeyDictionary()
+        self.rescored = 0
+
+    def scores(self, store: DataStore, now: Optional[datetime] = None) -> pd.DataFrame:
+        """One row per event (see :meth:`CompiledPolicies.finish`) in backend order."""
+        now = now or datetime.now(timezone.utc)
+        with span("triage.score_all"), self._lock:
+            state = self._refresh(store)
+            return state.compiled.finish(state.events, state.policy_idx, state.static, now)
+
+    def simulate(self, store: DataStore, candidate: PolicySet, now: Optional[datetime] = None) -> Simulation:
+        """Score every event with ``candidate`` and compare against the active policies."""
+        now = now or datetime.now(timezone.utc)
+        with span("triage.simulate"):
+            with self._lock:
+                state = self._refresh(store)
+                current = state.compiled.evaluate(state.events, state.policy_idx, state.static, now)
+            compiled = compile_policies(candidate, site_operators(store))
+            policy_idx = compiled.policy_index(state.events)
+            simulated = compiled.evaluate(
+                state.events, policy_idx, compiled.static_scores(state.events, policy_idx), now
+            )
+            return compare_scores(state.events, current, simulated, now)
+
+    def _refresh(self, store: DataStore) -> _ScoreState:
+        data_version = store.version
+        policy_version = self._registry.version
+        policies = self._registry.current()
+        state = self._states.get(store)
+        if state is not None and (state.data_version, state.policy_version) == (data_version, policy_version):
+            self.rescored = 0
+            return state
+
+        compiled = compile_policies(policies, site_operators(store))
+        if state is None or state.data_version != data_version:
+            events = ScoreFrame.from_frame(store.backend.events_frame(columns=SCORE_COLUMNS).reset_index(drop=True))
+            policy_idx = compiled.policy_index(events)
+            static = compiled.static_scores(events, policy_idx)
+            self.rescored = len(events)
+        else:
+            events = state.events
+            policy_idx = compiled.policy_index(events)
+            unchanged = np.array(
+                [
+                    [_static_params(old) == _static_params(new) for new in compiled.policies]
+                    for old in state.compiled.policies
+                ],
+                dtype=bool,
+            )
+            stale = ~unchanged[state.policy_idx, policy_idx]
+            static = state.static.copy()
+            if stale.any():
+                static[stale] = compiled.static_scores(events, policy_idx, rows=stale)
+            self.rescored = int(stale.sum())
+        state = _ScoreState(data_version, policy_version, events, compiled, policy_idx, static)
+        self._states[store] = state
+        return state
+
+
+scorer = TriageScorer()
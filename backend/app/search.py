@@ -0,0 +1,240 @@
+"""In-process full-text search over event action logs and notes.
+
+Every event is one document made of its action-log messages and the labels of its
+completed runbook items; its site's name and operator match too. Text lives in an
+inverted index (term -> {document: term frequency}) ranked with BM25. Site text is
+indexed once per site rather than copied into every event's postings.
+
+The index is built from the store on the first search and then kept current by the
+store's change listener, which re-indexes just the events each write touched. When a
+listener cannot account for a version (another worker process wrote), the next
+search rebuilds from scratch.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Set, Tuple
+
+from .metrics import span
+from .notes import EventNotes
+
+if TYPE_CHECKING:
+    from .store import DataStore, StoreChange
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_MATCHED_LINES = 3
+STOPWORDS = frozenset({"a", "an", "and", "at", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased alphanumeric words without stopwords; ``"Site-safety"`` -> ``["site", "safety"]``."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def document_lines(notes: EventNotes, runbook_labels: Mapping[str, str]) -> List[str]:
+    """The searchable text of one event, one line per log entry or completed runbook item."""
+    lines = [entry.message for entry in notes.log_entries()]
+    lines.extend(runbook_labels.get(entry.item_id, entry.item_id) for entry in notes.runbook_completions())
+    return lines
+
+
+@dataclass
+class SearchHit:
+    event_id: str
+    site_id: str
+    status: str
+    score: float
+    matches: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SearchResult:
+    query: str
+    total: int
+    hits: List[SearchHit]
+    data_version: int
+
+
+class SearchIndex:
+    """Inverted index over one store's events; see the module docstring."""
+
+    def __init__(self, site_text: Mapping[str, str], runbook_labels: Mapping[str, str]) -> None:
+        self._runbook_labels = dict(runbook_labels)
+        self._site_text = dict(site_text)
+        self._site_terms: Dict[str, Set[str]] = {}
+        for site_id, text in self._site_text.items():
+            for term in tokenize(text):
+                self._site_terms.setdefault(term, set()).add(site_id)
+        self._lock = threading.Lock()
+        self._clear()
+        self.version = -1
+
+    def _clear(self) -> None:
+        self._docs: Dict[str, int] = {}
+        self._event_ids: List[str] = []
+        self._doc_sites: List[str] = []
+        self._doc_terms: List[Tuple[str, ...]] = []
+        self._doc_lengths: List[int] = []
+        self._total_length = 0
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._site_docs: Dict[str, Set[int]] = {}
+
+    # ---------- Maintenance ----------
+    def rebuild(self, store: DataStore) -> None:
+        with span("search.rebuild"), self._lock:
+            version = store.version
+            if version == self.version:  # another thread rebuilt it while we waited
+                return
+            frame = store.backend.events_frame(columns=["id", "site_id", "notes"])
+            self._clear()
+            for event_id, site_id, notes in zip(frame["id"], frame["site_id"], frame["notes"]):
+                self._index(str(event_id), str(site_id), EventNotes.coerce(notes))
+            self.version = version
+
+    def apply(self, change: StoreChange) -> None:
+        """Change listener: re-index the written events, or mark the index stale."""
+        with self._lock:
+            if change.from_version != self.version:
+                self.version = -1
+                return
+            for event_id, row in change.rows.items():
+                self._index(event_id, str(row.get("site_id")), EventNotes.coerce(row.get("notes")))
+            self.version = change.to_version
+
+    def _index(self, event_id: str, site_id: str, notes: EventNotes) -> None:
+        tokens = tokenize("\n".join(document_lines(notes, self._runbook_labels)))
+        frequencies = Counter(tokens)
+        doc = self._docs.get(event_id)
+        if doc is None:
+            doc = len(self._event_ids)
+            self._docs[event_id] = doc
+            self._event_ids.append(event_id)
+            self._doc_sites.append(site_id)
+            self._doc_terms.append(())
+            self._doc_lengths.append(0)
+            self._site_docs.setdefault(site_id, set()).add(doc)
+        for term in self._doc_terms[doc]:
+            postings = self._postings[term]
+            del postings[doc]
+            if not postings:
+                del self._postings[term]
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[doc] = frequency
+        self._total_length += len(tokens) - self._doc_lengths[doc]
+        self._doc_terms[doc] = tuple(frequencies)
+        self._doc_lengths[doc] = len(tokens)
+
+    # ---------- Queries ----------
+    def search(self, terms: Iterable[str], limit: int) -> Tuple[int, List[Tuple[str, float]]]:
+        """Events matching every term as ``(total, [(event_id, score), ...])``, best first."""
+        terms = list(dict.fromkeys(terms))
+        if not terms:
+            return 0, []
+        with self._lock:
+            count = len(self._event_ids)
+            if count == 0:
+                return 0, []
+            average_length = max(self._total_length / count, 1.0)
+            clauses = []
+            for term in terms:
+                postings = self._postings.get(term, {})
+                sites = self._site_terms.get(term, set())
+                size = len(postings) + sum(len(self._site_docs.get(site, ())) for site in sites)
+                if size == 0:
+                    return 0, []
+                idf = math.log(1 + (count - size + 0.5) / (size + 0.5))
+                clauses.append((size, postings, sites, idf))
+            # Drive the intersection from the rarest term.
+            clauses.sort(key=lambda clause: clause[0])
+            _, postings, sites, _ = clauses[0]
+            candidates: Set[int] = set(postings)
+            for site in sites:
+                candidates |= self._site_docs.get(site, set())
+
+            scored: List[Tuple[float, int]] = []
+            for doc in candidates:
+                score = 0.0
+                for _, postings, sites, idf in clauses:
+                    frequency = postings.get(doc)
+                    in_site = self._doc_sites[doc] in sites
+                    if frequency is None and not in_site:
+                        break
+                    if frequency is not None:
+                        norm = 1 - BM25_B + BM25_B * self._doc_lengths[doc] / average_length
+                        score += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                    if in_site:
+                        score += idf
+                else:
+                    scored.append((score, doc))
+            # Ties go to the most recently indexed event.
+            best = heapq.nlargest(limit, scored)
+            return len(scored), [(self._event_ids[doc], round(score, 4)) for score, doc in best]
+
+    def matched_lines(self, terms: Iterable[str], site_id: str, notes: EventNotes) -> List[str]:
+        wanted = set(terms)
+        lines = [line for line in document_lines(notes, self._runbook_labels) if wanted & set(tokenize(line))]
+        site_text = self._site_text.get(site_id, "")
+        if len(lines) < MAX_MATCHED_LINES and wanted & set(tokenize(site_text)):
+            lines.append(site_text)
+        return lines[:MAX_MATCHED_LINES]
+
+
+_indexes_lock = threading.Lock()
+_indexes: "weakref.WeakKeyDictionary[DataStore, SearchIndex]" = weakref.WeakKeyDictionary()
+
+
+def index_for(store: DataStore) -> SearchIndex:
+    """The store's search index, created (and subscribed to its changes) on first use."""
+    with _indexes_lock:
+        index = _indexes.get(store)
+        if index is None:
+            index = SearchIndex(
+                {asset.site_id: f"{asset.site_name} {asset.operator}" for asset in store.list_assets()},
+                {item.id: item.label for item in store.runbook_template},
+            )
+            store.add_change_listener(index.apply)
+            _indexes[store] = index
+    return index
+
+
+def ensure_index(store: DataStore) -> Tuple[SearchIndex, int]:
+    """The store's index, rebuilt first if it is behind; returns it with the version it reflects."""
+    index = index_for(store)
+    version = store.version
+    if index.version != version:
+        index.rebuild(store)
+    return index, version
+
+
+def search_events(store: DataStore, query: str, limit: int = 20) -> SearchResult:
+    """Events whose log, runbook notes or site match every word of ``query``."""
+    terms = tokenize(query)
+    with span("search.query"):
+        index, version = ensure_index(store)
+        total, ranked = index.search(terms, limit)
+        rows = store.backend.get_event_rows([event_id for event_id, _ in ranked])
+        hits = []
+        for event_id, score in ranked:
+            row = rows.get(event_id)
+            if row is None:
+                continue
+            site_id = str(row.get("site_id"))
+            hits.append(
+                SearchHit(
+                    event_id=event_id,
+                    site_id=site_id,
+                    status=str(row.get("status")),
+                    score=score,
+                    matches=index.matched_lines(terms, site_id, EventNotes.coerce(row.get("notes"))),
+                )
+            )
+    return SearchResult(query=query, total=total, hits=hits, data_version=version)
@@ -0,0 +1,138 @@
+"""orjson-backed JSON responses for large payloads.
+
+List endpoints hand plain dicts (built from already validated events) to
+:class:`FastJSONResponse` instead of returning response models, which skips
+FastAPI's response validation and pydantic's per-model serialisation. orjson
+formats datetimes natively; ``OPT_UTC_Z`` keeps them byte-identical to what
+pydantic emits (``2024-01-01T00:00:00Z``).
+
+Event lists can also be negotiated via ``Accept`` as MessagePack (same document
+shape, datetimes as the same ISO strings) or as an Arrow IPC stream with one row
+per event, when the optional ``msgpack`` / ``pyarrow`` packages are installed.
+Clients asking for an unavailable format get JSON, as ``Content-Type`` says.
+Both packages are only looked up at import time and loaded by the first response
+that needs them, so app startup stays light.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from .compression import parse_quality_header
+from .metrics import span
+from .notes import EventNotes, format_timestamp
+
+# Optional encoders, imported on first use.
+HAS_MSGPACK = find_spec("msgpack") is not None
+HAS_PYARROW = find_spec("pyarrow") is not None
+
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+_MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, EventNotes):
+        return value._serialized()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=_default, option=JSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        with span("api.serialize"):
+            return dumps(content)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return format_timestamp(value)
+    return _default(value)
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        import msgpack
+
+        with span("api.serialize"):
+            return msgpack.packb(content, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+class ArrowResponse(Response):
+    """Arrow IPC stream of ``content``, a list of flat-or-nested row dicts."""
+
+    media_type = ARROW_MEDIA_TYPE
+
+    def render(self, content: List[Dict[str, Any]]) -> bytes:
+        import pyarrow
+        import pyarrow.ipc
+
+        with span("api.serialize"):
+            rows = [
+                {key: value._serialized() if isinstance(value, EventNotes) else value for key, value in row.items()}
+                for row in content
+            ]
+            table = pyarrow.Table.from_pylist(rows)
+            sink = pyarrow.BufferOutputStream()
+            with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue().to_pybytes()
+
+
+def available_media_types() -> List[str]:
+    offered = [JSON_MEDIA_TYPE]
+    if HAS_MSGPACK:
+        offered.append(MSGPACK_MEDIA_TYPE)
+    if HAS_PYARROW:
+        offered.append(ARROW_MEDIA_TYPE)
+    return offered
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """Pick the best available list encoding for an ``Accept`` header (JSON on ties)."""
+    if not accept:
+        return JSON_MEDIA_TYPE
+    qualities: Dict[str, float] = {}
+    for token, quality in parse_quality_header(accept).items():
+        token = _MEDIA_TYPE_ALIASES.get(token, token)
+        qualities[token] = max(quality, qualities.get(token, 0.0))
+    best, best_quality = JSON_MEDIA_TYPE, 0.0
+    for media_type in available_media_types():
+        quality = qualities.get(
+            media_type,
+            qualities.get(media_type.split("/")[0] + "/*", qualities.get("*/*", 0.0)),
+        )
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def list_response(key: str, rows: List[Dict[str, Any]], accept: Optional[str]) -> Response:
+    """Encode ``{key: rows}`` in the negotiated format (Arrow streams the rows only)."""
+    media_type = negotiate_media_type(accept)
+    headers = {"Vary": "Accept"}
+    if media_type == ARROW_MEDIA_TYPE:
+        return ArrowResponse(rows, headers=headers)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return MsgPackResponse({key: rows}, headers=headers)
+    return FastJSONResponse({key: rows}, headers=headers)
@@ -1,25 +1,85 @@
 from __future__ import annotations
 
-import copy
 import io
-import json
+import logging
+import os
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from threading import Lock
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import pandas as pd
 
+from .backends import (
+    BACKEND_ENV,
+    HOT_MONTHS_ENV,
+    SHARED_ENV,
+    SQLITE_PATH_ENV,
+    EventBackend,
+    EventRow,
+    create_backend,
+)
+from .dedup import DEFAULT_CLUSTER_DISTANCE_M, DEFAULT_CLUSTER_WINDOW_HOURS, cluster_detections
+from .metrics import span
+from .notes import DuplicateRecord, EventNotes, LogEntry, RunbookCompletion
+from .profiling import InstrumentedLock, LockSnapshot
 from .schemas import ActionLogEntry, Asset, Event, RunbookItem
+from .validation import ValidationReport, validate_events
 
 DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class CSVAppendResult:
     imported: int
     skipped: int
+    merged: int = 0
+    rejected: int = 0
+    report: Optional[ValidationReport] = None  # per-row failures of the rejected rows
+
+
+REQUIRED_IMPORT_COLUMNS = frozenset(
+    {
+        "id",
+        "site_id",
+        "detected_at_utc",
+        "detection_type",
+        "est_ch4_kgph",
+        "confidence",
+        "lat",
+        "lon",
+        "status",
+    }
+)
+
+BULK_ACTIONS = ("investigate", "report", "runbook")
+
+
+@dataclass(frozen=True)
+class StoreChange:
+    """Events inserted or updated by one committed store write.
+
+    ``rows`` holds their stored rows after the commit. A listener that has seen every
+    change since ``from_version`` can apply this one and move to ``to_version``;
+    otherwise something else (another process) wrote in between and it should resync.
+    """
+
+    rows: Dict[str, EventRow]
+    from_version: int
+    to_version: int
+
+
+ChangeListener = Callable[[StoreChange], None]
+
+
+@dataclass
+class BulkOutcome:
+    event_id: str
+    outcome: str  # "updated", "unchanged" or "not_found"
+    status: Optional[str] = None
 
 
 DEFAULT_RUNBOOK_TEMPLATE: List[RunbookItem] = [
@@ -45,70 +105,104 @@ DEFAULT_RUNBOOK_TEMPLATE: List[RunbookItem] = [
     ),
 ]
 
-DEFAULT_NOTES: Dict[str, List[Dict[str, str]]] = {
-    "runbook_completed": [],
-    "log": [],
-}
-
 
 class DataStore:
-    """File-backed store for assets and methane events."""
-
-    def __init__(self, data_dir: Path | None = None, runbook_template: Optional[List[RunbookItem]] = None) -> None:
-        self._lock = Lock()
+    """File-backed store for assets and methane events.
+
+    Assets are read from ``assets.csv``; events live in a pluggable
+    :class:`~app.backends.EventBackend` (CSV by default, SQLite when
+    ``EVENTS_BACKEND=sqlite``, month-partitioned hot/cold CSV when
+    ``partitioned``). Every mutation runs as one backend transaction, so with
+    ``EVENTS_SHARED=1`` or SQLite several worker processes can share the data.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path | None = None,
+        runbook_template: Optional[List[RunbookItem]] = None,
+        cluster_distance_m: float = DEFAULT_CLUSTER_DISTANCE_M,
+        cluster_window_hours: float = DEFAULT_CLUSTER_WINDOW_HOURS,
+        backend: EventBackend | None = None,
+    ) -> None:
+        self._lock = InstrumentedLock("store.lock")
         self._data_dir = data_dir or DEFAULT_DATA_DIR
         self._assets_path = self._data_dir / "assets.csv"
-        self._events_path = self._data_dir / "events.csv"
         self._runbook_template = runbook_template or DEFAULT_RUNBOOK_TEMPLATE
+        self._cluster_distance_m = cluster_distance_m
+        self._cluster_window_hours = cluster_window_hours
+        self._listeners: List[ChangeListener] = []
 
-        if not self._assets_path.exists() or not self._events_path.exists():
+        if not self._assets_path.exists():
             raise FileNotFoundError(
                 "Expected data CSVs not found. Ensure assets.csv and events.csv are present in the data directory."
             )
 
-        self._assets_df = pd.read_csv(self._assets_path)
-        self._events_df = self._load_events()
+        with span("store.load"):
+            self._assets_df = pd.read_csv(self._assets_path)
+            self._assets = [Asset(**record) for record in self._assets_df.to_dict(orient="records")]
+            self._assets_by_id: Dict[str, Asset] = {}
+            for asset in self._assets:
+                self._assets_by_id.setdefault(str(asset.site_id), asset)
+            self._asset_fields = {site_id: asset.model_dump() for site_id, asset in self._assets_by_id.items()}
+            if backend is None:
+                db_path = os.getenv(SQLITE_PATH_ENV)
+                backend = create_backend(
+                    os.getenv(BACKEND_ENV, "csv"),
+                    self._data_dir,
+                    db_path=Path(db_path) if db_path else None,
+                    shared=os.getenv(SHARED_ENV, "").strip().lower() in {"1", "true", "yes", "on"},
+                    hot_months=int(os.getenv(HOT_MONTHS_ENV) or 0) or None,
+                )
+        self._backend = backend
 
-    # ---------- Data loading utilities ----------
-    def _load_events(self) -> pd.DataFrame:
-        df = pd.read_csv(self._events_path)
-        for column in ["detected_at_utc", "investigation_started_utc", "report_submitted_utc"]:
-            df[column] = pd.to_datetime(df[column], utc=True, errors="coerce")
-        df["notes"] = df["notes"].apply(self._deserialize_notes)
-        return df
+    @property
+    def backend(self) -> EventBackend:
+        return self._backend
 
-    @staticmethod
-    def _deserialize_notes(value: object) -> Dict[str, List[Dict[str, str]]]:
-        if isinstance(value, dict):
-            notes = value
-        else:
-            text = "" if value is None else str(value)
-            if not text or text == "nan":
-                notes = {}
-            else:
-                try:
-                    parsed = json.loads(text)
-                    notes = parsed if isinstance(parsed, dict) else {"log": []}
-                except json.JSONDecodeError:
-                    notes = {"log": [{"message": text, "timestamp_utc": ""}]}
-        normalized: Dict[str, List[Dict[str, str]]] = {
-            "runbook_completed": [],
-            "log": [],
-        }
-        for key in normalized.keys():
-            items = notes.get(key, []) if isinstance(notes, dict) else []
-            if isinstance(items, list):
-                cleaned: List[Dict[str, str]] = []
-                for item in items:
-                    if isinstance(item, dict):
-                        cleaned.append({k: str(v) for k, v in item.items()})
-                normalized[key] = cleaned
-        return normalized
+    def lock_stats(self) -> LockSnapshot:
+        return self._lock.snapshot()
 
-    @staticmethod
-    def _serialize_notes(value: Dict[str, List[Dict[str, str]]]) -> str:
-        return json.dumps(value, ensure_ascii=False)
+    @property
+    def version(self) -> int:
+        """Changes whenever events change (here or in another process); use it to key caches."""
+        return self._backend.data_version()
+
+    @property
+    def runbook_template(self) -> List[RunbookItem]:
+        return list(self._runbook_template)
+
+    def add_change_listener(self, listener: ChangeListener) -> None:
+        """Call ``listener`` with a :class:`StoreChange` after every write made through this store.
+
+        Listeners run in commit order while the store lock is held, so keep them short.
+        """
+        self._listeners.append(listener)
 
+    def remove_change_listener(self, listener: ChangeListener) -> None:
+        self._listeners.remove(listener)
+
+    @contextmanager
+    def _write(self) -> Iterator[Dict[str, None]]:
+        """Store lock plus one backend transaction; ids added to the yielded dict are
+        reported to change listeners once the transaction has committed."""
+        changed: Dict[str, None] = {}
+        with self._lock:
+            with self._backend.transaction():
+                from_version = self._backend.data_version()
+                yield changed
+            if changed and self._listeners:
+                change = StoreChange(
+                    rows=self._backend.get_event_rows(changed),
+                    from_version=from_version,
+                    to_version=self._backend.data_version(),
+                )
+                for listener in list(self._listeners):
+                    try:
+                        listener(change)
+                    except Exception:  # the write has committed; a broken listener must not undo it
+                        logger.exception("Store change listener %r failed", listener)
+
+    # ---------- Data loading utilities ----------
     @staticmethod
     def _ensure_aware(dt: Optional[datetime]) -> Optional[datetime]:
         if dt is None:
@@ -144,222 +238,330 @@ class DataStore:
 
     # ---------- Public accessors ----------
     def list_assets(self) -> List[Asset]:
-        return [Asset(**record) for record in self._assets_df.to_dict(orient="records")]
-
-    def list_events(self) -> List[Event]:
-        return [self._row_to_event(row) for _, row in self._events_df.iterrows()]
+        return list(self._assets)
+
+    def list_events(
+        self,
+        status: Optional[str] = None,
+        detected_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Event]:
+        with span("store.list"):
+            rows = self._backend.query_events(
+                status=status,
+                detected_before=detected_before,
+                limit=limit,
+                offset=offset,
+            )
+            return [self._row_to_event(row) for row in rows]
+
+    def list_event_ids(
+        self,
+        status: Optional[str] = None,
+        detected_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        """Ids of the events :meth:`list_events` would return, without building them."""
+        with span("store.list"):
+            return self._backend.query_event_ids(
+                status=status,
+                detected_before=detected_before,
+                limit=limit,
+                offset=offset,
+            )
 
     def get_asset(self, site_id: str) -> Asset:
-        match = self._assets_df[self._assets_df["site_id"].astype(str) == site_id]
-        if match.empty:
-            raise KeyError(f"Asset {site_id} not found")
-        return Asset(**match.iloc[0].to_dict())
+        try:
+            return self._assets_by_id[site_id]
+        except KeyError:
+            raise KeyError(f"Asset {site_id} not found") from None
+
+    def asset_fields(self, site_id: str) -> Dict[str, object]:
+        """Plain-data form of :meth:`get_asset`; shared, so treat it as read-only."""
+        try:
+            return self._asset_fields[site_id]
+        except KeyError:
+            raise KeyError(f"Asset {site_id} not found") from None
 
     def get_event(self, event_id: str) -> Event:
-        match = self._events_df[self._events_df["id"].astype(str) == event_id]
-        if match.empty:
-            raise KeyError(f"Event {event_id} not found")
-        return self._row_to_event(match.iloc[0])
+        return self._row_to_event(self._require_row(event_id))
 
-    def _row_to_event(self, row: pd.Series) -> Event:
-        data = row.to_dict()
+    def get_events(self, event_ids: Sequence[str]) -> List[Event]:
+        """Events for ``event_ids`` in the given order; unknown ids are left out."""
+        rows = self._backend.get_event_rows(event_ids)
+        return [self._row_to_event(rows[event_id]) for event_id in event_ids if event_id in rows]
+
+    def _row_to_event(self, row: Dict[str, object]) -> Event:
+        data = dict(row)
         data["detected_at_utc"] = self._parse_datetime(row.get("detected_at_utc"))
         data["investigation_started_utc"] = self._parse_datetime(row.get("investigation_started_utc"))
         data["report_submitted_utc"] = self._parse_datetime(row.get("report_submitted_utc"))
-        notes = row.get("notes") or {}
-        data["notes"] = copy.deepcopy(notes)
+        # Notes are immutable views, so the event can share the stored instance.
+        data["notes"] = EventNotes.coerce(row.get("notes"))
         return Event(**data)  # type: ignore[arg-type]
 
     # ---------- Mutations ----------
+    # Each ``_*_changes`` helper returns the column changes for one row, or ``None``
+    # when the transition would not change anything; single and bulk updates share them.
+    @staticmethod
+    def _investigate_changes(row: Dict[str, object], timestamp: datetime) -> Dict[str, object]:
+        notes = EventNotes.coerce(row.get("notes")).with_log(LogEntry.at("Investigation started", timestamp))
+        return {"status": "INVESTIGATING", "investigation_started_utc": timestamp, "notes": notes}
+
+    @staticmethod
+    def _report_changes(row: Dict[str, object], timestamp: datetime) -> Dict[str, object]:
+        notes = EventNotes.coerce(row.get("notes")).with_log(LogEntry.at("Report submitted", timestamp))
+        return {"status": "REPORTED", "report_submitted_utc": timestamp, "notes": notes}
+
+    @staticmethod
+    def _runbook_changes(row: Dict[str, object], item_id: str, timestamp: datetime) -> Optional[Dict[str, object]]:
+        notes = EventNotes.coerce(row.get("notes"))
+        if notes.has_runbook_item(item_id):
+            return None
+        notes = notes.with_runbook_completion(RunbookCompletion.at(item_id, timestamp))
+        notes = notes.with_log(LogEntry.at(f"Runbook item completed: {item_id}", timestamp))
+        return {"notes": notes}
+
     def set_investigation_started(self, event_id: str, timestamp: datetime) -> Event:
         timestamp = self._ensure_aware(timestamp)
-        with self._lock:
-            idx = self._locate_index(event_id)
-            notes = copy.deepcopy(self._events_df.at[idx, "notes"]) or copy.deepcopy(DEFAULT_NOTES)
-            notes.setdefault("log", []).append(
-                {
-                    "message": "Investigation started",
-                    "timestamp_utc": self._format_iso(timestamp),
-                }
-            )
-            self._events_df.at[idx, "status"] = "INVESTIGATING"
-            self._events_df.at[idx, "investigation_started_utc"] = timestamp
-            self._events_df.at[idx, "notes"] = notes
-            self._persist_events()
+        with self._write() as changed:
+            changes = self._investigate_changes(self._require_row(event_id), timestamp)
+            self._backend.update_event(event_id, changes)
+            changed[event_id] = None
             return self.get_event(event_id)
 
     def set_report_submitted(self, event_id: str, timestamp: datetime) -> Event:
         timestamp = self._ensure_aware(timestamp)
-        with self._lock:
-            idx = self._locate_index(event_id)
-            notes = copy.deepcopy(self._events_df.at[idx, "notes"]) or copy.deepcopy(DEFAULT_NOTES)
-            notes.setdefault("log", []).append(
-                {
-                    "message": "Report submitted",
-                    "timestamp_utc": self._format_iso(timestamp),
-                }
-            )
-            self._events_df.at[idx, "status"] = "REPORTED"
-            self._events_df.at[idx, "report_submitted_utc"] = timestamp
-            self._events_df.at[idx, "notes"] = notes
-            self._persist_events()
+        with self._write() as changed:
+            changes = self._report_changes(self._require_row(event_id), timestamp)
+            self._backend.update_event(event_id, changes)
+            changed[event_id] = None
             return self.get_event(event_id)
 
     def complete_runbook_item(self, event_id: str, item_id: str, timestamp: datetime) -> Tuple[Event, bool]:
         timestamp = self._ensure_aware(timestamp)
-        with self._lock:
-            idx = self._locate_index(event_id)
-            notes = copy.deepcopy(self._events_df.at[idx, "notes"]) or copy.deepcopy(DEFAULT_NOTES)
-            completed_entries = notes.setdefault("runbook_completed", [])
-            if any(entry.get("id") == item_id for entry in completed_entries):
+        with self._write() as changed:
+            changes = self._runbook_changes(self._require_row(event_id), item_id, timestamp)
+            if changes is None:
                 return self.get_event(event_id), False
-            completed_entries.append(
-                {
-                    "id": item_id,
-                    "timestamp_utc": self._format_iso(timestamp),
-                }
-            )
-            notes.setdefault("log", []).append(
-                {
-                    "message": f"Runbook item completed: {item_id}",
-                    "timestamp_utc": self._format_iso(timestamp),
-                }
-            )
-            self._events_df.at[idx, "notes"] = notes
-            self._persist_events()
+            self._backend.update_event(event_id, changes)
+            changed[event_id] = None
             return self.get_event(event_id), True
 
+    def matching_event_ids(
+        self,
+        status: Optional[str] = None,
+        site_ids: Optional[Sequence[str]] = None,
+        detected_before: Optional[datetime] = None,
+    ) -> List[str]:
+        detected_before = self._ensure_aware(detected_before)
+        frame = self._backend.events_frame(
+            columns=["id", "status", "detected_at_utc"],
+            site_ids=site_ids,
+            detected_to=detected_before,
+        )
+        mask = pd.Series(True, index=frame.index)
+        if status:
+            mask &= frame["status"] == status
+        if detected_before is not None:
+            mask &= frame["detected_at_utc"] < pd.Timestamp(detected_before)
+        return frame.loc[mask, "id"].astype(str).tolist()
+
+    def bulk_transition(
+        self,
+        action: str,
+        event_ids: Sequence[str],
+        timestamp: datetime,
+        item_id: Optional[str] = None,
+    ) -> List[BulkOutcome]:
+        """Apply ``action`` to many events under one lock and one backend transaction.
+
+        Transitions that would not change an event (investigating an event that is
+        already past NEW, reporting a REPORTED one, repeating a runbook item) are
+        reported as ``unchanged`` instead of re-stamping timestamps.
+        """
+        if action == "runbook" and not item_id:
+            raise ValueError("item_id is required for the runbook action")
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Unknown bulk action {action!r}")
+        timestamp = self._ensure_aware(timestamp)
+        outcomes: List[BulkOutcome] = []
+        with span("store.bulk"), self._write() as changed:
+            unique_ids = list(dict.fromkeys(event_ids))
+            rows = self._backend.get_event_rows(unique_ids)
+            changes: Dict[str, Dict[str, object]] = {}
+            for event_id in unique_ids:
+                row = rows.get(event_id)
+                if row is None:
+                    outcomes.append(BulkOutcome(event_id, "not_found"))
+                    continue
+                status = str(row.get("status"))
+                change: Optional[Dict[str, object]] = None
+                if action == "investigate" and status == "NEW":
+                    change = self._investigate_changes(row, timestamp)
+                elif action == "report" and status != "REPORTED":
+                    change = self._report_changes(row, timestamp)
+                elif action == "runbook":
+                    change = self._runbook_changes(row, str(item_id), timestamp)
+                if change is None:
+                    outcomes.append(BulkOutcome(event_id, "unchanged", status))
+                    continue
+                changes[event_id] = change
+                outcomes.append(BulkOutcome(event_id, "updated", str(change.get("status", status))))
+            self._backend.update_events(changes)
+            changed.update(dict.fromkeys(changes))
+        return outcomes
+
     def append_events_from_csv(self, file_bytes: bytes) -> CSVAppendResult:
         buffer = io.StringIO(file_bytes.decode("utf-8"))
-        incoming = pd.read_csv(buffer)
-        required = {
-            "id",
-            "site_id",
-            "detected_at_utc",
-            "detection_type",
-            "est_ch4_kgph",
-            "confidence",
-            "lat",
-            "lon",
-            "status",
-        }
-        if missing := required - set(incoming.columns):
+        return self.append_events(pd.read_csv(buffer))
+
+    @staticmethod
+    def check_import_columns(columns: Sequence[str]) -> None:
+        if missing := REQUIRED_IMPORT_COLUMNS - set(columns):
             raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
 
-        for column in ["detected_at_utc", "investigation_started_utc", "report_submitted_utc"]:
-            if column in incoming.columns:
-                incoming[column] = pd.to_datetime(incoming[column], utc=True, errors="coerce")
-            else:
-                incoming[column] = None
+    def append_events(self, incoming: pd.DataFrame) -> CSVAppendResult:
+        """Append a batch of CSV-shaped rows: reject invalid rows, skip known ids and
+        merge nearby duplicates.
+
+        Rows failing :func:`~app.validation.validate_events` are left out; the
+        result's ``report`` says which and why.
+        """
+        self.check_import_columns(list(incoming.columns))
+        with span("store.validate"):
+            incoming, report = validate_events(incoming, self._assets_by_id)
         if "notes" not in incoming.columns:
-            incoming["notes"] = [{} for _ in range(len(incoming))]
+            incoming["notes"] = None
+        if report.rejected:
+            incoming = incoming.loc[report.valid]
 
         imported = 0
         skipped = 0
-
-        with self._lock:
-            existing_ids = set(self._events_df["id"].astype(str).tolist())
-            rows_to_add: List[Dict[str, object]] = []
-            for _, row in incoming.iterrows():
-                event_id = str(row["id"])
-                if event_id in existing_ids:
-                    skipped += 1
-                    continue
-                row_dict = row.to_dict()
-                row_dict["id"] = event_id
-                row_dict["notes"] = self._deserialize_notes(row_dict.get("notes"))
-                rows_to_add.append(row_dict)
-                existing_ids.add(event_id)
-                imported += 1
-            if rows_to_add:
-                if self._events_df.empty:
-                    self._events_df = pd.DataFrame(rows_to_add)
-                else:
-                    new_rows = [
-                        {
-                            column: row.get(column, pd.NA)
-                            for column in self._events_df.columns
-                        }
-                        for row in rows_to_add
-                    ]
-                    self._events_df = pd.DataFrame(
-                        [*self._events_df.to_dict("records"), *new_rows],
-                        columns=self._events_df.columns,
-                    )
-                    for column in [
-                        "detected_at_utc",
-                        "investigation_started_utc",
-                        "report_submitted_utc",
-                    ]:
-                        self._events_df[column] = pd.to_datetime(
-                            self._events_df[column],
-                            utc=True,
-                            errors="coerce",
-                        )
-                self._persist_events()
-
-        return CSVAppendResult(imported=imported, skipped=skipped)
+        merged = 0
+
+        with self._write() as changed:
+            ids = incoming["id"].astype(str)
+            existing_ids = self._backend.existing_ids(ids)
+            # Known ids and repeats within the upload are skipped; the first occurrence wins.
+            fresh = ~(ids.isin(existing_ids) | ids.duplicated())
+            skipped = int((~fresh).sum())
+            new_frame = incoming.loc[fresh].reset_index(drop=True)
+            new_frame["id"] = ids[fresh].to_numpy()
+            new_frame["notes"] = new_frame["notes"].map(EventNotes.coerce).astype(object)
+            rows_to_add: List[Dict[str, object]] = new_frame.to_dict(orient="records")
+
+            duplicates_of: Dict[int, str] = {}
+            if not new_frame.empty and new_frame["detected_at_utc"].notna().any():
+                window = pd.Timedelta(hours=self._cluster_window_hours)
+                candidates = self._backend.events_frame(
+                    columns=["id", "site_id", "detected_at_utc", "lat", "lon"],
+                    site_ids=new_frame["site_id"].astype(str).unique().tolist(),
+                    detected_from=new_frame["detected_at_utc"].min() - window,
+                    detected_to=new_frame["detected_at_utc"].max() + window,
+                )
+                duplicates_of = cluster_detections(
+                    new_frame,
+                    candidates,
+                    distance_m=self._cluster_distance_m,
+                    window_hours=self._cluster_window_hours,
+                )
+            if duplicates_of:
+                new_rows_by_id = {row["id"]: row for row in rows_to_add}
+                for position, primary_id in duplicates_of.items():
+                    self._merge_duplicate(rows_to_add[position], primary_id, new_rows_by_id)
+                    changed[primary_id] = None
+                merged = len(duplicates_of)
+                rows_to_add = [
+                    row for position, row in enumerate(rows_to_add) if position not in duplicates_of
+                ]
+            imported = len(rows_to_add)
+            self._backend.insert_events(rows_to_add)
+            changed.update(dict.fromkeys(str(row["id"]) for row in rows_to_add))
+
+        return CSVAppendResult(
+            imported=imported, skipped=skipped, merged=merged, rejected=report.rejected, report=report
+        )
+
+    def _merge_duplicate(
+        self,
+        duplicate: Dict[str, object],
+        primary_id: str,
+        new_rows_by_id: Dict[str, Dict[str, object]],
+    ) -> None:
+        detected_at = self._parse_datetime(duplicate.get("detected_at_utc"))
+        record = DuplicateRecord(
+            event_id=str(duplicate["id"]),
+            detection_type=str(duplicate.get("detection_type", "")),
+            detected_at_utc=self._format_iso(detected_at),
+            est_ch4_kgph=str(duplicate.get("est_ch4_kgph", "")),
+            confidence=str(duplicate.get("confidence", "")),
+        )
+        log_entry = LogEntry.at(
+            f"Merged duplicate detection {record.event_id} ({record.detection_type})",
+            datetime.now(timezone.utc),
+        )
+        if primary_id in new_rows_by_id:
+            primary = new_rows_by_id[primary_id]
+            primary["notes"] = EventNotes.coerce(primary["notes"]).with_duplicate(record).with_log(log_entry)
+        else:
+            notes = EventNotes.coerce(self._require_row(primary_id).get("notes"))
+            notes = notes.with_duplicate(record).with_log(log_entry)
+            self._backend.update_event(primary_id, {"notes": notes})
 
     # ---------- Derived views ----------
-    def build_runbook(self, event: Event) -> List[RunbookItem]:
-        notes = event.notes or copy.deepcopy(DEFAULT_NOTES)
-        completed_lookup = {
-            entry.get("id"): entry.get("timestamp_utc")
-            for entry in notes.get("runbook_completed", [])
-        }
-        runbook_items: List[RunbookItem] = []
+    # The ``*_fields`` builders return plain data for the JSON fast path of list
+    # responses; ``build_*`` wrap the same data in validated models.
+    def runbook_fields(self, event: Event) -> List[Dict[str, object]]:
+        completed_lookup = {entry.item_id: entry for entry in event.notes.runbook_completions()}
+        items: List[Dict[str, object]] = []
         for template_item in self._runbook_template:
-            completed_at = completed_lookup.get(template_item.id)
-            runbook_items.append(
-                RunbookItem(
-                    id=template_item.id,
-                    label=template_item.label,
-                    completed=completed_at is not None,
-                    completed_at_utc=self._parse_datetime(completed_at) if completed_at else None,
-                )
+            completed = completed_lookup.get(template_item.id)
+            items.append(
+                {
+                    "id": template_item.id,
+                    "label": template_item.label,
+                    "completed": completed is not None,
+                    "completed_at_utc": completed.timestamp if completed is not None else None,
+                }
             )
-        return runbook_items
+        return items
 
-    def build_action_log(self, event: Event) -> List[ActionLogEntry]:
-        entries: List[ActionLogEntry] = []
-        for raw in (event.notes or {}).get("log", []):
-            ts = self._parse_datetime(raw.get("timestamp_utc"))
-            entries.append(
-                ActionLogEntry(
-                    message=raw.get("message", ""),
-                    timestamp_utc=ts or datetime.now(timezone.utc),
-                )
-            )
+    def action_log_fields(self, event: Event) -> List[Dict[str, object]]:
+        entries: List[Dict[str, object]] = [
+            {"message": raw.message, "timestamp_utc": raw.timestamp or datetime.now(timezone.utc)}
+            for raw in event.notes.log_entries()
+        ]
         if event.investigation_started_utc:
             entries.append(
-                ActionLogEntry(
-                    message="Investigation started",
-                    timestamp_utc=self._ensure_aware(event.investigation_started_utc),
-                )
+                {
+                    "message": "Investigation started",
+                    "timestamp_utc": self._ensure_aware(event.investigation_started_utc),
+                }
             )
         if event.report_submitted_utc:
             entries.append(
-                ActionLogEntry(
-                    message="Report submitted",
-                    timestamp_utc=self._ensure_aware(event.report_submitted_utc),
-                )
+                {
+                    "message": "Report submitted",
+                    "timestamp_utc": self._ensure_aware(event.report_submitted_utc),
+                }
             )
-        entries.sort(key=lambda item: item.timestamp_utc)
+        entries.sort(key=lambda item: item["timestamp_utc"])
         return entries
 
-    # ---------- Helpers ----------
-    def _locate_index(self, event_id: str) -> int:
-        match = self._events_df.index[self._events_df["id"].astype(str) == event_id]
-        if len(match) == 0:
-            raise KeyError(f"Event {event_id} not found")
-        return int(match[0])
+    def build_runbook(self, event: Event) -> List[RunbookItem]:
+        return [RunbookItem(**item) for item in self.runbook_fields(event)]
 
-    def _persist_events(self) -> None:
-        df = self._events_df.copy()
-        for column in ["detected_at_utc", "investigation_started_utc", "report_submitted_utc"]:
-            df[column] = df[column].apply(self._format_iso)
-        df["notes"] = df["notes"].apply(self._serialize_notes)
-        df.to_csv(self._events_path, index=False)
+    def build_action_log(self, event: Event) -> List[ActionLogEntry]:
+        return [ActionLogEntry(**entry) for entry in self.action_log_fields(event)]
 
+    # ---------- Helpers ----------
+    def _require_row(self, event_id: str) -> Dict[str, object]:
+        with span("store.lookup"):
+            row = self._backend.get_event_row(event_id)
+        if row is None:
+            raise KeyError(f"Event {event_id} not found")
+        return row
 
-store = DataStore()
@@ -1,8 +1,24 @@
+"""Triage scoring and SLA deadlines.
+
+Scoring parameters live in a :class:`TriagePolicy`. The built-in values are
+:data:`DEFAULT_POLICY`; a JSON file named by ``TRIAGE_POLICY_PATH`` can replace them
+and add per-operator and per-site overrides (see :meth:`PolicySet.from_mapping`).
+The file is re-read when it changes. Vectorised scoring of whole frames lives in
+:mod:`app.scoring`.
+"""
 from __future__ import annotations
 
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Tuple
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
 
+from .metrics import timed
 from .schemas import Event, TriageBreakdown
 
 
@@ -12,6 +28,14 @@ DETECTION_WEIGHTS: Dict[str, float] = {
     "continuous": 0.6,
 }
 
+INVESTIGATE_SLA = timedelta(days=5)
+REPORT_SLA = timedelta(days=15)
+
+POLICY_PATH_ENV = "TRIAGE_POLICY_PATH"
+POLICY_RELOAD_INTERVAL_S = 2.0
+
+logger = logging.getLogger(__name__)
+
 
 def _ensure_aware(dt: datetime) -> datetime:
     if dt.tzinfo is None:
@@ -19,63 +43,294 @@ def _ensure_aware(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-def _compute_recency_boost(detected_at: datetime, now: datetime) -> float:
-    age_hours = (now - detected_at).total_seconds() / 3600
-    if age_hours < 48:
-        return 0.15
-    if age_hours < 96:
-        return 0.05
-    return 0.0
+@dataclass(frozen=True)
+class TriagePolicy:
+    """Weights, recency tiers, bucket thresholds and SLAs used to triage an event.
+
+    ``recency_tiers`` are ``(max_age_hours, boost)`` pairs in ascending age order;
+    an event gets the boost of the first tier it is younger than.
+    """
+
+    detection_weights: Mapping[str, float] = field(default_factory=lambda: dict(DETECTION_WEIGHTS))
+    fallback_detection_weight: float = 0.6
+    severity_scale_kgph: float = 1000.0
+    severity_weight: float = 0.7
+    confidence_weight: float = 0.2
+    recency_tiers: Tuple[Tuple[float, float], ...] = ((48.0, 0.15), (96.0, 0.05))
+    high_threshold: float = 0.7
+    med_threshold: float = 0.4
+    investigate_sla: timedelta = INVESTIGATE_SLA
+    report_sla: timedelta = REPORT_SLA
+
+    def __post_init__(self) -> None:
+        if self.severity_scale_kgph <= 0:
+            raise ValueError("severity_scale_kgph must be positive")
+        if any(weight < 0 for weight in self.detection_weights.values()) or self.fallback_detection_weight < 0:
+            raise ValueError("detection weights must not be negative")
+        if not 0 <= self.med_threshold <= self.high_threshold <= 1:
+            raise ValueError("thresholds must satisfy 0 <= med_threshold <= high_threshold <= 1")
+        if self.investigate_sla <= timedelta(0) or self.report_sla <= timedelta(0):
+            raise ValueError("SLAs must be positive")
+        ages = [hours for hours, _ in self.recency_tiers]
+        if ages != sorted(ages):
+            raise ValueError("recency_tiers must be in ascending age order")
+
+    def with_overrides(self, overrides: Mapping[str, Any]) -> "TriagePolicy":
+        """Return a copy with the fields named in ``overrides`` (policy-file syntax) replaced.
+
+        ``detection_weights`` are merged per detection type; SLAs are given as
+        ``investigate_sla_days`` / ``report_sla_days``.
+        """
+        names = {item.name for item in fields(self)} - {"investigate_sla", "report_sla"}
+        changes: Dict[str, Any] = {}
+        for key, value in overrides.items():
+            if key == "detection_weights":
+                changes[key] = {**self.detection_weights, **{str(k): float(v) for k, v in dict(value).items()}}
+            elif key == "recency_tiers":
+                changes[key] = tuple((float(hours), float(boost)) for hours, boost in value)
+            elif key in ("investigate_sla_days", "report_sla_days"):
+                changes[key[: -len("_days")]] = timedelta(days=float(value))
+            elif key in names:
+                changes[key] = float(value)
+            else:
+                raise ValueError(f"Unknown triage policy field {key!r}")
+        return replace(self, **changes)
+
+    def detection_weight(self, detection_type: str) -> float:
+        return self.detection_weights.get(detection_type, self.fallback_detection_weight)
+
+    def recency_boost(self, age_hours: float) -> float:
+        for max_age_hours, boost in self.recency_tiers:
+            if age_hours < max_age_hours:
+                return boost
+        return 0.0
+
+    def bucket(self, score: float) -> str:
+        if score >= self.high_threshold:
+            return "HIGH"
+        if score >= self.med_threshold:
+            return "MED"
+        return "LOW"
+
+
+DEFAULT_POLICY = TriagePolicy()
+
+
+def _merge_sections(
+    current: Mapping[str, Mapping[str, Any]], overrides: Mapping[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    merged = {name: dict(values) for name, values in current.items()}
+    for name, values in overrides.items():
+        entry = merged.setdefault(str(name), {})
+        for key, value in dict(values).items():
+            if key == "detection_weights":
+                value = {**entry.get(key, {}), **dict(value)}
+            entry[key] = value
+    return merged
+
+
+@dataclass(frozen=True)
+class PolicySet:
+    """The default policy plus per-operator and per-site overrides.
+
+    Overrides are partial policies in policy-file syntax: an operator override is
+    layered over ``default`` and a site override over its operator's policy.
+    """
+
+    default: TriagePolicy = DEFAULT_POLICY
+    operator_overrides: Mapping[str, Mapping[str, Any]] = field(default_factory=dict)
+    site_overrides: Mapping[str, Mapping[str, Any]] = field(default_factory=dict)
+    _resolved: Dict[Tuple[str, Optional[str]], TriagePolicy] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> "PolicySet":
+        """Build and validate a set from the policy-file structure::
+
+            {"default": {...}, "operators": {"Acme Energy": {...}}, "sites": {"S1": {...}}}
+        """
+        return cls().with_overrides(data)
+
+    def with_overrides(self, data: Mapping[str, Any]) -> "PolicySet":
+        """Layer a policy-file structure over this set, merging field by field."""
+        if not isinstance(data, Mapping):
+            raise ValueError("A triage policy must be a JSON object")
+        unknown = set(data) - {"default", "operators", "sites"}
+        if unknown:
+            raise ValueError(f"Unknown triage policy section {sorted(unknown)[0]!r}")
+        policies = PolicySet(
+            default=self.default.with_overrides(data.get("default") or {}),
+            operator_overrides=_merge_sections(self.operator_overrides, data.get("operators") or {}),
+            site_overrides=_merge_sections(self.site_overrides, data.get("sites") or {}),
+        )
+        policies.variants()  # every operator/site combination must form a valid policy
+        return policies
+
+    @classmethod
+    def from_file(cls, path: Path) -> "PolicySet":
+        with path.open("r", encoding="utf-8") as handle:
+            return cls.from_mapping(json.load(handle))
+
+    def resolve(self, site_id: str, operator: Optional[str] = None) -> TriagePolicy:
+        key = (site_id, operator)
+        policy = self._resolved.get(key)
+        if policy is None:
+            policy = self.default
+            if operator in self.operator_overrides:
+                policy = policy.with_overrides(self.operator_overrides[operator])
+            if site_id in self.site_overrides:
+                policy = policy.with_overrides(self.site_overrides[site_id])
+            self._resolved[key] = policy
+        return policy
+
+    def variants(self) -> Tuple[TriagePolicy, ...]:
+        """Every policy :meth:`resolve` can return, whichever operator a site belongs to."""
+        operators = [None, *self.operator_overrides]
+        sites = ["", *self.site_overrides]
+        return tuple(self.resolve(site, operator) for operator in operators for site in sites)
+
+    @property
+    def min_investigate_sla(self) -> timedelta:
+        """Shortest investigate SLA in the set; younger events cannot have breached."""
+        return min(policy.investigate_sla for policy in self.variants())
+
+
+class PolicyRegistry:
+    """The active :class:`PolicySet`, re-read when the policy file changes.
+
+    The file's modification time is checked at most every ``reload_interval_s``
+    seconds. A file that fails to load is logged and the previous set stays active.
+    """
+
+    def __init__(self, path: Optional[Path] = None, reload_interval_s: float = POLICY_RELOAD_INTERVAL_S) -> None:
+        self._path = path
+        self._reload_interval_s = reload_interval_s
+        self._lock = threading.Lock()
+        self._policies = PolicySet()
+        self._source: Optional[Tuple[str, float]] = None
+        self._checked_at: Optional[float] = None
+        self._version = 0
+
+    def path(self) -> Optional[Path]:
+        if self._path is not None:
+            return self._path
+        configured = os.getenv(POLICY_PATH_ENV, "").strip()
+        return Path(configured) if configured else None
 
+    def current(self) -> PolicySet:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self._reload_interval_s:
+            with self._lock:
+                self._checked_at = now
+                self._refresh()
+        return self._policies
 
-def evaluate_event(event: Event, now: datetime | None = None) -> Tuple[float, str, TriageBreakdown, datetime, datetime, float, float]:
-    """Return triage metrics and SLA deadlines for an event."""
+    @property
+    def version(self) -> int:
+        """Bumped whenever a different policy set becomes active."""
+        self.current()
+        return self._version
+
+    def install(self, policies: PolicySet) -> None:
+        """Activate ``policies`` directly (tests, admin tooling); the file is not consulted again until it changes."""
+        with self._lock:
+            self._activate(policies, self._source)
+
+    def _refresh(self) -> None:
+        path = self.path()
+        if path is None:
+            if self._source is not None:
+                self._activate(PolicySet(), None)
+            return
+        try:
+            source = (str(path), path.stat().st_mtime)
+        except OSError:
+            logger.warning("Triage policy file %s not found; keeping the current policy", path)
+            return
+        if source == self._source:
+            return
+        try:
+            policies = PolicySet.from_file(path)
+        except (OSError, ValueError, TypeError) as exc:
+            logger.error("Could not load triage policy %s: %s", path, exc)
+            self._source = source  # do not retry until the file changes again
+            return
+        self._activate(policies, source)
+
+    def _activate(self, policies: PolicySet, source: Optional[Tuple[str, float]]) -> None:
+        if policies != self._policies:
+            self._policies = policies
+            self._version += 1
+        self._source = source
+
+
+registry = PolicyRegistry()
+
+
+@timed("triage.evaluate")
+def triage_fields(event: Event, now: datetime | None, policy: TriagePolicy) -> Dict[str, Any]:
+    """Triage and SLA fields of ``EventOut`` as plain data (the JSON fast path).
+
+    ``policy`` must be resolved for the event's site *and* operator
+    (:meth:`PolicySet.resolve`), which needs the asset index this module lacks.
+    """
     now = _ensure_aware(now or datetime.now(timezone.utc))
     detected_at = _ensure_aware(event.detected_at_utc)
 
-    base_severity = min(event.est_ch4_kgph / 1000.0, 1.0)
-    detection_weight = DETECTION_WEIGHTS.get(event.detection_type, 0.6)
-    recency_boost = _compute_recency_boost(detected_at, now)
+    base_severity = min(event.est_ch4_kgph / policy.severity_scale_kgph, 1.0)
+    detection_weight = policy.detection_weight(event.detection_type)
+    recency_boost = policy.recency_boost((now - detected_at).total_seconds() / 3600)
 
-    severity_component = base_severity * detection_weight * 0.7
-    confidence_component = event.confidence * 0.2
+    severity_component = base_severity * detection_weight * policy.severity_weight
+    confidence_component = event.confidence * policy.confidence_weight
 
     raw_score = severity_component + confidence_component + recency_boost
     triage_score = max(0.0, min(1.0, raw_score))
+    triage_bucket = policy.bucket(triage_score)
 
-    if triage_score >= 0.7:
-        triage_bucket = "HIGH"
-    elif triage_score >= 0.4:
-        triage_bucket = "MED"
-    else:
-        triage_bucket = "LOW"
-
-    investigate_deadline = detected_at + timedelta(days=5)
-    report_deadline = detected_at + timedelta(days=15)
+    investigate_deadline = detected_at + policy.investigate_sla
+    report_deadline = detected_at + policy.report_sla
 
     investigate_remaining_h = (investigate_deadline - now).total_seconds() / 3600
     report_remaining_h = (report_deadline - now).total_seconds() / 3600
 
-    breakdown = TriageBreakdown(
-        base_severity=round(base_severity, 3),
-        detection_weight=round(detection_weight, 3),
-        confidence=round(event.confidence, 3),
-        recency_boost=round(recency_boost, 3),
-        score=round(triage_score, 3),
-        components={
-            "severity_component": round(severity_component, 3),
-            "confidence_component": round(confidence_component, 3),
-            "recency_component": round(recency_boost, 3),
+    return {
+        "triage_score": triage_score,
+        "triage_bucket": triage_bucket,
+        "triage_breakdown": {
+            "base_severity": round(base_severity, 3),
+            "detection_weight": round(detection_weight, 3),
+            "confidence": round(event.confidence, 3),
+            "recency_boost": round(recency_boost, 3),
+            "score": round(triage_score, 3),
+            "components": {
+                "severity_component": round(severity_component, 3),
+                "confidence_component": round(confidence_component, 3),
+                "recency_component": round(recency_boost, 3),
+            },
+            "computed_at_utc": now,
         },
-        computed_at_utc=now,
-    )
+        "sla_investigate_deadline_utc": investigate_deadline,
+        "sla_report_deadline_utc": report_deadline,
+        "sla_investigate_remaining_h": investigate_remaining_h,
+        "sla_report_remaining_h": report_remaining_h,
+        "sla_investigate_breached": investigate_remaining_h < 0,
+        "sla_report_breached": report_remaining_h < 0,
+    }
+
 
+def evaluate_event(
+    event: Event, now: datetime | None, policy: TriagePolicy
+) -> Tuple[float, str, TriageBreakdown, datetime, datetime, float, float]:
+    """Return triage metrics and SLA deadlines for an event under ``policy`` (see :func:`triage_fields`)."""
+    fields = triage_fields(event, now, policy)
     return (
-        triage_score,
-        triage_bucket,
-        breakdown,
-        investigate_deadline,
-        report_deadline,
-        investigate_remaining_h,
-        report_remaining_h,
+        fields["triage_score"],
+        fields["triage_bucket"],
+        TriageBreakdown(**fields["triage_breakdown"]),
+        fields["sla_investigate_deadline_utc"],
+        fields["sla_report_deadline_utc"],
+        fields["sla_investigate_remaining_h"],
+        fields["sla_report_remaining_h"],
     )
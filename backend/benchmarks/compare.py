@@ -0,0 +1,44 @@
+"""Compare two benchmark JSON files produced by ``benchmarks.run``.
+
+Exits with status 1 when any benchmark's per-operation median regressed by more
+than ``--threshold`` (a fraction, default 0.10).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+Key = Tuple[str, int]
+
+
+def load(path: Path) -> Dict[Key, float]:
+    payload = json.loads(path.read_text())
+    return {(row["name"], row["size"]): row["per_op_median_s"] for row in payload["results"]}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline)
+    candidate = load(args.candidate)
+    regressed = False
+    print(f"{'benchmark':<28} {'size':>9} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            regressed = True
+            flag = "  REGRESSION"
+        print(f"{key[0]:<28} {key[1]:>9} {before * 1e3:>10.3f}ms {after * 1e3:>10.3f}ms {change:>+7.1%}{flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,427 @@
+"""Simulate control-room traffic against the API and report latency per route.
+
+Usage::
+
+    python -m benchmarks.load --events 100000 --duration 60 --output load.json
+    python -m benchmarks.load --url http://localhost:8000 --duration 30
+
+Without ``--url`` a synthetic dataset is written and served by uvicorn in a child
+process, so the load generator does not share an interpreter (or GIL) with the API.
+The assistant is pointed at a local fake chat-completions server through
+``GITHUB_MODELS_ENDPOINT``, and that server answers after ``--ai-latency-ms``.
+
+Each actor is an asyncio task on one shared HTTP connection pool:
+
+- ``--pollers`` dashboards poll ``GET /api/events?limit=...`` every ``--poll-interval`` s.
+- ``--responders`` take open events through investigate, a runbook item and report.
+- ``--importers`` upload a CSV batch to ``POST /api/events/import`` every ``--import-interval`` s.
+- ``--pdf-clients`` download audit PDFs.
+- ``--assistants`` ask the AI assistant about an event.
+
+The report gives requests, errors, throughput and p50/p95/p99 latency per route
+template, plus the same overall.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from .run import _git_commit
+from .synth import generate_events, write_dataset
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+RUNBOOK_ITEMS = ("site-safety", "quantify", "notify-ops", "mitigation-plan")
+STARTUP_TIMEOUT_S = 120.0
+
+
+class FakeChatCompletions:
+    """Local stand-in for the GitHub Models chat-completions endpoint.
+
+    Answers every POST with a fixed OpenAI-shaped completion after ``latency_s``,
+    on its own threads, so slow model calls can be simulated without a network.
+    """
+
+    def __init__(self, latency_s: float = 0.3) -> None:
+        stub = self
+        self.latency_s = latency_s
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency_s)
+                body = json.dumps(
+                    {
+                        "model": request.get("model", "load-test"),
+                        "choices": [{"message": {"role": "assistant", "content": "- Stub guidance for load testing."}}],
+                        "usage": {"prompt_tokens": 100, "completion_tokens": 8, "total_tokens": 108},
+                    }
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/chat/completions"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ai", daemon=True)
+
+    def __enter__(self) -> "FakeChatCompletions":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return float("nan")
+    rank = max(1, min(len(ordered), int(fraction * len(ordered) + 0.999999)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if not 200 <= status < 400)
+
+    def summary(self, route: str, duration_s: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "route": route,
+            "requests": len(ordered),
+            "errors": self.errors,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "throughput_rps": len(ordered) / duration_s,
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p95_ms": percentile(ordered, 0.95) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+            "max_ms": (ordered[-1] if ordered else float("nan")) * 1000,
+        }
+
+
+@dataclass
+class LoadConfig:
+    duration_s: float = 30.0
+    pollers: int = 20
+    poll_interval_s: float = 1.0
+    poll_limit: int = 500
+    responders: int = 4
+    think_time_s: float = 0.5
+    importers: int = 1
+    import_interval_s: float = 10.0
+    import_rows: int = 1_000
+    pdf_clients: int = 2
+    assistants: int = 2
+    interval_s: float = 2.0  # between PDF downloads or assistant calls of one client
+    seed: int = 0
+
+
+class LoadRun:
+    """One timed run of every actor against ``client``."""
+
+    def __init__(self, client: httpx.AsyncClient, config: LoadConfig) -> None:
+        self.client = client
+        self.config = config
+        self.routes: Dict[str, RouteStats] = {}
+        self.deadline = 0.0
+        self.random = random.Random(config.seed)
+        self.open_ids: Deque[str] = deque()
+        self.event_ids: List[str] = []
+        self.assets: List[Dict[str, Any]] = []
+
+    async def call(self, route: str, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        stats = self.routes.setdefault(route, RouteStats())
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            await response.aread()
+        except httpx.HTTPError:
+            stats.latencies.append(time.perf_counter() - started)
+            stats.statuses[0] += 1  # connection failure or timeout
+            return None
+        stats.latencies.append(time.perf_counter() - started)
+        stats.statuses[response.status_code] += 1
+        return response
+
+    def running(self) -> bool:
+        return time.perf_counter() < self.deadline
+
+    async def pause(self, seconds: float) -> None:
+        # Jitter keeps actors with the same interval from firing in lockstep.
+        await asyncio.sleep(seconds * self.random.uniform(0.5, 1.5))
+
+    # ---------- Actors ----------
+    async def poller(self) -> None:
+        await self.pause(self.config.poll_interval_s)
+        while self.running():
+            await self.call("GET /api/events", "GET", "/api/events", params={"limit": self.config.poll_limit})
+            await self.pause(self.config.poll_interval_s)
+
+    async def responder(self) -> None:
+        while self.running() and self.open_ids:
+            event_id = self.open_ids.popleft()
+            steps = [
+                ("POST /api/events/{id}/investigate", f"/api/events/{event_id}/investigate", None),
+                (
+                    "POST /api/events/{id}/runbook",
+                    f"/api/events/{event_id}/runbook",
+                    {"item_id": self.random.choice(RUNBOOK_ITEMS)},
+                ),
+                ("POST /api/events/{id}/report", f"/api/events/{event_id}/report", None),
+            ]
+            for route, url, body in steps:
+                if not self.running():
+                    return
+                await self.call(route, "POST", url, json=body)
+                await self.pause(self.config.think_time_s)
+
+    async def importer(self, index: int) -> None:
+        import pandas as pd
+
+        assets = pd.DataFrame(self.assets)
+        batch = 0
+        await self.pause(self.config.import_interval_s)
+        while self.running():
+            frame = generate_events(
+                self.config.import_rows, assets, seed=self.config.seed + batch, id_prefix=f"L{index}-{batch}-"
+            )
+            buffer = io.StringIO()
+            frame.to_csv(buffer, index=False)
+            files = {"file": (f"load-{index}-{batch}.csv", buffer.getvalue().encode("utf-8"), "text/csv")}
+            await self.call("POST /api/events/import", "POST", "/api/events/import", files=files)
+            batch += 1
+            await self.pause(self.config.import_interval_s)
+
+    async def pdf_client(self) -> None:
+        while self.running():
+            event_id = self.random.choice(self.event_ids)
+            await self.call("GET /api/events/{id}/report.pdf", "GET", f"/api/events/{event_id}/report.pdf")
+            await self.pause(self.config.interval_s)
+
+    async def assistant(self) -> None:
+        while self.running():
+            event_id = self.random.choice(self.event_ids)
+            await self.call(
+                "POST /api/events/{id}/assistant",
+                "POST",
+                f"/api/events/{event_id}/assistant",
+                json={"focus": "next steps"},
+            )
+            await self.pause(self.config.interval_s)
+
+    async def run(self) -> Dict[str, Any]:
+        self.assets = (await self.client.get("/api/assets")).raise_for_status().json()
+        listed = (await self.client.get("/api/events", params={"limit": 1_000})).raise_for_status().json()["events"]
+        self.event_ids = [event["id"] for event in listed]
+        opened = await self.client.get("/api/events", params={"status": "NEW", "limit": 5_000})
+        self.open_ids.extend(event["id"] for event in opened.raise_for_status().json()["events"])
+
+        config = self.config
+        actors = [self.poller() for _ in range(config.pollers)]
+        actors += [self.responder() for _ in range(config.responders)]
+        actors += [self.importer(index) for index in range(config.importers)]
+        if self.event_ids:
+            actors += [self.pdf_client() for _ in range(config.pdf_clients)]
+            actors += [self.assistant() for _ in range(config.assistants)]
+        started = time.perf_counter()
+        self.deadline = started + config.duration_s
+        await asyncio.gather(*actors)
+        elapsed = time.perf_counter() - started
+
+        total = RouteStats()
+        for stats in self.routes.values():
+            total.latencies.extend(stats.latencies)
+            total.statuses.update(stats.statuses)
+        return {
+            "duration_s": elapsed,
+            "routes": [stats.summary(route, elapsed) for route, stats in sorted(self.routes.items())],
+            "total": total.summary("all", elapsed),
+        }
+
+
+async def run_load(base_url: str, config: LoadConfig) -> Dict[str, Any]:
+    actors = config.pollers + config.responders + config.importers + config.pdf_clients + config.assistants
+    limits = httpx.Limits(max_connections=max(actors, 1), max_keepalive_connections=max(actors, 1))
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        return await LoadRun(client, config).run()
+
+
+# ---------- Self-hosted server ----------
+def serve(data_dir: Path, port: int, backend: str) -> None:
+    """Serve the API over ``data_dir`` (run in the child process)."""
+    import uvicorn
+
+    from app.backends import create_backend
+    from app.dependencies import get_store
+    from app.main import app
+    from app.migrate import migrate_csv_to_sqlite
+    from app.store import DataStore
+
+    if backend == "sqlite":
+        migrate_csv_to_sqlite(data_dir / "events.csv", data_dir / "events.sqlite3")
+    store = DataStore(data_dir, backend=create_backend(backend, data_dir, db_path=data_dir / "events.sqlite3"))
+    app.dependency_overrides[get_store] = lambda: store
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(data_dir: Path, backend: str, ai_endpoint: str) -> Tuple[subprocess.Popen, str]:
+    """Start :func:`serve` in a child process and wait until it answers."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "STORE_WARMUP": "0",  # the child builds its own store over ``data_dir``
+        "GITHUB_MODELS_ENDPOINT": ai_endpoint,
+        "GITHUB_MODELS_KEY": "load-test",
+    }
+    env.pop("SLA_WEBHOOK_URLS", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load", "--serve", str(data_dir), "--port", str(port), "--backend", backend],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/healthz", timeout=1.0).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"API server did not start within {STARTUP_TIMEOUT_S:.0f} s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    header = f"{'route':<36} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header, file=sys.stderr)
+    for row in [*report["routes"], report["total"]]:
+        print(
+            f"{row['route']:<36} {row['requests']:>8} {row['errors']:>6} {row['throughput_rps']:>8.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}",
+            file=sys.stderr,
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the API with simulated control-room traffic.")
+    parser.add_argument("--url", help="Target an already running API instead of starting one")
+    parser.add_argument("--events", type=int, default=10_000, help="Synthetic dataset size when self-hosting")
+    parser.add_argument("--backend", choices=["csv", "sqlite", "partitioned"], default="csv")
+    parser.add_argument("--duration", type=float, default=LoadConfig.duration_s, help="Seconds of load")
+    parser.add_argument("--pollers", type=int, default=LoadConfig.pollers)
+    parser.add_argument("--poll-interval", type=float, default=LoadConfig.poll_interval_s)
+    parser.add_argument("--poll-limit", type=int, default=LoadConfig.poll_limit, help="Page size for GET /api/events")
+    parser.add_argument("--responders", type=int, default=LoadConfig.responders)
+    parser.add_argument("--importers", type=int, default=LoadConfig.importers)
+    parser.add_argument("--import-interval", type=float, default=LoadConfig.import_interval_s)
+    parser.add_argument("--import-rows", type=int, default=LoadConfig.import_rows)
+    parser.add_argument("--pdf-clients", type=int, default=LoadConfig.pdf_clients)
+    parser.add_argument("--assistants", type=int, default=LoadConfig.assistants)
+    parser.add_argument("--ai-latency-ms", type=float, default=300.0, help="Fake model response time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    parser.add_argument("--serve", type=Path, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve is not None:
+        serve(args.serve, args.port, args.backend)
+        return 0
+
+    config = LoadConfig(
+        duration_s=args.duration,
+        pollers=args.pollers,
+        poll_interval_s=args.poll_interval,
+        poll_limit=args.poll_limit,
+        responders=args.responders,
+        importers=args.importers,
+        import_interval_s=args.import_interval,
+        import_rows=args.import_rows,
+        pdf_clients=args.pdf_clients,
+        assistants=args.assistants,
+        seed=args.seed,
+    )
+    with tempfile.TemporaryDirectory(prefix="og-load-") as tmp:
+        if args.url:
+            report = asyncio.run(run_load(args.url.rstrip("/"), config))
+        else:
+            data_dir = write_dataset(Path(tmp) / "data", args.events, seed=args.seed)
+            with FakeChatCompletions(args.ai_latency_ms / 1000) as fake_ai:
+                process, base_url = start_server(data_dir, args.backend, fake_ai.url)
+                try:
+                    report = asyncio.run(run_load(base_url, config))
+                finally:
+                    stop_server(process)
+                report["ai_requests"] = fake_ai.requests
+
+    print_report(report)
+    if args.output is not None:
+        report["meta"] = {
+            "git_commit": _git_commit(),
+            "created_at_utc": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": args.url or f"self-hosted {args.backend}, {args.events} events",
+            "config": vars(config),
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Wrote load report to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+"""Time the backend hot paths against synthetic datasets and write the results as JSON.
+
+Usage::
+
+    python -m benchmarks.run --events 10000 100000 --repeat 5 --output bench.json
+    python -m benchmarks.compare baseline.json bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .synth import generate_events, write_dataset
+
+DEFAULT_SIZES = [10_000]
+SAMPLE_EVENTS = 200
+
+
+@dataclass
+class Measurement:
+    name: str
+    size: int
+    ops_per_sample: int
+    samples: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        median = statistics.median(self.samples)
+        return {
+            "name": self.name,
+            "size": self.size,
+            "repeat": len(self.samples),
+            "ops_per_sample": self.ops_per_sample,
+            "min_s": min(self.samples),
+            "median_s": median,
+            "mean_s": statistics.fmean(self.samples),
+            "max_s": max(self.samples),
+            "per_op_median_s": median / self.ops_per_sample,
+        }
+
+
+def measure(name: str, size: int, fn: Callable[[int], Any], repeat: int, ops_per_sample: int = 1) -> Measurement:
+    """Call ``fn(sample_index)`` ``repeat`` times and record wall-clock durations."""
+    result = Measurement(name=name, size=size, ops_per_sample=ops_per_sample)
+    for sample in range(repeat):
+        started = time.perf_counter()
+        fn(sample)
+        result.samples.append(time.perf_counter() - started)
+    return result
+
+
+def _cycle(items: Sequence[Any]) -> Iterator[Any]:
+    while True:
+        yield from items
+
+
+def run_suite(size: int, repeat: int, backend: str, endpoint_limit: int, workdir: Path) -> List[Measurement]:
+    # Imported lazily so ``--help`` stays fast and import cost is not attributed to a benchmark.
+    from fastapi.testclient import TestClient
+
+    from app.backends import SQLiteEventBackend, create_backend
+    from app.dependencies import get_store
+    from app.main import _build_event_out, app
+    from app.migrate import migrate_csv_to_sqlite
+    from app.pdf import generate_event_report_pdf
+    from app.scoring import SCORE_COLUMNS, TriageScorer, compile_policies, site_operators
+    from app.store import DEFAULT_RUNBOOK_TEMPLATE, DataStore
+    from app.triage import PolicySet, evaluate_event, registry
+
+    data_dir = write_dataset(workdir / f"events-{size}", size)
+
+    def open_store() -> DataStore:
+        if backend == "sqlite":
+            return DataStore(data_dir, backend=SQLiteEventBackend(data_dir / "events.sqlite3"))
+        if backend == "partitioned":
+            return DataStore(data_dir, backend=create_backend("partitioned", data_dir))
+        return DataStore(data_dir)
+
+    if backend == "sqlite":
+        migrate_csv_to_sqlite(data_dir / "events.csv", data_dir / "events.sqlite3")
+
+    results: List[Measurement] = []
+    results.append(measure("datastore_load", size, lambda _: open_store(), repeat))
+    store = open_store()
+
+    results.append(measure("list_events", size, lambda _: store.list_events(), repeat))
+    results.append(
+        measure("list_events_new_page", size, lambda _: store.list_events(status="NEW", limit=100), repeat)
+    )
+
+    sample = store.list_events(limit=SAMPLE_EVENTS)
+    sample_ids = [event.id for event in sample]
+    # Resolved per site and operator, as the API scores each event.
+    active_policies = registry.current()
+    scored = [
+        (event, active_policies.resolve(event.site_id, store.asset_fields(event.site_id)["operator"]))
+        for event in sample
+    ]
+    results.append(
+        measure(
+            "get_event",
+            size,
+            lambda _: [store.get_event(event_id) for event_id in sample_ids],
+            repeat,
+            ops_per_sample=len(sample_ids),
+        )
+    )
+    results.append(
+        measure(
+            "evaluate_event",
+            size,
+            lambda _: [evaluate_event(event, None, policy) for event, policy in scored],
+            repeat,
+            ops_per_sample=len(sample),
+        )
+    )
+    compiled = compile_policies(PolicySet(), site_operators(store))
+    score_frame = store.backend.events_frame(columns=SCORE_COLUMNS)
+    results.append(
+        measure("score_all_events", size, lambda _: compiled.score(score_frame), repeat, ops_per_sample=size)
+    )
+    scorer = TriageScorer()
+    candidate = PolicySet.from_mapping({"default": {"high_threshold": 0.6, "investigate_sla_days": 4}})
+    scorer.scores(store)  # the endpoint reuses the active policy's scores between calls
+    results.append(
+        measure("simulate_triage_policy", size, lambda _: scorer.simulate(store, candidate), repeat, ops_per_sample=size)
+    )
+    results.append(
+        measure(
+            "build_event_out",
+            size,
+            lambda _: [_build_event_out(store, event) for event in sample],
+            repeat,
+            ops_per_sample=len(sample),
+        )
+    )
+
+    now = datetime.now(timezone.utc)
+    new_ids = iter([event.id for event in store.list_events(status="NEW", limit=repeat * 3)])
+    results.append(
+        measure("set_investigation_started", size, lambda _: store.set_investigation_started(next(new_ids), now), repeat)
+    )
+    results.append(measure("set_report_submitted", size, lambda _: store.set_report_submitted(next(new_ids), now), repeat))
+    runbook_targets = _cycle([(event_id, item.id) for event_id in sample_ids for item in DEFAULT_RUNBOOK_TEMPLATE])
+    results.append(
+        measure(
+            "complete_runbook_item",
+            size,
+            lambda _: store.complete_runbook_item(*next(runbook_targets), now),
+            repeat,
+        )
+    )
+
+    assets = store._assets_df
+    batch_size = min(1_000, size)
+
+    def import_batch(sample_index: int) -> None:
+        batch = generate_events(batch_size, assets, seed=size + sample_index, id_prefix=f"I{sample_index}-")
+        buffer = io.StringIO()
+        batch.to_csv(buffer, index=False)
+        store.append_events_from_csv(buffer.getvalue().encode("utf-8"))
+
+    results.append(measure("append_events_from_csv", size, import_batch, repeat, ops_per_sample=batch_size))
+
+    app.dependency_overrides[get_store] = lambda: store
+    try:
+        client = TestClient(app)
+        limit = min(size, endpoint_limit)
+        results.append(
+            measure(
+                "get_api_events",
+                size,
+                lambda _: client.get("/api/events", params={"limit": limit}).raise_for_status(),
+                repeat,
+                ops_per_sample=limit,
+            )
+        )
+    finally:
+        app.dependency_overrides.pop(get_store, None)
+
+    report_payload = _build_event_out(store, sample[0])
+    results.append(measure("generate_event_report_pdf", size, lambda _: generate_event_report_pdf(report_payload), repeat))
+
+    store.backend.close()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark DataStore, triage, API and PDF hot paths.")
+    parser.add_argument("--events", type=int, nargs="+", default=DEFAULT_SIZES, help="Dataset sizes (10k to 5M)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backend", choices=["csv", "sqlite", "partitioned"], default="csv")
+    parser.add_argument("--endpoint-limit", type=int, default=1_000, help="Page size for GET /api/events")
+    parser.add_argument("--output", type=Path, default=Path("bench.json"))
+    parser.add_argument("--workdir", type=Path, default=None, help="Where to write datasets (default: temp dir)")
+    args = parser.parse_args(argv)
+
+    measurements: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="og-bench-") as tmp:
+        workdir = args.workdir or Path(tmp)
+        for size in args.events:
+            for result in run_suite(size, args.repeat, args.backend, args.endpoint_limit, workdir):
+                summary = result.summary()
+                measurements.append(summary)
+                print(f"{size:>9} {summary['name']:<28} median {summary['median_s'] * 1000:10.2f} ms", file=sys.stderr)
+
+    payload = {
+        "meta": {
+            "git_commit": _git_commit(),
+            "created_at_utc": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "repeat": args.repeat,
+        },
+        "results": measurements,
+    }
+    args.output.write_text(json.dumps(payload, indent=2))
+    print(f"Wrote {len(measurements)} measurement(s) to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
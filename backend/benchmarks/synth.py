@@ -0,0 +1,90 @@
+"""Synthetic datasets shaped like ``data/assets.csv`` and ``data/events.csv``."""
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DETECTION_TYPES = np.array(["satellite", "OGI", "continuous"])
+STATUSES = np.array(["NEW", "INVESTIGATING", "REPORTED"])
+OPERATORS = np.array(["Acme Energy", "Borealis Midstream", "Cedar Ridge Oil", "Delta Basin Gas"])
+DEFAULT_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def generate_assets(site_count: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "site_id": [f"S{index + 1}" for index in range(site_count)],
+            "site_name": [f"Synthetic Site {index + 1}" for index in range(site_count)],
+            "operator": OPERATORS[rng.integers(0, len(OPERATORS), site_count)],
+            "lat": np.round(rng.uniform(27.0, 33.0, site_count), 4),
+            "lon": np.round(rng.uniform(-104.0, -94.0, site_count), 4),
+        }
+    )
+
+
+def generate_events(
+    count: int,
+    assets: pd.DataFrame,
+    seed: int = 0,
+    start: datetime = DEFAULT_START,
+    span_days: int = 365,
+    id_prefix: str = "X",
+) -> pd.DataFrame:
+    """Return ``count`` events with the same columns and formats as ``events.csv``."""
+    rng = np.random.default_rng(seed)
+    site_index = rng.integers(0, len(assets), count)
+    detected = pd.Timestamp(start) + pd.to_timedelta(rng.uniform(0, span_days * 86400, count), unit="s")
+    detected = detected.floor("min")
+    status = STATUSES[rng.choice(len(STATUSES), count, p=[0.5, 0.2, 0.3])]
+    investigating = status != "NEW"
+    investigation = detected + pd.to_timedelta(rng.uniform(1, 6 * 86400, count), unit="s")
+    report = investigation + pd.to_timedelta(rng.uniform(1, 10 * 86400, count), unit="s")
+
+    def iso(values: pd.DatetimeIndex, mask: np.ndarray) -> np.ndarray:
+        text = values.strftime("%Y-%m-%dT%H:%M:%SZ").to_numpy(dtype=object)
+        text[~mask] = ""
+        return text
+
+    log_notes = json.dumps(
+        {
+            "runbook_completed": [{"id": "site-safety", "timestamp_utc": "2024-01-02T00:00:00Z"}],
+            "log": [
+                {"message": "Investigation started", "timestamp_utc": "2024-01-01T12:00:00Z"},
+                {"message": "Runbook item completed: site-safety", "timestamp_utc": "2024-01-02T00:00:00Z"},
+            ],
+        }
+    )
+    notes = np.where(investigating, log_notes, "{}")
+
+    return pd.DataFrame(
+        {
+            "id": [f"{id_prefix}{index:08d}" for index in range(count)],
+            "site_id": assets["site_id"].to_numpy()[site_index],
+            "detected_at_utc": iso(detected, np.ones(count, dtype=bool)),
+            "detection_type": DETECTION_TYPES[rng.integers(0, len(DETECTION_TYPES), count)],
+            "est_ch4_kgph": np.round(rng.lognormal(5.3, 0.8, count)).astype(int),
+            "confidence": np.round(rng.uniform(0.3, 0.98, count), 2),
+            "lat": np.round(assets["lat"].to_numpy()[site_index] + rng.normal(0, 0.01, count), 4),
+            "lon": np.round(assets["lon"].to_numpy()[site_index] + rng.normal(0, 0.01, count), 4),
+            "status": status,
+            "investigation_started_utc": iso(investigation, investigating),
+            "report_submitted_utc": iso(report, status == "REPORTED"),
+            "notes": notes,
+        }
+    )
+
+
+def write_dataset(data_dir: Path, event_count: int, seed: int = 0, site_count: Optional[int] = None) -> Path:
+    """Write ``assets.csv`` and ``events.csv`` for ``event_count`` events into ``data_dir``."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    sites = site_count or max(2, min(5_000, event_count // 200))
+    assets = generate_assets(sites, seed=seed)
+    assets.to_csv(data_dir / "assets.csv", index=False)
+    generate_events(event_count, assets, seed=seed).to_csv(data_dir / "events.csv", index=False)
+    return data_dir
@@ -5,7 +5,12 @@ from pathlib import Path
 from typing import Iterator
 
 import pytest
+from fastapi.testclient import TestClient
 
+from app import main as main_module
+from app.backends import SQLiteEventBackend
+from app.dependencies import get_store
+from app.migrate import migrate_csv_to_sqlite
 from app.store import DataStore
 
 
@@ -17,3 +22,27 @@ def temp_store(tmp_path_factory: pytest.TempPathFactory) -> Iterator[DataStore]:
     shutil.copytree(base_data_dir, working_dir, dirs_exist_ok=True)
     store = DataStore(working_dir)
     yield store
+
+
+@pytest.fixture()
+def sqlite_store(tmp_path_factory: pytest.TempPathFactory) -> Iterator[DataStore]:
+    """Provide a DataStore whose events were migrated into a temporary SQLite database."""
+    base_data_dir = Path(__file__).resolve().parents[1] / "data"
+    working_dir = tmp_path_factory.mktemp("sqlite-store")
+    shutil.copytree(base_data_dir, working_dir, dirs_exist_ok=True)
+    db_path = working_dir / "events.sqlite3"
+    migrate_csv_to_sqlite(working_dir / "events.csv", db_path)
+    store = DataStore(working_dir, backend=SQLiteEventBackend(db_path))
+    yield store
+    store.backend.close()
+
+
+@pytest.fixture()
+def api_client(temp_store: DataStore) -> Iterator[TestClient]:
+    """Provide a TestClient wired to a temporary datastore."""
+    main_module.app.dependency_overrides[get_store] = lambda: temp_store
+    try:
+        with TestClient(main_module.app) as client:
+            yield client
+    finally:
+        main_module.app.dependency_overrides.pop(get_store, None)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.analytics import FRAME_COLUMNS, compute_rollup, rollup
+from app.store import DataStore
+
+NOW = datetime(2025, 10, 30, tzinfo=timezone.utc)
+OPERATORS = {"S1": "Acme Energy", "S2": "Acme Energy"}
+
+
+def test_rollup_by_site(temp_store: DataStore) -> None:
+    frame = temp_store.backend.events_frame(columns=FRAME_COLUMNS)
+    rows = {row["site_id"]: row for row in compute_rollup(frame, OPERATORS, ["site"], now=NOW)}
+    assert rows["S1"]["detections"] == 5
+    assert rows["S1"]["total_est_ch4_kgph"] == pytest.approx(820 + 140 + 950 + 510 + 95)
+    assert rows["S1"]["mean_time_to_investigate_h"] is None
+    assert rows["S1"]["sla_breach_rate"] == 1.0
+    # E003 (investigated in time, never reported) breaches; only E006 made both SLAs.
+    assert rows["S2"]["sla_breach_rate"] == pytest.approx(0.8)
+    assert rows["S2"]["mean_time_to_investigate_h"] == pytest.approx((87 + 18 / 60 + 35 / 60) / 2)
+    assert rows["S2"]["mean_time_to_report_h"] == pytest.approx(23 + 35 / 60)
+
+
+def test_rollup_weekly_buckets(temp_store: DataStore) -> None:
+    frame = temp_store.backend.events_frame(columns=FRAME_COLUMNS)
+    rows = compute_rollup(frame, OPERATORS, ["operator"], bucket="week", now=NOW)
+    assert [(row["operator"], row["period_start_utc"].date().isoformat(), row["detections"]) for row in rows] == [
+        ("Acme Energy", "2025-09-15", 6),
+        ("Acme Energy", "2025-09-22", 4),
+    ]
+    with pytest.raises(ValueError):
+        compute_rollup(frame, OPERATORS, ["status"], now=NOW)
+
+
+def test_rollup_is_memoised_per_store_version(temp_store: DataStore) -> None:
+    first = rollup(temp_store, group_by=["detection_type"])
+    assert rollup(temp_store, group_by=["detection_type"]) is first
+    temp_store.set_investigation_started("E001", datetime(2025, 9, 20, tzinfo=timezone.utc))
+    second = rollup(temp_store, group_by=["detection_type"])
+    assert second is not first
+    assert second.data_version != first.data_version
+    satellite = next(row for row in second.rows if row["detection_type"] == "satellite")
+    assert satellite["mean_time_to_investigate_h"] == pytest.approx(11 + 46 / 60)
+
+
+def test_rollup_endpoint(api_client: TestClient) -> None:
+    response = api_client.get(
+        "/api/analytics/rollup",
+        params={"group_by": ["site", "detection_type"], "bucket": "month", "start": "2025-09-20T00:00:00Z"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["group_by"] == ["site", "detection_type"]
+    assert sum(row["detections"] for row in body["rows"]) == 6
+    assert {row["period_start_utc"] for row in body["rows"]} == {"2025-09-01T00:00:00Z"}
+    assert api_client.get("/api/analytics/rollup", params={"group_by": "status"}).status_code == 422
+    assert (
+        api_client.get(
+            "/api/analytics/rollup", params={"start": "2025-10-01T00:00:00Z", "end": "2025-09-01T00:00:00Z"}
+        ).status_code
+        == 400
+    )
+
+    mixed = api_client.get("/api/analytics/rollup", params={"start": "2025-09-20", "end": "2025-10-01T00:00:00Z"})
+    assert mixed.status_code == 200
+    assert mixed.json()["start"] == "2025-09-20T00:00:00Z"
+    assert sum(row["detections"] for row in mixed.json()["rows"]) == 6
@@ -1,24 +1,14 @@
 from __future__ import annotations
 
 import io
-from typing import Iterator
 
-import pytest
 from fastapi.testclient import TestClient
 
-from app import main as main_module
+from app.imports import SPOOL_DIR_ENV, import_jobs
 from app.main import _build_event_out
 from app.pdf import generate_event_report_pdf
 
 
-@pytest.fixture()
-def api_client(temp_store, monkeypatch) -> Iterator[TestClient]:
-    """Provide a TestClient wired to a temporary datastore."""
-    monkeypatch.setattr(main_module, "store", temp_store)
-    with TestClient(main_module.app) as client:
-        yield client
-
-
 def test_get_assets_and_events(api_client: TestClient) -> None:
     assets_response = api_client.get("/api/assets")
     assert assets_response.status_code == 200
@@ -60,7 +50,8 @@ def test_event_lifecycle_and_pdf(api_client: TestClient, temp_store) -> None:
     assert pdf_bytes.startswith(b"%PDF")
 
 
-def test_csv_import(api_client: TestClient) -> None:
+def test_csv_import(api_client: TestClient, monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv(SPOOL_DIR_ENV, str(tmp_path))
     csv_payload = (
         "id,site_id,detected_at_utc,detection_type,est_ch4_kgph,confidence,lat,lon,status\n"
         "N950,S2,2025-09-26T00:00:00Z,satellite,330,0.8,29.4200,-98.4900,NEW\n"
@@ -70,10 +61,44 @@ def test_csv_import(api_client: TestClient) -> None:
         "/api/events/import",
         files={"file": ("batch.csv", io.BytesIO(csv_payload), "text/csv")},
     )
-    assert response.status_code == 200
-    data = response.json()
-    assert data["imported"] == 1
-    assert data["skipped"] == 0
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["location"] == f"/api/imports/{job_id}"
+    import_jobs.wait(job_id, timeout=10)
+
+    data = api_client.get(f"/api/imports/{job_id}").json()
+    assert data["status"] == "succeeded"
+    assert (data["rows_processed"], data["imported"], data["skipped"]) == (1, 1, 0)
 
     events_after = api_client.get("/api/events").json()["events"]
     assert any(event["id"] == "N950" for event in events_after)
+
+
+def test_bulk_endpoint(api_client: TestClient) -> None:
+    response = api_client.post(
+        "/api/events/bulk",
+        json={"action": "investigate", "filter": {"status": "NEW", "site_ids": ["S2"]}},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 3 and body["unchanged"] == 0
+    assert {item["status"] for item in body["results"]} == {"INVESTIGATING"}
+
+    response = api_client.post(
+        "/api/events/bulk",
+        json={"action": "runbook", "ids": ["E004", "nope"], "item_id": "quantify"},
+    )
+    assert [item["outcome"] for item in response.json()["results"]] == ["updated", "not_found"]
+
+    assert api_client.post("/api/events/bulk", json={"action": "report"}).status_code == 422
+    assert api_client.post("/api/events/bulk", json={"action": "runbook", "ids": ["E001"]}).status_code == 422
+    assert api_client.post("/api/events/bulk", json={"action": "report", "filter": {}}).status_code == 422
+    assert api_client.post("/api/events/bulk", json={"action": "report", "filter": {"site_ids": []}}).status_code == 422
+
+    naive = api_client.post(
+        "/api/events/bulk",
+        json={"action": "report", "filter": {"status": "NEW", "detected_before": "2025-09-19T00:00:00"}},
+    )
+    assert naive.status_code == 200
+    results = naive.json()["results"]
+    assert results and all(item["outcome"] == "updated" for item in results)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.migrate import migrate_csv_to_sqlite
+from app.store import DataStore
+
+
+def test_sqlite_migration_preserves_events(temp_store: DataStore, sqlite_store: DataStore) -> None:
+    csv_ids = [event.id for event in temp_store.list_events()]
+    assert [event.id for event in sqlite_store.list_events()] == csv_ids
+    assert sqlite_store.get_event("E003").investigation_started_utc == temp_store.get_event(
+        "E003"
+    ).investigation_started_utc
+
+
+def test_sqlite_migration_skips_existing_ids(tmp_path) -> None:
+    source = Path(__file__).resolve().parents[1] / "data" / "events.csv"
+    db_path = tmp_path / "events.sqlite3"
+    assert migrate_csv_to_sqlite(source, db_path) == (10, 0)
+    assert migrate_csv_to_sqlite(source, db_path) == (0, 10)
+
+
+def test_sqlite_filters_and_pagination_are_pushed_down(sqlite_store: DataStore) -> None:
+    new_events = sqlite_store.list_events(status="NEW")
+    assert new_events and all(event.status == "NEW" for event in new_events)
+
+    page = sqlite_store.list_events(limit=3, offset=2)
+    assert [event.id for event in page] == ["E003", "E004", "E005"]
+
+    cutoff = datetime(2025, 9, 19, tzinfo=timezone.utc)
+    older = sqlite_store.list_events(detected_before=cutoff)
+    assert {event.id for event in older} == {"E003", "E007"}
+
+
+def test_sqlite_mutations_and_import(sqlite_store: DataStore) -> None:
+    now = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+    updated = sqlite_store.set_investigation_started("E001", now)
+    assert updated.status == "INVESTIGATING"
+    assert updated.investigation_started_utc == now
+    assert updated.notes["log"][-1]["message"] == "Investigation started"
+
+    event, created = sqlite_store.complete_runbook_item("E001", "quantify", now)
+    assert created is True
+    assert [entry["id"] for entry in event.notes["runbook_completed"]] == ["quantify"]
+
+    csv_payload = """id,site_id,detected_at_utc,detection_type,est_ch4_kgph,confidence,lat,lon,status
+E001,S1,2025-09-19T12:14:00Z,satellite,820,0.86,29.7638,-95.3650,NEW
+N920,S2,2025-09-26T00:00:00Z,satellite,330,0.8,29.4200,-98.4900,NEW
+N921,S2,2025-09-26T01:00:00Z,OGI,300,0.7,29.4201,-98.4901,NEW
+"""
+    result = sqlite_store.append_events_from_csv(csv_payload.encode("utf-8"))
+    assert (result.imported, result.skipped, result.merged) == (1, 1, 1)
+    assert sqlite_store.get_event("N920").notes["duplicates"][0]["id"] == "N921"
+
+
+def test_sqlite_bulk_transition(sqlite_store: DataStore) -> None:
+    now = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+    outcomes = sqlite_store.bulk_transition("report", ["E001", "E006", "missing"], now)
+    assert [item.outcome for item in outcomes] == ["updated", "unchanged", "not_found"]
+    assert sqlite_store.get_event("E001").report_submitted_utc == now
+    assert sqlite_store.matching_event_ids(status="REPORTED", site_ids=["S1"]) == ["E001"]
+
+
+def test_sqlite_data_version_tracks_commits(sqlite_store: DataStore) -> None:
+    before = sqlite_store.version
+    sqlite_store.list_events()
+    assert sqlite_store.version == before
+    sqlite_store.set_investigation_started("E001", datetime(2025, 9, 24, tzinfo=timezone.utc))
+    assert sqlite_store.version == before + 1
+    with pytest.raises(KeyError):
+        sqlite_store.set_report_submitted("missing", datetime(2025, 9, 24, tzinfo=timezone.utc))
+    assert sqlite_store.version == before + 1
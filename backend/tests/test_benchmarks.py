@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from app.store import DataStore
+from benchmarks import load
+from benchmarks.synth import write_dataset
+
+SEED_EVENTS = Path(__file__).resolve().parents[1] / "data" / "events.csv"
+
+
+def test_synthetic_dataset_matches_seed_schema_and_loads(tmp_path: Path) -> None:
+    data_dir = write_dataset(tmp_path, 500, seed=7)
+    synthetic = pd.read_csv(data_dir / "events.csv")
+    assert list(synthetic.columns) == list(pd.read_csv(SEED_EVENTS).columns)
+
+    store = DataStore(data_dir)
+    events = store.list_events()
+    assert len(events) == 500
+    known_sites = {asset.site_id for asset in store.list_assets()}
+    assert {event.site_id for event in events} <= known_sites
+    assert any(event.notes["log"] for event in events if event.status != "NEW")
+
+
+def test_load_harness_reports_every_route(tmp_path: Path) -> None:
+    output = tmp_path / "load.json"
+    argv = ["--events", "300", "--duration", "1.5", "--pollers", "2", "--poll-interval", "0.2"]
+    argv += ["--import-interval", "0.3", "--import-rows", "20", "--ai-latency-ms", "0", "--output", str(output)]
+    assert load.main(argv) == 0
+
+    report = json.loads(output.read_text())
+    routes = {row["route"]: row for row in report["routes"]}
+    assert {
+        "GET /api/events",
+        "POST /api/events/{id}/investigate",
+        "POST /api/events/import",
+        "GET /api/events/{id}/report.pdf",
+        "POST /api/events/{id}/assistant",
+    } <= set(routes)
+    assert report["total"]["errors"] == 0
+    assert report["ai_requests"] == routes["POST /api/events/{id}/assistant"]["requests"]
+    assert routes["GET /api/events"]["p50_ms"] <= routes["GET /api/events"]["p99_ms"]
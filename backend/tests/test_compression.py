@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import compression, serialization
+from app.schemas import EventsResponse
+
+
+def test_large_listing_is_gzipped(api_client: TestClient) -> None:
+    response = api_client.get("/api/events", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert EventsResponse.model_validate_json(response.content).events
+
+
+def test_small_and_identity_responses_are_not_compressed(api_client: TestClient) -> None:
+    assert "content-encoding" not in api_client.get("/healthz", headers={"Accept-Encoding": "gzip"}).headers
+    response = api_client.get("/api/events", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_encoding_choice_respects_quality(monkeypatch) -> None:
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.choose_encoding("br, gzip;q=0.5") == "gzip"
+    assert compression.choose_encoding("gzip;q=0") is None
+    assert compression.choose_encoding("*") == "gzip"
+    monkeypatch.setattr(compression, "brotli", object())
+    assert compression.choose_encoding("gzip, br") == "br"
+    assert compression.choose_encoding("gzip, br;q=0.1") == "gzip"
+
+
+def test_gzip_body_round_trips() -> None:
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    body = "x" * 5000
+    inner = Starlette(routes=[Route("/", lambda request: PlainTextResponse(body))])
+    client = TestClient(compression.CompressionMiddleware(inner, minimum_size=100))
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.text == body
+    assert int(response.headers["content-length"]) < 100
+    raw = client.stream("GET", "/", headers={"Accept-Encoding": "gzip"})
+    with raw as streamed:
+        assert gzip.decompress(b"".join(streamed.iter_raw())).decode() == body
+
+
+def test_streams_are_compressed_per_chunk_and_encoded_bodies_pass_through() -> None:
+    from starlette.applications import Starlette
+    from starlette.responses import Response, StreamingResponse
+    from starlette.routing import Route
+
+    chunks = [f"line {index}\n".encode() * 50 for index in range(20)]
+    inner = Starlette(
+        routes=[
+            Route("/stream", lambda request: StreamingResponse(iter(chunks), media_type="text/plain")),
+            Route("/encoded", lambda request: Response(b"y" * 5000, headers={"Content-Encoding": "custom"})),
+            Route("/image", lambda request: Response(b"z" * 5000, media_type="image/png")),
+        ]
+    )
+    client = TestClient(compression.CompressionMiddleware(inner, minimum_size=100))
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as streamed:
+        assert streamed.headers["content-encoding"] == "gzip" and "content-length" not in streamed.headers
+        assert gzip.decompress(b"".join(streamed.iter_raw())) == b"".join(chunks)
+    for path in ("/encoded", "/image"):
+        with client.stream("GET", path, headers={"Accept-Encoding": "gzip"}) as response:
+            assert len(b"".join(response.iter_raw())) == 5000
+            assert response.headers.get("content-encoding") != "gzip"
+
+
+def test_brotli_stream_round_trips() -> None:
+    pytest.importorskip("brotli")  # httpx decodes br bodies only when it is installed
+    from starlette.applications import Starlette
+    from starlette.responses import StreamingResponse
+    from starlette.routing import Route
+
+    chunks = [f"line {index}\n".encode() * 50 for index in range(20)]
+    inner = Starlette(routes=[Route("/", lambda request: StreamingResponse(iter(chunks), media_type="text/plain"))])
+    response = TestClient(compression.CompressionMiddleware(inner, minimum_size=100)).get(
+        "/", headers={"Accept-Encoding": "br"}
+    )
+    assert response.headers["content-encoding"] == "br"
+    assert response.content == b"".join(chunks)
+
+
+def test_media_type_negotiation(monkeypatch) -> None:
+    monkeypatch.setattr(serialization, "HAS_MSGPACK", True)
+    monkeypatch.setattr(serialization, "HAS_PYARROW", False)
+    negotiate = serialization.negotiate_media_type
+    assert negotiate(None) == "application/json"
+    assert negotiate("*/*") == "application/json"
+    assert negotiate("application/x-msgpack, application/json;q=0.5") == "application/msgpack"
+    assert negotiate("application/vnd.apache.arrow.stream") == "application/json"
+    monkeypatch.setattr(serialization, "HAS_MSGPACK", False)
+    assert negotiate("application/msgpack") == "application/json"
+
+
+def test_msgpack_listing(api_client: TestClient) -> None:
+    msgpack = pytest.importorskip("msgpack")
+    response = api_client.get("/api/events", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    decoded = msgpack.unpackb(response.content)
+    assert decoded == api_client.get("/api/events").json()
+
+
+def test_arrow_listing(api_client: TestClient) -> None:
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    response = api_client.get("/api/events", headers={"Accept": "application/vnd.apache.arrow.stream"})
+    table = pyarrow.ipc.open_stream(response.content).read_all()
+    events = api_client.get("/api/events").json()["events"]
+    assert table.num_rows == len(events)
+    assert table.column("id").to_pylist() == [event["id"] for event in events]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from app.dedup import cluster_detections
+
+
+def make_frame(rows) -> pd.DataFrame:
+    frame = pd.DataFrame(rows, columns=["id", "site_id", "detected_at_utc", "lat", "lon"])
+    frame["detected_at_utc"] = pd.to_datetime(frame["detected_at_utc"], utc=True)
+    return frame
+
+
+def test_cluster_links_nearby_detection_to_existing_event() -> None:
+    existing = make_frame([("E1", "S1", "2025-09-25T10:00:00Z", 29.7600, -95.3600)])
+    incoming = make_frame(
+        [
+            ("N1", "S1", "2025-09-25T12:00:00Z", 29.7605, -95.3602),  # ~60 m, 2 h later
+            ("N2", "S1", "2025-09-25T12:00:00Z", 29.7800, -95.3600),  # ~2 km away
+            ("N3", "S2", "2025-09-25T12:00:00Z", 29.7600, -95.3600),  # other site
+            ("N4", "S1", "2025-09-26T12:00:00Z", 29.7600, -95.3600),  # outside window
+        ]
+    )
+    assert cluster_detections(incoming, existing, distance_m=300, window_hours=6) == {0: "E1"}
+
+
+def test_cluster_groups_detections_within_the_same_batch() -> None:
+    existing = make_frame([])
+    incoming = make_frame(
+        [
+            ("N2", "S1", "2025-09-25T13:00:00Z", 29.7601, -95.3601),
+            ("N1", "S1", "2025-09-25T12:00:00Z", 29.7600, -95.3600),
+            ("N3", "S1", "2025-09-25T14:30:00Z", 29.7599, -95.3601),
+        ]
+    )
+    # The earliest detection becomes the primary regardless of row order.
+    assert cluster_detections(incoming, existing, distance_m=300, window_hours=6) == {0: "N1", 2: "N1"}
+
+
+def test_cluster_disabled_with_zero_window() -> None:
+    existing = make_frame([("E1", "S1", "2025-09-25T10:00:00Z", 29.76, -95.36)])
+    incoming = make_frame([("N1", "S1", "2025-09-25T10:00:00Z", 29.76, -95.36)])
+    assert cluster_detections(incoming, existing, distance_m=300, window_hours=0) == {}
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.emissions import FRAME_COLUMNS, compute_emissions, emissions, estimate_event
+from app.store import DataStore
+
+NOW = datetime(2025, 10, 30, tzinfo=timezone.utc)
+CAP = timedelta(days=30)
+OPERATORS = {"S1": "Acme Energy", "S2": "Acme Energy"}
+
+
+def test_event_estimate_ends_at_report_investigation_or_cap(temp_store: DataStore) -> None:
+    reported = estimate_event(temp_store.get_event("E006"), NOW, cap=CAP)
+    assert reported.hours == pytest.approx(23 + 35 / 60)
+    assert reported.mass_kg == pytest.approx(180 * reported.hours)
+    assert reported.weighted_mass_kg == pytest.approx(0.65 * reported.mass_kg)
+
+    open_event = temp_store.get_event("E003")  # investigated, never reported
+    assert estimate_event(open_event, NOW, cap=CAP).hours == 720
+    assert estimate_event(open_event, NOW, until="investigation", cap=CAP).hours == pytest.approx(87 + 18 / 60)
+    with pytest.raises(ValueError):
+        estimate_event(open_event, NOW, until="forever")
+
+
+def test_vectorised_totals_match_event_estimates(temp_store: DataStore) -> None:
+    frame = temp_store.backend.events_frame(columns=FRAME_COLUMNS)
+    rows = {row["site_id"]: row for row in compute_emissions(frame, OPERATORS, ["site"], now=NOW, cap=CAP)}
+    for site_id in ("S1", "S2"):
+        estimates = [estimate_event(event, NOW, cap=CAP) for event in temp_store.list_events() if event.site_id == site_id]
+        assert rows[site_id]["events"] == len(estimates)
+        assert rows[site_id]["mass_kg"] == pytest.approx(sum(item.mass_kg for item in estimates))
+        assert rows[site_id]["weighted_mass_kg"] == pytest.approx(sum(item.weighted_mass_kg for item in estimates))
+
+
+def test_periods_split_emissions_at_boundaries(temp_store: DataStore) -> None:
+    frame = temp_store.backend.events_frame(columns=FRAME_COLUMNS)
+    (total,) = compute_emissions(frame, OPERATORS, now=NOW, cap=CAP)
+    monthly = compute_emissions(frame, OPERATORS, ["operator"], bucket="month", now=NOW, cap=CAP)
+    assert [row["period_start_utc"].date().isoformat() for row in monthly] == ["2025-09-01", "2025-10-01"]
+    assert sum(row["mass_kg"] for row in monthly) == pytest.approx(total["mass_kg"])
+    # Only E006 ended in September; every other event carries on into October.
+    assert monthly[1]["events"] == 9
+
+    quarterly = compute_emissions(frame, OPERATORS, bucket="quarter", now=NOW, cap=CAP)
+    assert [row["mass_kg"] for row in quarterly] == pytest.approx([row["mass_kg"] for row in monthly])
+
+    october = compute_emissions(frame, OPERATORS, now=NOW, cap=CAP, start=datetime(2025, 10, 1, tzinfo=timezone.utc))
+    assert october[0]["mass_kg"] == pytest.approx(monthly[1]["mass_kg"])
+    with pytest.raises(ValueError):
+        compute_emissions(frame, OPERATORS, bucket="fortnight", now=NOW)
+
+
+def test_emissions_endpoint_and_memo(api_client: TestClient, temp_store: DataStore) -> None:
+    response = api_client.get("/api/analytics/emissions", params={"group_by": "site", "bucket": "quarter"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["until"] == "report" and body["max_duration_h"] == 720
+    assert {row["site_id"] for row in body["rows"]} == {"S1", "S2"}
+    assert all(row["period_start_utc"].startswith("2025-") for row in body["rows"])
+
+    assert emissions(temp_store, ["site"]) is emissions(temp_store, ["site"])
+    inverted = {"start": "2025-10-01T00:00:00Z", "end": "2025-09-01T00:00:00Z"}
+    assert api_client.get("/api/analytics/emissions", params=inverted).status_code == 400
+    mixed = api_client.get("/api/analytics/emissions", params={"start": "2025-09-01", "end": "2025-10-01T00:00:00Z"})
+    assert mixed.status_code == 200 and mixed.json()["end"] == "2025-10-01T00:00:00Z"
+    assert mixed.json()["rows"]
+    assert api_client.get("/api/events/E006/report.pdf").status_code == 200
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.eventview import EventOutView, event_out_fields, view_for
+from app.serialization import dumps
+from app.store import DataStore
+from app.triage import PolicySet, registry
+
+NOW = datetime(2025, 9, 24, 12, 0, 0, 250000, tzinfo=timezone.utc)
+
+
+def expected(store: DataStore, now: datetime) -> list:
+    return [dumps(event_out_fields(store, event, now)) for event in store.list_events()]
+
+
+def test_fragments_are_byte_identical_across_time(temp_store: DataStore) -> None:
+    view = view_for(temp_store)
+    ids = temp_store.list_event_ids()
+    # Later calls cross the 48 h and 96 h recency tiers of several events and flip SLA breaches.
+    for now in (NOW, NOW + timedelta(hours=30), NOW + timedelta(days=6), NOW - timedelta(days=3)):
+        assert view.fragments(temp_store, ids, now) == expected(temp_store, now)
+    assert view.built == len(ids) == len(view)
+
+    breached = view.fragments(temp_store, ids, NOW, breached_only=True)
+    assert breached == [
+        fragment for fragment in expected(temp_store, NOW) if b'_breached":true' in fragment
+    ]
+    assert view.fragments(temp_store, ["nope", "E002"], NOW) == [expected(temp_store, NOW)[1]]
+
+
+def test_writes_and_policy_reloads_invalidate(temp_store: DataStore) -> None:
+    view = view_for(temp_store)
+    ids = temp_store.list_event_ids()
+    view.fragments(temp_store, ids, NOW)
+    temp_store.set_investigation_started("E001", NOW)
+    temp_store.complete_runbook_item("E002", "quantify", NOW)
+    assert view.fragments(temp_store, ids, NOW) == expected(temp_store, NOW)
+    assert view.built == len(ids) + 2
+
+    previous = registry.current()
+    registry.install(PolicySet.from_mapping({"default": {"recency_tiers": [[24, 0.3]], "investigate_sla_days": 1}}))
+    try:
+        assert view.fragments(temp_store, ids, NOW) == expected(temp_store, NOW)
+        assert view.built == 2 * len(ids) + 2
+    finally:
+        registry.install(previous)
+
+    # Only the most recently served entries are kept.
+    small = EventOutView(max_events=3)
+    small.fragments(temp_store, ids, NOW)
+    assert len(small) == 3
+
+
+def test_endpoints_serve_the_view(api_client: TestClient, temp_store: DataStore) -> None:
+    listed = api_client.get("/api/events", params={"status": "NEW", "limit": 3, "offset": 1})
+    assert listed.headers["content-type"] == "application/json"
+    assert [event["id"] for event in listed.json()["events"]] == temp_store.list_event_ids("NEW", limit=3, offset=1)
+
+    detail = api_client.get("/api/events/E005")
+    assert detail.status_code == 200 and detail.headers["content-type"] == "application/json"
+    body = detail.json()
+    assert body["id"] == "E005" and body["asset"]["site_id"] == "S1"
+    assert len(body["runbook"]) == 4 and "sla_report_remaining_h" in body
+    assert api_client.get("/api/events/E404").status_code == 404
+
+
+def test_breached_only_pages_after_the_breach_filter(api_client: TestClient, temp_store: DataStore) -> None:
+    def ids(**params: object) -> list:
+        response = api_client.get("/api/events", params={"sla_breached_only": True, **params})
+        return [event["id"] for event in response.json()["events"]]
+
+    previous = registry.current()
+    # S1 events (E001 and E002 lead the listing) can no longer breach; S2 events still do.
+    registry.install(PolicySet.from_mapping({"sites": {"S1": {"investigate_sla_days": 36500, "report_sla_days": 36500}}}))
+    try:
+        breached = ids()
+        assert breached and not {"E001", "E002"} & set(breached)
+        assert ids(limit=2) == breached[:2]
+        assert ids(limit=2, offset=1) == breached[1:3]
+        assert ids(offset=len(breached)) == []
+
+        pyarrow = pytest.importorskip("pyarrow")
+        import pyarrow.ipc
+
+        response = api_client.get(
+            "/api/events",
+            params={"sla_breached_only": True, "limit": 2, "offset": 1},
+            headers={"Accept": "application/vnd.apache.arrow.stream"},
+        )
+        assert pyarrow.ipc.open_stream(response.content).read_all().column("id").to_pylist() == breached[1:3]
+    finally:
+        registry.install(previous)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.imports import ImportJobManager, import_jobs
+from app.store import DataStore
+
+HEADER = "id,site_id,detected_at_utc,detection_type,est_ch4_kgph,confidence,lat,lon,status\n"
+
+
+def _csv(*rows: str) -> io.BytesIO:
+    return io.BytesIO((HEADER + "".join(f"{row}\n" for row in rows)).encode("utf-8"))
+
+
+def test_import_job_runs_in_batches(temp_store: DataStore, tmp_path: Path) -> None:
+    manager = ImportJobManager(spool_dir=tmp_path, batch_rows=2)
+    job = manager.submit(
+        temp_store,
+        _csv(
+            "B1,S1,2025-10-01T00:00:00Z,satellite,300,0.8,29.1,-95.1,NEW",
+            "E001,S1,2025-09-19T12:14:00Z,satellite,820,0.86,29.7638,-95.3650,NEW",
+            "B2,S2,2025-10-02T00:00:00Z,OGI,120,0.5,27.1,-97.1,NEW",
+            "B3,S2,2025-10-05T00:00:00Z,continuous,90,0.4,26.1,-98.1,NEW",
+            "B4,S1,2025-10-09T00:00:00Z,OGI,75,0.6,25.1,-99.1,NEW",
+        ),
+        "batch.csv",
+    )
+    assert job.status == "queued"
+    finished = manager.wait(job.id, timeout=10)
+    manager.shutdown()
+    assert finished.status == "succeeded"
+    assert (finished.rows_processed, finished.imported, finished.skipped) == (5, 4, 1)
+    assert finished.finished_at_utc is not None and not finished.errors
+    assert {"B1", "B4"} <= {event.id for event in temp_store.list_events()}
+    assert not (tmp_path / f"{job.id}.csv").exists()
+    # Another worker process only sees the mirrored status file.
+    assert ImportJobManager(spool_dir=tmp_path).get(job.id).imported == 4
+
+
+def test_import_job_reports_failures(temp_store: DataStore, tmp_path: Path) -> None:
+    manager = ImportJobManager(spool_dir=tmp_path)
+    job = manager.wait(manager.submit(temp_store, io.BytesIO(b"id,site_id\nX1,S1\n"), "bad.csv").id, timeout=10)
+    manager.shutdown()
+    assert job.status == "failed"
+    assert "Missing required columns" in job.errors[0]
+    assert job.message.startswith("Import failed")
+    with pytest.raises(KeyError):
+        manager.get("../../etc/passwd")
+
+
+def test_import_status_endpoint_404(api_client: TestClient) -> None:
+    assert api_client.get(f"/api/imports/{'0' * 32}").status_code == 404
+
+
+def test_import_job_quarantines_invalid_rows(
+    api_client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("IMPORT_SPOOL_DIR", str(tmp_path))
+    upload = _csv(
+        "Q1,S1,2025-10-01T00:00:00Z,satellite,300,0.8,29.1,-95.1,NEW",
+        "Q2,S7,2025-10-02T00:00:00Z,OGI,120,1.5,27.1,-97.1,NEW",
+        "Q3,S2,2025-10-03T00:00:00.5Z,OGI,120,0.5,27.1,-97.1,NEW",
+    )
+    response = api_client.post("/api/events/import", files={"file": ("mixed.csv", upload, "text/csv")})
+    job = import_jobs.wait(response.json()["id"], timeout=10)
+    assert job.status == "succeeded"
+    assert (job.imported, job.rejected, job.failed_batches) == (2, 1, 0)
+    assert job.errors == [
+        "row 2: site_id: is not a known site (got 'S7')",
+        "row 2: confidence: must be a number between 0 and 1 (got 1.5)",
+    ]
+    assert "rejected 1 invalid row(s)" in job.message
+
+    quarantine = api_client.get(f"/api/imports/{job.id}/rejected")
+    assert quarantine.status_code == 200
+    rows = pd.read_csv(io.StringIO(quarantine.text))
+    assert rows[["row", "id"]].values.tolist() == [[2, "Q2"]]
+    assert rows.loc[0, "errors"].startswith("site_id: is not a known site; confidence:")
+
+    clean = api_client.post("/api/events/import", files={"file": ("clean.csv", _csv(), "text/csv")})
+    import_jobs.wait(clean.json()["id"], timeout=10)
+    assert api_client.get(f"/api/imports/{clean.json()['id']}/rejected").status_code == 404
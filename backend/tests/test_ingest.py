@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import AsyncIterator, List
+
+from fastapi.testclient import TestClient
+
+from app.ingest import MAX_LINE_BYTES, ingest_ndjson
+from app.store import DataStore
+
+
+def _line(event_id: str, day: int, **overrides: object) -> str:
+    record = {
+        "id": event_id,
+        "site_id": "S1",
+        "detected_at_utc": f"2025-10-{day:02d}T00:00:00Z",
+        "detection_type": "continuous",
+        "est_ch4_kgph": 150.0,
+        "confidence": 0.7,
+        "lat": 29.7604,
+        "lon": -95.3698,
+    }
+    record.update(overrides)
+    return json.dumps(record) + "\n"
+
+
+async def _chunks(parts: List[bytes], pause_s: float = 0.0) -> AsyncIterator[bytes]:
+    for part in parts:
+        if pause_s:
+            await asyncio.sleep(pause_s)
+        yield part
+
+
+def test_stream_is_split_into_size_bounded_batches(temp_store: DataStore) -> None:
+    body = "".join(_line(f"C{index}", index + 1) for index in range(5)).encode()
+    # Chunk boundaries fall mid-line, as they do on the wire.
+    parts = [body[offset : offset + 37] for offset in range(0, len(body), 37)]
+    summary = asyncio.run(ingest_ndjson(temp_store, _chunks(parts), batch_rows=2, batch_interval_s=60))
+    assert (summary.received, summary.accepted, summary.batches, summary.imported) == (5, 5, 3, 5)
+    assert temp_store.get_event("C4").detection_type == "continuous"
+
+
+def test_stream_flushes_partial_batches_after_the_interval(temp_store: DataStore) -> None:
+    parts = [_line("T1", 1).encode(), _line("T2", 5).encode()]
+    summary = asyncio.run(ingest_ndjson(temp_store, _chunks(parts, pause_s=0.2), batch_rows=100, batch_interval_s=0.05))
+    assert (summary.batches, summary.imported) == (2, 2)
+
+
+def test_overlong_line_keeps_the_complete_lines_before_it(temp_store: DataStore) -> None:
+    body = (_line("L1", 1) + _line("L2", 2)).encode() + b"x" * (MAX_LINE_BYTES + 1)
+    summary = asyncio.run(ingest_ndjson(temp_store, _chunks([body]), batch_rows=10, batch_interval_s=60))
+    assert (summary.received, summary.accepted) == (2, 2)
+    assert summary.errors == [f"line 3: longer than {MAX_LINE_BYTES} bytes"]
+
+
+def test_stream_endpoint_reports_rejected_lines(api_client: TestClient) -> None:
+    body = (
+        _line("N1", 1)
+        + "{not json\n"
+        + _line("N2", 3, confidence=1.5)
+        + "\n"
+        + _line("E001", 5)
+        + _line("N3", 7, status="INVESTIGATING")
+        + _line("N4", 9, site_id="S9")
+    )
+    response = api_client.post(
+        "/api/events/stream", content=body.encode(), headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["received"], summary["accepted"], summary["rejected"]) == (6, 3, 3)
+    assert (summary["imported"], summary["skipped"]) == (2, 1)
+    assert summary["errors"][0].startswith("line 2: invalid JSON")
+    assert summary["errors"][1].startswith("line 3: confidence")
+    # Well-formed, but the store has no such site.
+    assert summary["errors"][2] == "line 7: site_id: is not a known site (got 'S9')"
+    events = {event["id"]: event for event in api_client.get("/api/events").json()["events"]}
+    assert events["N3"]["status"] == "INVESTIGATING" and "N2" not in events
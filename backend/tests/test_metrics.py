@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import metrics
+
+
+@pytest.fixture()
+def metrics_enabled(monkeypatch) -> Iterator[metrics.MetricsRegistry]:
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.registry.reset()
+
+
+def test_server_timing_and_prometheus_output(api_client: TestClient, metrics_enabled) -> None:
+    response = api_client.get("/api/events", params={"status": "NEW"})
+    assert response.status_code == 200
+    server_timing = response.headers["server-timing"]
+    assert server_timing.startswith("app;dur=")
+    for name in ("store.list", "triage.evaluate", "api.build_event_out"):
+        assert f"{name};dur=" in server_timing
+
+    exposition = api_client.get("/metrics").text
+    assert "# TYPE og_http_request_duration_seconds histogram" in exposition
+    assert 'og_http_request_duration_seconds_count{method="GET",route="/api/events",status="200"} 1' in exposition
+    assert 'og_span_duration_seconds_bucket{span="store.list",le="+Inf"} 1' in exposition
+
+
+def test_mutation_records_persist_span(api_client: TestClient, metrics_enabled) -> None:
+    response = api_client.post("/api/events/E001/investigate")
+    assert "store.persist;dur=" in response.headers["server-timing"]
+    assert 'route="/api/events/{event_id}/investigate"' in api_client.get("/metrics").text
+
+
+def test_disabled_metrics_add_no_header(api_client: TestClient, monkeypatch) -> None:
+    monkeypatch.setattr(metrics.registry, "enabled", False)
+    assert metrics.span("store.list") is metrics.span("store.persist")
+    response = api_client.get("/api/events")
+    assert "server-timing" not in response.headers
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from app.notes import EventNotes, LogEntry, RunbookCompletion
+from app.schemas import Event
+
+
+def test_append_returns_new_view_and_keeps_old_view_stable() -> None:
+    first = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+    base = EventNotes().with_log(LogEntry.at("Investigation started", first))
+    extended = base.with_log(LogEntry.at("Report submitted", first))
+
+    assert [entry.message for entry in base.log_entries()] == ["Investigation started"]
+    assert [entry.message for entry in extended.log_entries()] == ["Investigation started", "Report submitted"]
+    # Existing entries are shared rather than copied, with timestamps already parsed.
+    assert next(base.log_entries()) is next(extended.log_entries())
+    assert next(extended.log_entries()).timestamp == first
+
+
+def test_appending_to_a_stale_view_forks_instead_of_overwriting() -> None:
+    now = datetime(2025, 9, 24, tzinfo=timezone.utc)
+    base = EventNotes().with_log(LogEntry.at("one", now))
+    newer = base.with_log(LogEntry.at("two", now))
+    branch = base.with_log(LogEntry.at("other", now))
+
+    assert [entry.message for entry in newer.log_entries()] == ["one", "two"]
+    assert [entry.message for entry in branch.log_entries()] == ["one", "other"]
+
+
+def test_legacy_json_round_trip_and_mapping_access() -> None:
+    legacy = (
+        '{"runbook_completed": [{"id": "quantify", "timestamp_utc": "2025-09-24T16:00:00Z"}], '
+        '"log": [{"message": "Operator notified", "timestamp_utc": "2025-09-24T16:05:00Z"}]}'
+    )
+    notes = EventNotes.coerce(legacy)
+    assert notes.has_runbook_item("quantify")
+    assert notes["log"] == [{"message": "Operator notified", "timestamp_utc": "2025-09-24T16:05:00Z"}]
+    assert notes.get("duplicates") == []
+    assert EventNotes.coerce(notes.to_json()).to_dict() == notes.to_dict()
+    assert EventNotes.coerce("not json")["log"][0]["message"] == "not json"
+
+
+def test_event_model_shares_notes_and_serializes_to_dicts() -> None:
+    notes = EventNotes().with_runbook_completion(
+        RunbookCompletion.at("site-safety", datetime(2025, 9, 24, tzinfo=timezone.utc))
+    )
+    event = Event(
+        id="E1",
+        site_id="S1",
+        detected_at_utc=datetime(2025, 9, 23, tzinfo=timezone.utc),
+        detection_type="OGI",
+        est_ch4_kgph=100.0,
+        confidence=0.5,
+        lat=29.7,
+        lon=-95.3,
+        status="NEW",
+        notes=notes,
+    )
+    assert event.notes is notes
+    assert event.model_dump()["notes"] is notes
+    assert event.model_dump(mode="json")["notes"]["runbook_completed"] == [
+        {"id": "site-safety", "timestamp_utc": "2025-09-24T00:00:00Z"}
+    ]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+import pytest
+
+from app.notifications import DeadlineScheduler, WebhookSink
+from app.store import DataStore
+from app.triage import PolicyRegistry
+
+NOW = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+
+
+class WebhookStub:
+    """Local HTTP server recording JSON POSTs; ``/fail`` answers 500."""
+
+    def __init__(self) -> None:
+        received: List[dict] = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path == "/fail":
+                    self.send_response(500)
+                else:
+                    received.append(json.loads(body))
+                    self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self.received = received
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def ids(self) -> List[str]:
+        return sorted(payload["id"] for payload in self.received)
+
+
+@pytest.fixture()
+def webhook() -> Iterator[WebhookStub]:
+    stub = WebhookStub()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+def make_scheduler(webhook: WebhookStub, *extra_urls: str) -> DeadlineScheduler:
+    return DeadlineScheduler(
+        [WebhookSink(webhook.url + "/hook"), *(WebhookSink(webhook.url + path) for path in extra_urls)],
+        due_soon=timedelta(hours=24),
+        lookback=timedelta(hours=24),
+        policy_registry=PolicyRegistry(reload_interval_s=0),
+        clock=lambda: NOW,
+    )
+
+
+def test_deadlines_fire_once_and_follow_writes(temp_store: DataStore, webhook: WebhookStub) -> None:
+    scheduler = make_scheduler(webhook)
+    scheduler.attach(temp_store, NOW)
+
+    # E001 breached three hours ago, E009 is due in seven; E007 breached too long ago to replay.
+    fired = scheduler.run_pending(NOW)
+    assert sorted(notification.id for notification in fired) == [
+        "E001:investigate:breached",
+        "E009:investigate:due_soon",
+    ]
+    assert webhook.ids() == ["E001:investigate:breached", "E009:investigate:due_soon"]
+    payload = next(payload for payload in webhook.received if payload["event_id"] == "E009")
+    assert payload["type"] == "sla.investigate.due_soon"
+    assert payload["deadline_utc"] == "2025-09-24T21:50:00Z"
+    assert scheduler.run_pending(NOW) == []
+
+    # Starting an investigation cancels its deadline; a new detection gets one.
+    temp_store.set_investigation_started("E004", NOW)
+    csv_payload = """id,site_id,detected_at_utc,detection_type,est_ch4_kgph,confidence,lat,lon,status
+N950,S2,2025-09-21T12:00:00Z,OGI,300,0.7,29.5,-98.6,NEW
+"""
+    temp_store.append_events_from_csv(csv_payload.encode("utf-8"))
+    assert [n.id for n in scheduler.run_pending(NOW + timedelta(hours=8))] == ["E009:investigate:breached"]
+    later = scheduler.run_pending(datetime(2025, 9, 25, 13, 0, tzinfo=timezone.utc))
+    assert sorted(n.id for n in later) == ["E002:investigate:due_soon", "N950:investigate:due_soon"]
+    assert scheduler.rebuilds == 1
+    assert (scheduler.sent, scheduler.failed) == (5, 0)
+
+
+def test_fired_markers_are_dropped_when_deadlines_close(temp_store: DataStore, webhook: WebhookStub) -> None:
+    scheduler = make_scheduler(webhook)
+    scheduler.attach(temp_store, NOW)
+    scheduler.run_pending(NOW)
+    assert set(scheduler._fired) == {("E001", "investigate", "breached"), ("E009", "investigate", "due_soon")}
+
+    # Unrelated writes keep the markers, so nothing is sent twice.
+    temp_store.complete_runbook_item("E001", "quantify", NOW)
+    assert scheduler.run_pending(NOW) == [] and len(scheduler._fired) == 2
+    scheduler.rebuild(NOW)  # reloads E001's passed deadline, which is still in the lookback
+    assert scheduler.run_pending(NOW) == [] and len(scheduler._fired) == 2
+
+    temp_store.set_investigation_started("E001", NOW)
+    temp_store.set_investigation_started("E009", NOW)
+    assert scheduler._fired == {}
+    scheduler.rebuild(NOW)
+    assert scheduler.run_pending(NOW) == []
+
+
+def test_failing_sink_does_not_block_others(temp_store: DataStore, webhook: WebhookStub) -> None:
+    scheduler = make_scheduler(webhook, "/fail")
+    scheduler.attach(temp_store, NOW)
+    scheduler.run_pending(NOW)
+    assert (scheduler.sent, scheduler.failed) == (2, 2)
+    assert len(webhook.received) == 2
+
+
+def test_background_thread_delivers_and_stops(temp_store: DataStore, webhook: WebhookStub) -> None:
+    scheduler = make_scheduler(webhook)
+    scheduler.start(lambda: temp_store)
+    try:
+        deadline = time.monotonic() + 5
+        while len(webhook.received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert webhook.ids() == ["E001:investigate:breached", "E009:investigate:due_soon"]
+    finally:
+        scheduler.stop(timeout=5)
+    temp_store.set_report_submitted("E002", NOW)  # no longer subscribed
+    assert scheduler.version != temp_store.version
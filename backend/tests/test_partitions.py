@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app import partitions
+from app.partitions import PartitionedEventBackend, hot_cutoff
+from app.store import DataStore
+
+
+@pytest.fixture()
+def data_dir(tmp_path: Path) -> Path:
+    base_data_dir = Path(__file__).resolve().parents[1] / "data"
+    shutil.copytree(base_data_dir, tmp_path, dirs_exist_ok=True)
+    return tmp_path
+
+
+def open_store(data_dir: Path) -> DataStore:
+    backend = PartitionedEventBackend(data_dir / "partitions", seed_path=data_dir / "events.csv", hot_months=2)
+    return DataStore(data_dir, backend=backend)
+
+
+def test_hot_cutoff_keeps_recent_months() -> None:
+    cutoff = hot_cutoff(datetime(2025, 10, 17, 9, tzinfo=timezone.utc), hot_months=2)
+    assert cutoff.isoformat() == "2025-09-01T00:00:00+00:00"
+
+
+def test_closed_old_events_roll_to_cold_and_load_lazily(data_dir: Path) -> None:
+    store = open_store(data_dir)
+    backend = store.backend
+    assert backend.cold_months() == ["2025-09"]
+    assert "E006" not in set(backend.snapshot().frame["id"])
+    assert list((data_dir / "partitions").glob("events-2025-09.g1.csv.gz"))
+
+    open_ids = {event.id for event in store.list_events(status="NEW")}
+    assert "E001" in open_ids
+    assert not backend._cold_frames  # open-status queries never touch archives
+
+    assert store.get_event("E006").status == "REPORTED"
+    assert len(store.list_events()) == 10
+    assert [event.id for event in store.list_events(status="REPORTED")] == ["E006"]
+
+
+def test_updating_archived_event_shadows_then_rerolls(data_dir: Path) -> None:
+    store = open_store(data_dir)
+    now = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    event, created = store.complete_runbook_item("E006", "quantify", now)
+    assert created and event.notes.has_runbook_item("quantify")
+    assert "E006" in set(store.backend.snapshot().frame["id"])
+    assert len(store.list_events()) == 10
+
+    reopened = open_store(data_dir)
+    assert reopened.backend.cold_months() == ["2025-09"]
+    assert reopened.get_event("E006").notes.has_runbook_item("quantify")
+    assert "E006" not in set(reopened.backend.snapshot().frame["id"])
+    partition_files = sorted(path.name for path in (data_dir / "partitions").glob("events-2025-09.*"))
+    assert partition_files == ["events-2025-09.g2.csv.gz", "events-2025-09.g2.ids"]
+
+
+def test_import_and_cluster_candidates_see_archived_events(data_dir: Path) -> None:
+    store = open_store(data_dir)
+    csv_payload = """id,site_id,detected_at_utc,detection_type,est_ch4_kgph,confidence,lat,lon,status
+E006,S2,2025-09-23T09:25:00Z,OGI,180,0.65,29.4302,-98.4850,REPORTED
+N950,S2,2025-09-23T10:00:00Z,satellite,200,0.7,29.4303,-98.4851,NEW
+"""
+    result = store.append_events_from_csv(csv_payload.encode("utf-8"))
+    assert (result.imported, result.skipped, result.merged) == (0, 1, 1)
+    assert store.get_event("E006").notes["duplicates"][0]["id"] == "N950"
+
+
+def test_limited_listing_reads_only_the_partitions_it_needs(data_dir: Path, monkeypatch) -> None:
+    archived = [
+        f"A{month}{index},S{index + 1},2025-{month:02d}-1{index}T08:00:00Z,OGI,100,0.6,29.4,-98.4,REPORTED,,,{{}}"
+        for month in range(1, 9)
+        for index in range(2)
+    ]
+    with (data_dir / "events.csv").open("a") as handle:
+        handle.write("\n".join(archived) + "\n")
+    store = open_store(data_dir)
+    backend = store.backend
+    assert len(backend.cold_months()) == 9
+    store.complete_runbook_item("A20", "quantify", datetime(2025, 10, 1, tzinfo=timezone.utc))  # shadowed now
+    everything = backend.query_event_ids()
+    assert len(everything) == 26 and everything.count("A20") == 1
+
+    loads: List[str] = []
+    read = partitions.read_events_csv
+    monkeypatch.setattr(partitions, "read_events_csv", lambda path: loads.append(path.name) or read(path))
+    assert backend.query_event_ids(limit=2) == everything[:2]
+    assert loads == ["events-2025-01.g1.csv.gz"]
+
+    loads.clear()
+    backend._cold_frames.clear()
+    assert backend.query_event_ids(limit=3, offset=4) == everything[4:7]
+    assert loads == ["events-2025-03.g1.csv.gz", "events-2025-04.g1.csv.gz"]  # A20 is hot, so March has one row
+
+    for offset in (0, 5, 15, 17, 24, 30):
+        assert backend.query_event_ids(limit=4, offset=offset) == everything[offset : offset + 4]
+    cutoff = datetime(2025, 4, 11, tzinfo=timezone.utc)
+    before = backend.query_event_ids(detected_before=cutoff)
+    assert before == ["A10", "A11", "A21", "A30", "A31", "A40", "A20"]  # the hot copy of A20 comes last
+    assert backend.query_event_ids(detected_before=cutoff, limit=2, offset=4) == before[4:6]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pstats
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.profiling import ADMIN_TOKEN_ENV, InstrumentedLock, StackSampler
+
+TOKEN = "s3cret"
+
+
+def _busy(deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+@pytest.fixture()
+def admin_headers(monkeypatch) -> dict[str, str]:
+    monkeypatch.setenv(ADMIN_TOKEN_ENV, TOKEN)
+    return {"X-Admin-Token": TOKEN}
+
+
+def test_sampler_exports_folded_and_pstats(tmp_path) -> None:
+    sampler = StackSampler(interval_s=0.001).start()
+    worker = threading.Thread(target=_busy, args=(time.perf_counter() + 0.2,))
+    worker.start()
+    worker.join()
+    profile = sampler.stop()
+
+    assert profile.samples > 0
+    assert "_busy (test_profiling.py:" in profile.to_folded()
+
+    path = tmp_path / "capture.pstats"
+    path.write_bytes(profile.to_pstats())
+    stats = pstats.Stats(str(path))
+    assert any(name == "_busy" for _, _, name in stats.stats)
+    assert profile.top_functions(1)[0].self_s > 0
+
+
+def test_instrumented_lock_counts_contention() -> None:
+    lock = InstrumentedLock("test.lock")
+    lock.acquire()
+    waiter = threading.Thread(target=lambda: lock.__enter__() and lock.release())
+    waiter.start()
+    time.sleep(0.05)
+    lock.release()
+    waiter.join()
+
+    stats = lock.snapshot()
+    assert stats.acquisitions == 2
+    assert stats.contended == 1
+    assert stats.max_wait_s >= 0.04
+    assert stats.total_hold_s >= 0.04
+
+
+def test_admin_endpoints_hidden_without_token(api_client: TestClient, monkeypatch) -> None:
+    monkeypatch.delenv(ADMIN_TOKEN_ENV, raising=False)
+    assert api_client.get("/api/admin/lock-stats").status_code == 404
+
+
+def test_admin_endpoints_reject_wrong_token(api_client: TestClient, admin_headers) -> None:
+    response = api_client.get("/api/admin/lock-stats", headers={"X-Admin-Token": "nope"})
+    assert response.status_code == 403
+
+
+def test_timed_capture_and_lock_stats(api_client: TestClient, admin_headers) -> None:
+    api_client.post("/api/events/E001/investigate")
+    stats = api_client.get("/api/admin/lock-stats", headers=admin_headers).json()
+    assert stats["name"] == "store.lock"
+    assert stats["acquisitions"] >= 1
+
+    response = api_client.post(
+        "/api/admin/profile", params={"seconds": 0.05, "interval_ms": 1}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["duration_s"] >= 0.05
+    assert summary["lock_wait_s"] >= 0
+
+    download = api_client.get(f"/api/admin/profiles/{summary['id']}", headers=admin_headers)
+    assert download.status_code == 200
+    assert download.headers["content-disposition"].endswith(".folded")
+
+
+def test_single_request_profile_via_header(api_client: TestClient, admin_headers) -> None:
+    plain = api_client.get("/api/events", headers={"X-Profile": "1"})
+    assert "x-profile-id" not in plain.headers
+
+    response = api_client.get("/api/events", headers={**admin_headers, "X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+    download = api_client.get(
+        f"/api/admin/profiles/{profile_id}", params={"format": "pstats"}, headers=admin_headers
+    )
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/octet-stream"
+    assert api_client.get("/api/admin/profiles/missing", headers=admin_headers).status_code == 404
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.scoring import SCORE_COLUMNS, TriageScorer, compile_policies, site_operators
+from app.store import DataStore
+from app.triage import PolicyRegistry, PolicySet, registry, triage_fields
+
+NOW = datetime(2025, 9, 24, tzinfo=timezone.utc)
+POLICY = {
+    "default": {"recency_tiers": [[24, 0.2], [72, 0.1], [240, 0.02]]},
+    "operators": {"Acme Energy": {"high_threshold": 0.6, "investigate_sla_days": 4}},
+    "sites": {"S2": {"detection_weights": {"OGI": 1.0}, "severity_scale_kgph": 800}},
+}
+
+
+@pytest.fixture()
+def active_policy() -> Iterator[PolicySet]:
+    previous = registry.current()
+    policies = PolicySet.from_mapping(POLICY)
+    registry.install(policies)
+    try:
+        yield policies
+    finally:
+        registry.install(previous)
+
+
+def test_compiled_scores_match_scalar_triage(temp_store: DataStore) -> None:
+    policies = PolicySet.from_mapping(POLICY)
+    operators = site_operators(temp_store)
+    scores = compile_policies(policies, operators).score(
+        temp_store.backend.events_frame(columns=SCORE_COLUMNS), NOW
+    )
+    assert len(scores) == len(temp_store.list_events())
+    for event, row in zip(temp_store.list_events(), scores.itertuples()):
+        expected = triage_fields(event, NOW, policies.resolve(event.site_id, operators[event.site_id]))
+        assert row.id == event.id
+        assert row.triage_score == expected["triage_score"]
+        assert row.triage_bucket == expected["triage_bucket"]
+        assert row.recency_boost == expected["triage_breakdown"]["recency_boost"]
+        assert row.sla_investigate_deadline_utc == expected["sla_investigate_deadline_utc"]
+        assert row.sla_report_remaining_h == pytest.approx(expected["sla_report_remaining_h"])
+        assert row.sla_investigate_breached == expected["sla_investigate_breached"]
+
+
+def test_scorer_rescores_incrementally(temp_store: DataStore) -> None:
+    policies = PolicyRegistry(reload_interval_s=0)
+    scorer = TriageScorer(policies)
+    first = scorer.scores(temp_store, NOW)
+    assert scorer.rescored == 10
+
+    scorer.scores(temp_store, NOW)
+    assert scorer.rescored == 0
+
+    # Thresholds and SLAs are applied per call, so nothing needs re-scoring.
+    policies.install(PolicySet.from_mapping({"operators": {"Acme Energy": {"high_threshold": 0.5}}}))
+    assert scorer.scores(temp_store, NOW)["triage_bucket"].value_counts()["HIGH"] > (
+        first["triage_bucket"] == "HIGH"
+    ).sum()
+    assert scorer.rescored == 0
+
+    policies.install(PolicySet.from_mapping({"sites": {"S2": {"severity_weight": 0.9}}}))
+    rescored = scorer.scores(temp_store, NOW)
+    assert scorer.rescored == 5
+    changed = rescored["triage_score"] != first["triage_score"]
+    assert set(rescored.loc[changed, "site_id"]) == {"S2"}
+
+    temp_store.set_investigation_started("E001", NOW)
+    scorer.scores(temp_store, NOW)
+    assert scorer.rescored == 10
+
+
+def test_events_endpoint_uses_active_policy(api_client: TestClient, active_policy: PolicySet) -> None:
+    events = {event["id"]: event for event in api_client.get("/api/events").json()["events"]}
+    acme = active_policy.resolve("S2", "Acme Energy")
+    assert events["E003"]["triage_breakdown"]["detection_weight"] == 1.0
+    assert events["E003"]["triage_bucket"] == acme.bucket(events["E003"]["triage_score"])
+    detected = datetime.fromisoformat(events["E003"]["detected_at_utc"].replace("Z", "+00:00"))
+    deadline = datetime.fromisoformat(events["E003"]["sla_investigate_deadline_utc"].replace("Z", "+00:00"))
+    assert (deadline - detected).days == 4
+
+
+def test_simulation_counts_bucket_transitions_and_sla_shifts(temp_store: DataStore) -> None:
+    scorer = TriageScorer(PolicyRegistry(reload_interval_s=0))
+    candidate = PolicySet.from_mapping({"default": {"high_threshold": 0.5}, "sites": {"S1": {"report_sla_days": 10}}})
+    result = scorer.simulate(temp_store, candidate, NOW)
+    assert result.evaluated == 10
+    assert sum(result.transitions.values()) == 10
+    assert result.sla_changes == 5
+    moved = {pair: count for pair, count in result.transitions.items() if pair[0] != pair[1]}
+    assert set(moved) == {("MED", "HIGH")}
+    assert result.bucket_changes == moved[("MED", "HIGH")]
+
+    operators = site_operators(temp_store)
+    events = {event.id: event for event in temp_store.list_events()}
+    assert set(result.changed["id"]) >= {event_id for event_id, event in events.items() if event.site_id == "S1"}
+    for row in result.changed.itertuples():
+        event = events[row.id]
+        expected = triage_fields(event, NOW, candidate.resolve(event.site_id, operators[event.site_id]))
+        assert row.simulated_bucket == expected["triage_bucket"]
+        assert row.simulated_report_deadline_utc == expected["sla_report_deadline_utc"]
+    deltas = (result.changed["simulated_score"] - result.changed["current_score"]).abs()
+    assert deltas.is_monotonic_decreasing
+
+
+def test_simulate_endpoint(api_client: TestClient) -> None:
+    response = api_client.post(
+        "/api/triage/simulate",
+        json={"policy": {"operators": {"Acme Energy": {"investigate_sla_days": 3}}}, "limit": 2},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["evaluated"], body["changed"], body["sla_changes"], body["bucket_changes"]) == (10, 10, 10, 0)
+    assert len(body["events"]) == 2 and body["truncated"]
+    change = body["events"][0]
+    assert change["current_bucket"] == change["simulated_bucket"]
+    assert change["simulated_breakdown"]["score"] == round(change["simulated_score"], 3)
+    assert sum(item["count"] for item in body["transitions"]) == 10
+
+    invalid = api_client.post("/api/triage/simulate", json={"policy": {"default": {"med_threshold": 2}}})
+    assert invalid.status_code == 400
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app.search import index_for, search_events, tokenize
+from app.store import DataStore
+
+NOW = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+
+
+def test_tokenize_splits_words_and_drops_stopwords() -> None:
+    assert tokenize("Notify operator and Site-safety #2") == ["notify", "operator", "site", "safety", "2"]
+
+
+def test_search_finds_log_lines_runbook_labels_and_sites(temp_store: DataStore) -> None:
+    temp_store.set_investigation_started("E001", NOW)
+    temp_store.complete_runbook_item("E002", "notify-ops", NOW)
+
+    hits = search_events(temp_store, "investigation started").hits
+    assert "E001" in [hit.event_id for hit in hits]
+    assert "Investigation started" in next(hit for hit in hits if hit.event_id == "E001").matches
+
+    # Runbook completions are searchable by their template label.
+    assert [hit.event_id for hit in search_events(temp_store, "environmental lead").hits] == ["E002"]
+
+    # Every word must match; site words match all of the site's events.
+    both = search_events(temp_store, "notify north compressor")
+    assert [hit.event_id for hit in both.hits] == ["E002"]
+    assert "North Compressor Station Acme Energy" in both.hits[0].matches
+    assert search_events(temp_store, "notify nowhere").total == 0
+
+
+def test_index_follows_store_writes_incrementally(temp_store: DataStore) -> None:
+    index = index_for(temp_store)
+    search_events(temp_store, "anything")
+    built_at = index.version
+
+    temp_store.bulk_transition("runbook", ["E001", "E004"], NOW, item_id="quantify")
+    assert index.version == temp_store.version != built_at
+    assert {hit.event_id for hit in search_events(temp_store, "follow-up quantification").hits} == {"E001", "E004"}
+
+    csv_payload = """id,site_id,detected_at_utc,detection_type,est_ch4_kgph,confidence,lat,lon,status
+N910,S1,2025-09-19T14:00:00Z,OGI,700,0.8,29.7639,-95.3651,NEW
+"""
+    temp_store.append_events_from_csv(csv_payload.encode("utf-8"))
+    assert index.version == temp_store.version
+    assert [hit.event_id for hit in search_events(temp_store, "merged n910").hits] == ["E001"]
+
+
+def test_search_endpoint(api_client: TestClient) -> None:
+    api_client.post("/api/events/E003/report")
+    response = api_client.get("/api/search", params={"q": "report submitted", "limit": 5})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] >= 1
+    assert body["hits"][0]["id"] == "E003"
+    assert body["hits"][0]["status"] == "REPORTED"
+    assert api_client.get("/api/search", params={"q": ""}).status_code == 422
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app.eventview import event_out_fields
+from app.schemas import EventOut, EventsResponse
+from app.serialization import dumps
+from app.store import DataStore
+
+
+def test_fast_path_matches_pydantic_json(temp_store: DataStore) -> None:
+    now = datetime(2025, 9, 24, 12, 30, 0, 123456, tzinfo=timezone.utc)
+    temp_store.set_investigation_started("E001", now)
+    temp_store.complete_runbook_item("E001", "site-safety", now)
+    temp_store.set_report_submitted("E002", now)
+
+    fields = [event_out_fields(temp_store, event, now) for event in temp_store.list_events()]
+    expected = EventsResponse(events=[EventOut(**item) for item in fields]).model_dump_json()
+
+    assert dumps({"events": fields}) == expected.encode()
+
+
+def test_list_endpoint_uses_fast_json(api_client: TestClient) -> None:
+    response = api_client.get("/api/events", params={"limit": 2})
+    assert response.headers["content-type"] == "application/json"
+    events = EventsResponse.model_validate_json(response.content).events
+    assert len(events) == 2
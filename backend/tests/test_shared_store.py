@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import multiprocessing
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.backends import CSVEventBackend
+from app.store import DEFAULT_RUNBOOK_TEMPLATE, DataStore
+
+
+def make_shared_store(data_dir: Path) -> DataStore:
+    return DataStore(data_dir, backend=CSVEventBackend(data_dir / "events.csv", shared=True))
+
+
+@pytest.fixture()
+def shared_dir(tmp_path: Path) -> Path:
+    base_data_dir = Path(__file__).resolve().parents[1] / "data"
+    shutil.copytree(base_data_dir, tmp_path, dirs_exist_ok=True)
+    return tmp_path
+
+
+def test_shared_stores_see_each_others_writes(shared_dir: Path) -> None:
+    worker_a = make_shared_store(shared_dir)
+    worker_b = make_shared_store(shared_dir)
+    now = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+
+    worker_a.set_investigation_started("E001", now)
+    assert worker_b.get_event("E001").status == "INVESTIGATING"
+
+    # B's read-modify-write must start from A's version, not its stale copy.
+    worker_b.complete_runbook_item("E001", "site-safety", now)
+    messages = [entry["message"] for entry in worker_a.get_event("E001").notes["log"]]
+    assert messages == ["Investigation started", "Runbook item completed: site-safety"]
+
+
+def _complete_item(data_dir: str, item_id: str) -> None:
+    store = make_shared_store(Path(data_dir))
+    store.complete_runbook_item("E002", item_id, datetime(2025, 9, 24, tzinfo=timezone.utc))
+
+
+def test_concurrent_processes_do_not_lose_updates(shared_dir: Path) -> None:
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_complete_item, args=(str(shared_dir), item.id))
+        for item in DEFAULT_RUNBOOK_TEMPLATE
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    completed = make_shared_store(shared_dir).get_event("E002").notes["runbook_completed"]
+    assert sorted(entry["id"] for entry in completed) == sorted(item.id for item in DEFAULT_RUNBOOK_TEMPLATE)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app import dependencies
+from app.main import app
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_importing_app_defers_heavy_dependencies() -> None:
+    heavy = ("pandas", "numpy", "pyarrow", "fpdf", "app.store")
+    probe = f"import sys, app.main; print(','.join(name for name in {heavy!r} if name in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_healthz_does_not_build_store(monkeypatch) -> None:
+    monkeypatch.setenv(dependencies.WARMUP_ENV, "0")
+    monkeypatch.setattr(dependencies, "_store", None)
+    with TestClient(app) as client:
+        assert client.get("/healthz").json() == {"status": "ok"}
+        assert dependencies._store is None
+
+
+def test_get_store_is_created_once(monkeypatch) -> None:
+    monkeypatch.setattr(dependencies, "_store", None)
+    first = dependencies.get_store()
+    assert dependencies.get_store() is first
+    dependencies.shutdown_store()
+    assert dependencies._store is None
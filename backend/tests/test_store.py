@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import threading
 from datetime import datetime, timezone
+from typing import List
 
+import numpy as np
+import pytest
 
 from app.store import CSVAppendResult, DataStore
 
@@ -38,3 +42,103 @@ def test_complete_runbook_item_logs_action(temp_store: DataStore) -> None:
     # Subsequent completion should be a no-op
     _, created_again = temp_store.complete_runbook_item("E001", "site-safety", now)
     assert created_again is False
+
+
+def test_append_events_from_csv_merges_nearby_detection(temp_store: DataStore) -> None:
+    csv_payload = """id,site_id,detected_at_utc,detection_type,est_ch4_kgph,confidence,lat,lon,status
+N910,S1,2025-09-19T14:00:00Z,OGI,700,0.8,29.7639,-95.3651,NEW
+N911,S1,2025-09-19T15:00:00Z,satellite,300,0.6,29.7800,-95.3651,NEW
+"""
+    result = temp_store.append_events_from_csv(csv_payload.encode("utf-8"))
+    assert result.imported == 1
+    assert result.merged == 1
+
+    primary = temp_store.get_event("E001")
+    assert [entry["id"] for entry in primary.notes["duplicates"]] == ["N910"]
+    assert any("N910" in entry["message"] for entry in primary.notes["log"])
+    with pytest.raises(KeyError):
+        temp_store.get_event("N910")
+
+
+def test_bulk_transition_persists_once(temp_store: DataStore, monkeypatch) -> None:
+    backend = temp_store.backend
+    persists = []
+    original = backend._persist_events
+    monkeypatch.setattr(backend, "_persist_events", lambda: persists.append(1) or original())
+    now = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+
+    outcomes = temp_store.bulk_transition("investigate", ["E001", "E003", "missing", "E001"], now)
+
+    assert [(item.event_id, item.outcome, item.status) for item in outcomes] == [
+        ("E001", "updated", "INVESTIGATING"),
+        ("E003", "unchanged", "INVESTIGATING"),
+        ("missing", "not_found", None),
+    ]
+    assert len(persists) == 1
+    assert temp_store.get_event("E001").investigation_started_utc == now
+
+    runbook = temp_store.bulk_transition("runbook", ["E001", "E002"], now, item_id="site-safety")
+    assert {item.outcome for item in runbook} == {"updated"}
+    assert temp_store.get_event("E002").notes.has_runbook_item("site-safety")
+    with pytest.raises(ValueError):
+        temp_store.bulk_transition("runbook", ["E001"], now)
+
+
+def test_matching_event_ids_filters(temp_store: DataStore) -> None:
+    cutoff = datetime(2025, 9, 20, tzinfo=timezone.utc)
+    assert temp_store.matching_event_ids(status="NEW", site_ids=["S1"], detected_before=cutoff) == ["E001", "E007"]
+
+
+def test_readers_keep_their_snapshot_while_writers_publish(temp_store: DataStore) -> None:
+    backend = temp_store.backend
+    before = backend.snapshot()
+    now = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+
+    temp_store.bulk_transition("investigate", ["E001", "E002"], now)
+    after = backend.snapshot()
+
+    assert after.version == before.version + 1
+    assert set(before.frame.loc[before.frame["id"].isin(["E001", "E002"]), "status"]) == {"NEW"}
+    assert set(after.frame.loc[after.frame["id"].isin(["E001", "E002"]), "status"]) == {"INVESTIGATING"}
+    # Untouched columns are shared with the previous snapshot, not copied.
+    assert np.shares_memory(after.frame["lat"].to_numpy(), before.frame["lat"].to_numpy())
+
+
+def test_failed_transaction_publishes_nothing(temp_store: DataStore) -> None:
+    backend = temp_store.backend
+    before = backend.snapshot()
+    now = datetime(2025, 9, 24, 15, 0, tzinfo=timezone.utc)
+
+    with pytest.raises(RuntimeError):
+        with backend.transaction():
+            backend.update_event("E001", {"status": "INVESTIGATING", "investigation_started_utc": now})
+            # The writer sees its own staged change; other readers do not.
+            assert backend.get_event_row("E001")["status"] == "INVESTIGATING"
+            raise RuntimeError("abort")
+
+    assert backend.snapshot() is before
+    assert temp_store.get_event("E001").status == "NEW"
+
+
+def test_concurrent_readers_never_see_partial_bulk_updates(temp_store: DataStore) -> None:
+    ids = [event.id for event in temp_store.list_events(status="NEW")]
+    stop = threading.Event()
+    torn: List[int] = []
+
+    def read() -> None:
+        while not stop.is_set():
+            statuses = {event.id: event.status for event in temp_store.list_events()}
+            investigating = sum(statuses[event_id] == "INVESTIGATING" for event_id in ids)
+            if investigating not in (0, len(ids)):
+                torn.append(investigating)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        temp_store.bulk_transition("investigate", ids, datetime(2025, 9, 24, tzinfo=timezone.utc))
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+    assert not torn
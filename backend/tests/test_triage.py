@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import json
+import os
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
 
 from app.schemas import Event
-from app.triage import evaluate_event
+from app.triage import DETECTION_WEIGHTS, PolicyRegistry, PolicySet, TriagePolicy, evaluate_event
 
 
 def make_event(**overrides) -> Event:
@@ -28,7 +33,7 @@ def make_event(**overrides) -> Event:
 def test_high_severity_recent_event_scores_high() -> None:
     now = datetime(2025, 9, 24, tzinfo=timezone.utc)
     event = make_event(detected_at_utc=now - timedelta(hours=4))
-    score, bucket, breakdown, *_ = evaluate_event(event, now=now)
+    score, bucket, breakdown, *_ = evaluate_event(event, now, TriagePolicy())
     assert bucket == "HIGH"
     assert score >= 0.7
     assert breakdown.recency_boost >= 0.15
@@ -42,7 +47,60 @@ def test_older_low_rate_event_scores_lower() -> None:
         detection_type="continuous",
         detected_at_utc=now - timedelta(days=10),
     )
-    score, bucket, breakdown, *_ = evaluate_event(event, now=now)
+    score, bucket, breakdown, *_ = evaluate_event(event, now, TriagePolicy())
     assert bucket == "LOW"
     assert score < 0.4
     assert breakdown.recency_boost == 0.0
+
+
+def test_policy_overrides_layer_operator_then_site() -> None:
+    policies = PolicySet.from_mapping(
+        {
+            "default": {"high_threshold": 0.8},
+            "operators": {"Acme Energy": {"detection_weights": {"OGI": 1.0}, "investigate_sla_days": 3}},
+            "sites": {"S2": {"recency_tiers": [[24, 0.3]]}},
+        }
+    )
+    assert policies.resolve("S9").high_threshold == 0.8
+    acme = policies.resolve("S1", "Acme Energy")
+    assert acme.detection_weight("OGI") == 1.0
+    assert acme.detection_weight("satellite") == DETECTION_WEIGHTS["satellite"]
+    assert acme.investigate_sla == timedelta(days=3)
+    site = policies.resolve("S2", "Acme Energy")
+    assert (site.detection_weight("OGI"), site.recency_tiers, site.high_threshold) == (1.0, ((24.0, 0.3),), 0.8)
+    assert policies.min_investigate_sla == timedelta(days=3)
+
+    now = datetime(2025, 9, 24, tzinfo=timezone.utc)
+    event = make_event(detected_at_utc=now - timedelta(hours=30), est_ch4_kgph=500.0)
+    assert evaluate_event(event, now, policies.resolve("S1", "Acme Energy"))[1] == "MED"
+    assert evaluate_event(event, now, TriagePolicy(high_threshold=0.5))[1] == "HIGH"
+
+
+def test_invalid_policies_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        PolicySet.from_mapping({"default": {"severity_weigth": 0.5}})
+    with pytest.raises(ValueError):
+        PolicySet.from_mapping({"operators": {"Acme Energy": {"med_threshold": 0.9}}})
+    with pytest.raises(ValueError):
+        PolicySet.from_mapping({"default": {"recency_tiers": [[96, 0.05], [48, 0.15]]}})
+
+
+def test_registry_hot_reloads_policy_file(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    path = tmp_path / "policy.json"
+    registry = PolicyRegistry(path, reload_interval_s=0)
+    assert registry.current() == PolicySet()
+
+    path.write_text(json.dumps({"default": {"high_threshold": 0.9}}))
+    assert registry.current().default.high_threshold == 0.9
+    version = registry.version
+
+    path.write_text("{not json")
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 5))
+    assert registry.current().default.high_threshold == 0.9
+    assert registry.version == version
+    assert "Could not load triage policy" in caplog.text
+
+    path.write_text(json.dumps({"sites": {"S1": {"report_sla_days": 10}}}))
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+    assert registry.current().resolve("S1").report_sla == timedelta(days=10)
+    assert registry.version == version + 1
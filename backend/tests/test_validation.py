@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import validation
+from app.store import DataStore
+from app.validation import parse_timestamps, validate_events
+
+CSV = """id,site_id,detected_at_utc,detection_type,est_ch4_kgph,confidence,lat,lon,status,report_submitted_utc
+V1,S1,2025-10-01T00:00:00Z,OGI,120,0.5,29.1,-95.1,NEW,
+V2,S1,2025-10-01T00:00:00.250Z,OGI,120,0.5,27.1,-97.1,REPORTED,2025-10-02T08:30:00+02:00
+V3,S9,2025-10-01T00:00:00Z,drone,120,1.7,29.1,-95.1,NEW,
+V4,S2,yesterday,satellite,-5,0.5,91,-95.1,NEW,
+V5,S2,2025-10-01T00:00:00Z,satellite,abc,0.5,29.1,-195,DONE,soon
+"""
+
+
+def test_rules_report_every_failure_by_row() -> None:
+    parsed, report = validate_events(pd.read_csv(io.StringIO(CSV)), {"S1", "S2"})
+    assert report.valid.tolist() == [True, True, False, False, False]
+    failures = report.errors.groupby("row")["column"].agg(list).to_dict()
+    assert failures == {
+        2: ["site_id", "detection_type", "confidence"],
+        3: ["est_ch4_kgph", "lat", "detected_at_utc"],
+        4: ["status", "est_ch4_kgph", "lon", "report_submitted_utc"],
+    }
+    # Mixed precision and offsets parse; a blank optional timestamp is fine.
+    assert parsed.loc[1, "detected_at_utc"] == pd.Timestamp("2025-10-01T00:00:00.250Z")
+    assert parsed.loc[1, "report_submitted_utc"] == pd.Timestamp("2025-10-02T06:30:00Z")
+    assert pd.isna(parsed.loc[0, "report_submitted_utc"])
+    assert report.messages(limit=1) == ["row 3: site_id: is not a known site (got 'S9')"]
+    assert report.reasons()[3] == (
+        "est_ch4_kgph: must be a number >= 0; lat: must be a number between -90 and 90; "
+        "detected_at_utc: must be an ISO 8601 timestamp"
+    )
+
+
+def test_timestamp_parsing_without_pyarrow(monkeypatch: pytest.MonkeyPatch) -> None:
+    values = pd.Series(["2025-10-01T00:00:00Z", "2025-10-01T00:00:00.5Z", "2025-10-01 02:00:00", None, "x"])
+    fast = parse_timestamps(values.iloc[:2])
+    monkeypatch.setattr(validation, "pyarrow", None)
+    slow = parse_timestamps(values)
+    assert slow.iloc[:2].tolist() == fast.tolist()
+    assert slow.iloc[2] == pd.Timestamp("2025-10-01T02:00:00Z")
+    assert slow.iloc[3:].isna().all()
+
+
+def test_store_rejects_invalid_rows(temp_store: DataStore, api_client: TestClient) -> None:
+    result = temp_store.append_events_from_csv(CSV.encode("utf-8"))
+    assert (result.imported, result.rejected) == (2, 3)
+    assert result.report is not None and len(result.report.errors) == 10
+    response = api_client.get("/api/events")
+    assert response.status_code == 200
+    ids = {event["id"] for event in response.json()["events"]}
+    assert {"V1", "V2"} <= ids and not {"V3", "V4", "V5"} & ids
@@ -80,6 +80,14 @@ export async function postEventAction(
   return apiFetch<EventRecord>(`/events/${eventId}/${action}`, init);
 }
 
+interface ImportJobStatus {
+  id: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  message: string;
+}
+
+const IMPORT_POLL_INTERVAL_MS = 500;
+
 export async function uploadEventsCsv(file: File): Promise<{ message: string }> {
   const formData = new FormData();
   formData.append("file", file);
@@ -91,8 +99,16 @@ export async function uploadEventsCsv(file: File): Promise<{ message: string }>
     const detail = await safeParseError(response);
     throw new Error(detail ?? "CSV upload failed");
   }
-  const payload = await response.json();
-  return { message: payload.message as string };
+  // The backend imports in the background; poll the job until it finishes.
+  let job = (await response.json()) as ImportJobStatus;
+  while (job.status === "queued" || job.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, IMPORT_POLL_INTERVAL_MS));
+    job = await apiFetch<ImportJobStatus>(`/imports/${job.id}`);
+  }
+  if (job.status === "failed") {
+    throw new Error(job.message);
+  }
+  return { message: job.message };
 }
 
 export async function downloadEventPdf(eventId: string): Promise<Blob> {